@@ -0,0 +1,47 @@
+"""Add conversation_summaries table
+
+Revision ID: 0d4f2b7e9a31
+Revises: e3b8d5c1a4f6
+Create Date: 2026-10-18 13:02:11.734826
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0d4f2b7e9a31"
+down_revision: Union[str, Sequence[str], None] = "e3b8d5c1a4f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "conversation_summaries",
+        sa.Column("conversation_id", sa.Integer(), nullable=False),
+        sa.Column("first_message_id", sa.Integer(), nullable=False),
+        sa.Column("last_message_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("ai_model_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(
+            ["conversation_id"], ["conversations.id"], ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(["ai_model_id"], ["ai_models.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("conversation_id"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("conversation_summaries")
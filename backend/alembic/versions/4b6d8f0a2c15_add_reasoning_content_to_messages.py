@@ -0,0 +1,29 @@
+"""Add reasoning_content to messages
+
+Revision ID: 4b6d8f0a2c15
+Revises: 7a9e1c3f5d82
+Create Date: 2026-10-18 15:08:52.316470
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4b6d8f0a2c15"
+down_revision: Union[str, Sequence[str], None] = "7a9e1c3f5d82"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("messages", sa.Column("reasoning_content", sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("messages", "reasoning_content")
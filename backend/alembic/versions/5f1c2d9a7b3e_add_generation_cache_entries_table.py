@@ -0,0 +1,53 @@
+"""Add generation_cache_entries table
+
+Revision ID: 5f1c2d9a7b3e
+Revises: a06120f68c08
+Create Date: 2026-10-18 09:12:41.518203
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5f1c2d9a7b3e"
+down_revision: Union[str, Sequence[str], None] = "a06120f68c08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_cache_entries",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("ai_model_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("reasoning", sa.Text(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["ai_model_id"], ["ai_models.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("key"),
+    )
+    op.create_index(
+        op.f("ix_generation_cache_entries_ai_model_id"),
+        "generation_cache_entries",
+        ["ai_model_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        op.f("ix_generation_cache_entries_ai_model_id"),
+        table_name="generation_cache_entries",
+    )
+    op.drop_table("generation_cache_entries")
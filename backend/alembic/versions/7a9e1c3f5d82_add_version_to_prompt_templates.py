@@ -0,0 +1,32 @@
+"""Add version to prompt_templates
+
+Revision ID: 7a9e1c3f5d82
+Revises: 0d4f2b7e9a31
+Create Date: 2026-10-18 13:47:26.091355
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a9e1c3f5d82"
+down_revision: Union[str, Sequence[str], None] = "0d4f2b7e9a31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "prompt_templates",
+        sa.Column("version", sa.Integer(), server_default="1", nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("prompt_templates", "version")
@@ -0,0 +1,39 @@
+"""Add admission limits to AIModel
+
+Revision ID: 8c4e6a1f0d27
+Revises: 5f1c2d9a7b3e
+Create Date: 2026-10-18 10:03:17.204551
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c4e6a1f0d27"
+down_revision: Union[str, Sequence[str], None] = "5f1c2d9a7b3e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "ai_models", sa.Column("max_concurrency", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "ai_models", sa.Column("requests_per_minute", sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        "ai_models", sa.Column("tokens_per_minute", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ai_models", "tokens_per_minute")
+    op.drop_column("ai_models", "requests_per_minute")
+    op.drop_column("ai_models", "max_concurrency")
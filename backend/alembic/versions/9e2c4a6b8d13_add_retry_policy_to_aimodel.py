@@ -0,0 +1,33 @@
+"""Add retry policy to AIModel
+
+Revision ID: 9e2c4a6b8d13
+Revises: 4b6d8f0a2c15
+Create Date: 2026-10-18 16:02:11.804213
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2c4a6b8d13"
+down_revision: Union[str, Sequence[str], None] = "4b6d8f0a2c15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ai_models", sa.Column("max_retries", sa.Integer(), nullable=True))
+    op.add_column(
+        "ai_models", sa.Column("retry_base_delay_ms", sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ai_models", "retry_base_delay_ms")
+    op.drop_column("ai_models", "max_retries")
@@ -0,0 +1,67 @@
+"""Add generation_usage table
+
+Revision ID: b5f1d3e7a902
+Revises: 9e2c4a6b8d13
+Create Date: 2026-10-18 17:21:37.095512
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b5f1d3e7a902"
+down_revision: Union[str, Sequence[str], None] = "9e2c4a6b8d13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_usage",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ai_model_id", sa.Integer(), nullable=True),
+        sa.Column("route", sa.String(), nullable=False),
+        sa.Column("project_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False),
+        sa.Column("prompt_tokens", sa.Integer(), nullable=False),
+        sa.Column("completion_tokens", sa.Integer(), nullable=False),
+        sa.Column("reasoning_tokens", sa.Integer(), nullable=False),
+        sa.Column("usage_estimated", sa.Boolean(), nullable=False),
+        sa.Column("ttft_ms", sa.Float(), nullable=True),
+        sa.Column("duration_ms", sa.Float(), nullable=False),
+        sa.Column("tokens_per_second", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["ai_model_id"], ["ai_models.id"], ondelete="SET NULL"),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_generation_usage_id"), "generation_usage", ["id"], unique=False
+    )
+    op.create_index(
+        "ix_generation_usage_model_created",
+        "generation_usage",
+        ["ai_model_id", "created_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_generation_usage_created", "generation_usage", ["created_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_generation_usage_created", table_name="generation_usage")
+    op.drop_index("ix_generation_usage_model_created", table_name="generation_usage")
+    op.drop_index(op.f("ix_generation_usage_id"), table_name="generation_usage")
+    op.drop_table("generation_usage")
@@ -0,0 +1,67 @@
+"""Add generation_jobs table
+
+Revision ID: c2a7f39e5b18
+Revises: 8c4e6a1f0d27
+Create Date: 2026-10-18 11:26:54.870312
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c2a7f39e5b18"
+down_revision: Union[str, Sequence[str], None] = "8c4e6a1f0d27"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "generation_jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("QUEUED", "RUNNING", "SUCCEEDED", "FAILED", name="jobstatus"),
+            nullable=False,
+        ),
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("reasoning_chars", sa.Integer(), nullable=False),
+        sa.Column("content_chars", sa.Integer(), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("generated_outline_id", sa.Integer(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=True,
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["generated_outline_id"], ["generated_outlines.id"], ondelete="SET NULL"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_generation_jobs_id"), "generation_jobs", ["id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_generation_jobs_status"), "generation_jobs", ["status"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_generation_jobs_status"), table_name="generation_jobs")
+    op.drop_index(op.f("ix_generation_jobs_id"), table_name="generation_jobs")
+    op.drop_table("generation_jobs")
+    sa.Enum(name="jobstatus").drop(op.get_bind(), checkfirst=True)
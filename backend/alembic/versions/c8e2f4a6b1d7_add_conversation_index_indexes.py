@@ -0,0 +1,39 @@
+"""Add indexes for the conversation index
+
+Revision ID: c8e2f4a6b1d7
+Revises: b5f1d3e7a902
+Create Date: 2026-10-18 19:42:10.518203
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c8e2f4a6b1d7"
+down_revision: Union[str, Sequence[str], None] = "b5f1d3e7a902"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_messages_conversation_id_id",
+        "messages",
+        ["conversation_id", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_conversations_project_id_id",
+        "conversations",
+        ["project_id", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_conversations_project_id_id", table_name="conversations")
+    op.drop_index("ix_messages_conversation_id_id", table_name="messages")
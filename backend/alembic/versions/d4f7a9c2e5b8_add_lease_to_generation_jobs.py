@@ -0,0 +1,36 @@
+"""Add lease to generation_jobs
+
+Revision ID: d4f7a9c2e5b8
+Revises: c8e2f4a6b1d7
+Create Date: 2026-10-18 21:05:33.104852
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f7a9c2e5b8"
+down_revision: Union[str, Sequence[str], None] = "c8e2f4a6b1d7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "generation_jobs", sa.Column("claimed_by", sa.String(), nullable=True)
+    )
+    op.add_column(
+        "generation_jobs",
+        sa.Column("lease_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("generation_jobs", "lease_expires_at")
+    op.drop_column("generation_jobs", "claimed_by")
@@ -0,0 +1,29 @@
+"""Add context_window to AIModel
+
+Revision ID: e3b8d5c1a4f6
+Revises: c2a7f39e5b18
+Create Date: 2026-10-18 12:14:40.518093
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e3b8d5c1a4f6"
+down_revision: Union[str, Sequence[str], None] = "c2a7f39e5b18"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ai_models", sa.Column("context_window", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ai_models", "context_window")
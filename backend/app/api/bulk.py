@@ -0,0 +1,182 @@
+"""
+Bulk create, update and delete for the CRUD routers. Items that fail
+validation are reported by their position and the rest are written with a
+single statement. If the database rejects that statement (a taken unique
+name, a row still referenced elsewhere), each item is retried on its own so
+the offending ones are reported and the others still written.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.core.config import settings
+from app.crud.base import CRUDBase
+
+# (index in the request, id of the row if known, validated payload)
+_Item = Tuple[int, Optional[int], Any]
+
+
+def _check_size(items: List[Any]) -> None:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per request",
+        )
+
+
+def _invalid(index: int, id: Optional[int], e: ValidationError):
+    return schemas.BulkItemError(
+        index=index,
+        id=id,
+        detail=e.errors(include_url=False, include_context=False),
+    )
+
+
+async def _write(
+    db: AsyncSession,
+    items: List[_Item],
+    run: Callable[[List[_Item]], Awaitable[List]],
+) -> Tuple[List, List[schemas.BulkItemError]]:
+    if not items:
+        return [], []
+    try:
+        return await run(items), []
+    except IntegrityError:
+        await db.rollback()
+
+    written, errors = [], []
+    for item in items:
+        try:
+            written += await run([item])
+        except IntegrityError as e:
+            await db.rollback()
+            errors.append(
+                schemas.BulkItemError(index=item[0], id=item[1], detail=str(e.orig))
+            )
+    return written, errors
+
+
+async def create(
+    crud_instance: CRUDBase,
+    db: AsyncSession,
+    items: List[Dict[str, Any]],
+    create_schema: Type[BaseModel],
+) -> schemas.BulkResult:
+    _check_size(items)
+    valid: List[_Item] = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, None, create_schema.model_validate(item)))
+        except ValidationError as e:
+            errors.append(_invalid(index, None, e))
+
+    async def run(batch: List[_Item]) -> List:
+        return await crud_instance.bulk_create(db, objs_in=[obj for _, _, obj in batch])
+
+    written, failed = await _write(db, valid, run)
+    return schemas.BulkResult(items=written, errors=_sorted(errors + failed))
+
+
+async def update(
+    crud_instance: CRUDBase,
+    db: AsyncSession,
+    items: List[Dict[str, Any]],
+    update_schema: Type[BaseModel],
+    on_change: Optional[Callable[[int], None]] = None,
+) -> schemas.BulkResult:
+    """
+    Each item is an update object with the `id` of the row it changes.
+    `on_change` is called with the id of every updated row.
+    """
+    _check_size(items)
+    valid: List[_Item] = []
+    errors = []
+    seen = set()
+    for index, item in enumerate(items):
+        id = item.get("id")
+        if not isinstance(id, int):
+            errors.append(
+                schemas.BulkItemError(index=index, detail="An integer id is required")
+            )
+            continue
+        if id in seen:
+            errors.append(
+                schemas.BulkItemError(index=index, id=id, detail="Duplicate id")
+            )
+            continue
+        seen.add(id)
+        changes = {field: value for field, value in item.items() if field != "id"}
+        try:
+            valid.append((index, id, update_schema.model_validate(changes)))
+        except ValidationError as e:
+            errors.append(_invalid(index, id, e))
+
+    async def run(batch: List[_Item]) -> List:
+        return await crud_instance.bulk_update(
+            db, objs_in={id: obj for _, id, obj in batch}
+        )
+
+    written, failed = await _write(db, valid, run)
+    _notify(on_change, written)
+    return schemas.BulkResult(
+        items=written,
+        errors=_sorted(errors + failed + _missing(valid, written, failed)),
+    )
+
+
+async def remove(
+    crud_instance: CRUDBase,
+    db: AsyncSession,
+    ids: List[int],
+    on_change: Optional[Callable[[int], None]] = None,
+) -> schemas.BulkResult:
+    """`on_change` is called with the id of every deleted row."""
+    _check_size(ids)
+    valid: List[_Item] = []
+    errors = []
+    seen = set()
+    for index, id in enumerate(ids):
+        if id in seen:
+            errors.append(
+                schemas.BulkItemError(index=index, id=id, detail="Duplicate id")
+            )
+            continue
+        seen.add(id)
+        valid.append((index, id, id))
+
+    async def run(batch: List[_Item]) -> List:
+        return await crud_instance.bulk_remove(db, ids=[id for _, id, _ in batch])
+
+    written, failed = await _write(db, valid, run)
+    _notify(on_change, written)
+    return schemas.BulkResult(
+        items=written,
+        errors=_sorted(errors + failed + _missing(valid, written, failed)),
+    )
+
+
+def _notify(on_change: Optional[Callable[[int], None]], written: List) -> None:
+    if on_change is not None:
+        for db_obj in written:
+            on_change(db_obj.id)
+
+
+def _missing(
+    items: List[_Item], written: List, failed: List[schemas.BulkItemError]
+) -> List[schemas.BulkItemError]:
+    found = {db_obj.id for db_obj in written} | {error.id for error in failed}
+    return [
+        schemas.BulkItemError(index=index, id=id, detail="Not found")
+        for index, id, _ in items
+        if id not in found
+    ]
+
+
+def _sorted(errors: List[schemas.BulkItemError]) -> List[schemas.BulkItemError]:
+    return sorted(errors, key=lambda error: error.index)
@@ -0,0 +1,56 @@
+from typing import Annotated, List, Literal, Optional
+
+from fastapi import Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.crud.pagination import InvalidCursor
+
+
+class PageParams:
+    """
+    The query parameters of a list endpoint. Pages are cursor-based: the
+    X-Next-Cursor response header holds the `cursor` of the next page and is
+    absent on the last one. `skip` selects the legacy offset mode, which
+    always orders by id and returns no cursor.
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        cursor: Optional[str] = None,
+        limit: Annotated[int, Query(ge=0)] = 100,
+        order_by: str = "id",
+        order: Literal["asc", "desc"] = "asc",
+        skip: Annotated[int, Query(ge=0)] = 0,
+    ):
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+        self.order_by = order_by
+        self.descending = order == "desc"
+        self.skip = skip
+
+    async def fetch(self, crud_instance: CRUDBase, db: AsyncSession) -> List:
+        if self.skip:
+            if self.cursor is not None:
+                raise HTTPException(
+                    status_code=400, detail="Use either cursor or skip, not both"
+                )
+            return await crud_instance.get_multi(db, skip=self.skip, limit=self.limit)
+        try:
+            page = await crud_instance.get_page(
+                db,
+                cursor=self.cursor,
+                limit=self.limit,
+                order_by=self.order_by,
+                descending=self.descending,
+            )
+        except InvalidCursor as e:
+            raise HTTPException(status_code=400, detail=str(e)) from None
+        if page.next_cursor is not None:
+            self.response.headers["X-Next-Cursor"] = page.next_cursor
+        return page.items
+
+
+Pagination = Annotated[PageParams, Depends()]
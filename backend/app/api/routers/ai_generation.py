@@ -1,15 +1,53 @@
-import json
-from typing import Annotated, List
+import asyncio
+from typing import (
+    Annotated,
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
-from fastapi import APIRouter, Depends, HTTPException
+import structlog
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
+from app.core.config import settings
 from app.crud import crud_setting
-from app.database import get_db
-from app.services import ai_service, prompt_service
+from app.database import SessionLocal, get_db
+from app.schemas import setting as setting_schemas
+from app.services import (
+    ai_events,
+    ai_service,
+    chat_context,
+    conversation_memory,
+    generation_cache,
+    hedging,
+    model_config_cache,
+    outline_batch,
+    outline_context,
+    outline_parser,
+    scheduler,
+    single_flight,
+    stream_registry,
+)
+from app.services.ai_events import (
+    AIEvent,
+    ContentEvent,
+    ErrorEvent,
+    OutlineFieldEvent,
+    OutlineSavedEvent,
+    ReasoningEvent,
+)
+from app.services.model_config_cache import ResolvedModelConfig
+from app.services.sse import cancel_on_disconnect, encode_sequenced, format_sse
+
+logger = structlog.get_logger(__name__)
 
 # --- Helper Function and Models ---
 
@@ -17,33 +55,12 @@ from app.services import ai_service, prompt_service
 async def get_generation_context(
     db: AsyncSession, project_id: int, worldview_id: int | None, writing_style_id: int | None
 ) -> dict:
-    project = await crud.project.get(db, id=project_id)
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    worldview = (
-        await crud_setting.worldview.get(db, id=worldview_id) if worldview_id else None
-    )
-    writing_style = (
-        await crud_setting.writing_style.get(db, id=writing_style_id)
-        if writing_style_id
-        else None
+    context = await outline_context.load_context(
+        db, project_id, worldview_id, writing_style_id
     )
-
-    return {
-        "project": project,
-        "worldview": {
-            c.name: getattr(worldview, c.name) for c in worldview.__table__.columns
-        }
-        if worldview
-        else {},
-        "writing_style": {
-            c.name: getattr(writing_style, c.name)
-            for c in writing_style.__table__.columns
-        }
-        if writing_style
-        else {},
-    }
+    if context is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return context
 
 
 class GenerationRequest(BaseModel):
@@ -52,15 +69,279 @@ class GenerationRequest(BaseModel):
     worldview_id: int | None = None
     writing_style_id: int | None = None
     target_word_count: int
+    temperature: float | None = None
+    top_p: float | None = None
+    # Skip the generation cache lookup (a fresh result still refreshes the cache)
+    bypass_cache: bool = False
 
+    def sampling_params(self) -> Dict[str, Any]:
+        return self.model_dump(include={"temperature", "top_p"}, exclude_none=True)
 
-class GenerationRequestWithPrompt(GenerationRequest):
+
+class HedgeOptions(BaseModel):
+    # Also send the request to this model if the primary is slow to start, and
+    # continue the reply on it if the primary fails after its retries
+    fallback_ai_model_id: int | None = None
+    hedge_delay_ms: int | None = Field(None, ge=0)
+
+    def hedge_delay(self) -> float:
+        if self.hedge_delay_ms is None:
+            return settings.HEDGE_DELAY_MS / 1000
+        return self.hedge_delay_ms / 1000
+
+
+class GenerationRequestWithPrompt(GenerationRequest, HedgeOptions):
     prompt: str
+    # Save the parsed outline as a GeneratedOutline when the stream completes
+    save_outline: bool = False
+    version_name: str | None = None
+
 
+class BatchGenerationRequest(GenerationRequest):
+    variants: int = Field(5, ge=1, le=10)
+    max_parallel: int | None = Field(None, ge=1)
 
-class ChatRequest(BaseModel):
+
+class ChatRequest(HedgeOptions):
     ai_model_id: int
-    messages: List[schemas.MessageCreate]
+    messages: List[schemas.MessageCreate] = []
+    # When set, the stored history of the conversation (its rolling summary
+    # and the messages after it) is placed between the system messages and
+    # the other messages of the request
+    conversation_id: int | None = None
+    # Prompt token budget; capped by the model's context window
+    max_context_tokens: int | None = Field(None, ge=1)
+    # With a conversation_id, the new non-system messages and the streamed
+    # reply are appended to the conversation
+    save_messages: bool = True
+
+
+async def outline_events(
+    db: AsyncSession,
+    model_config: ResolvedModelConfig,
+    prompt: str,
+    req: GenerationRequest,
+    fallback: Optional[ResolvedModelConfig] = None,
+    hedge_delay: float = 0.0,
+) -> Tuple[AsyncIterator[AIEvent], Optional[str]]:
+    """
+    Returns the event stream of an outline generation and the cache status.
+    The stream is replayed from the generation cache when enabled and
+    possible; otherwise identical in-flight requests share one upstream call,
+    hedged with the `fallback` model if one is given.
+    """
+    sampling = req.sampling_params()
+    messages = ai_service.outline_messages(prompt)
+    key = ai_service.request_key(model_config, messages, sampling)
+    cache_status = None
+
+    def upstream() -> AsyncIterator[AIEvent]:
+        # The hedge starts the fallback if the primary fails before its first
+        # event; failover only takes over a reply already under way
+        events = ai_service.stream_outline_events(
+            model_config,
+            prompt,
+            sampling,
+            fallback=fallback,
+            project_id=req.project_id,
+            hedged=fallback is not None,
+        )
+        if fallback is not None:
+            events = hedging.hedge(
+                events,
+                lambda: ai_service.stream_outline_events(
+                    fallback, prompt, sampling, project_id=req.project_id
+                ),
+                hedge_delay,
+            )
+        if cache_status is not None:
+            events = generation_cache.record(key, model_config.id, events)
+        return events
+
+    if generation_cache.enabled():
+        cache_status = "MISS"
+        if not req.bypass_cache:
+            cached = await generation_cache.get(db, key)
+            if cached is not None:
+                return generation_cache.replay(cached), "HIT"
+
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        check_admission(model_config, messages)
+        return upstream(), cache_status
+    if not single_flight.in_flight(key):
+        check_admission(model_config, messages)
+    return single_flight.subscribe(key, upstream), cache_status
+
+
+async def chat_messages(
+    db: AsyncSession, req: ChatRequest, model_config: ResolvedModelConfig
+) -> List[Dict[str, str]]:
+    messages = [
+        message.model_dump(include={"role", "content"}) for message in req.messages
+    ]
+    if req.conversation_id is None:
+        return messages
+
+    conversation = await crud.conversation.get_with_messages(
+        db, id=req.conversation_id
+    )
+    if conversation is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    history = await conversation_memory.history_messages(db, conversation)
+    conversation_memory.maybe_summarize(conversation.id, history, model_config)
+    system = [message for message in messages if message["role"] == "system"]
+    rest = [message for message in messages if message["role"] != "system"]
+    return system + history + rest
+
+
+async def get_fallback_config(
+    db: AsyncSession, req: HedgeOptions
+) -> Optional[ResolvedModelConfig]:
+    if req.fallback_ai_model_id is None:
+        return None
+    fallback = await model_config_cache.get_model_config(db, req.fallback_ai_model_id)
+    if not fallback:
+        raise HTTPException(status_code=404, detail="Fallback AI Model not found")
+    return fallback
+
+
+async def save_streamed_outline(
+    events: AsyncIterator[AIEvent],
+    parser: outline_parser.OutlineStreamParser,
+    req: GenerationRequestWithPrompt,
+    context: dict,
+) -> AsyncGenerator[AIEvent, None]:
+    """Saves the parsed outline once the stream completes without an error."""
+    failed = False
+    async for event in events:
+        failed = failed or isinstance(event, ErrorEvent)
+        yield event
+    if failed or not parser.text.strip():
+        return
+
+    outline = setting_schemas.GeneratedOutlineCreate(
+        project_id=req.project_id,
+        version_name=req.version_name,
+        target_word_count=req.target_word_count,
+        worldview_id=req.worldview_id,
+        writing_style_id=req.writing_style_id,
+        settings_snapshot={
+            "ai_model_id": req.ai_model_id,
+            "worldview": context["worldview"],
+            "writing_style": context["writing_style"],
+        },
+        outline_data=parser.result(),
+    )
+    async with SessionLocal() as db:
+        (outline_id,) = await crud_setting.generated_outline.create_many(
+            db, objs_in=[outline]
+        )
+    yield OutlineSavedEvent(outline_id)
+
+
+async def save_chat_turn(db: AsyncSession, req: ChatRequest) -> int:
+    """
+    Appends the request's non-system messages and an empty assistant message
+    to the conversation; returns the id of the assistant message.
+    """
+    new_messages = [message for message in req.messages if message.role != "system"]
+    new_messages.append(schemas.MessageCreate(role="assistant", content=""))
+    ids = await crud.message.append(
+        db, conversation_id=req.conversation_id, objs_in=new_messages
+    )
+    return ids[-1]
+
+
+async def persist_reply(
+    events: AsyncIterator[AIEvent], message_id: int
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Appends the streamed reply to its message row, at most once every
+    CHAT_CHECKPOINT_SECONDS and once more when the stream ends, so each
+    checkpoint writes only the text produced since the previous one.
+    """
+    content: List[str] = []
+    reasoning: List[str] = []
+    failed = False
+    loop = asyncio.get_running_loop()
+
+    async def flush(db: AsyncSession) -> None:
+        await crud.message.append_text(
+            db, id=message_id, content="".join(content), reasoning="".join(reasoning)
+        )
+        content.clear()
+        reasoning.clear()
+
+    async with SessionLocal() as db:
+        try:
+            checkpoint = loop.time() + settings.CHAT_CHECKPOINT_SECONDS
+            async for event in events:
+                if isinstance(event, ContentEvent):
+                    content.append(event.chunk)
+                elif isinstance(event, ReasoningEvent):
+                    reasoning.append(event.chunk)
+                elif isinstance(event, ErrorEvent):
+                    failed = True
+                yield event
+                if (content or reasoning) and loop.time() >= checkpoint:
+                    await flush(db)
+                    checkpoint = loop.time() + settings.CHAT_CHECKPOINT_SECONDS
+        finally:
+            try:
+                await flush(db)
+                if failed:
+                    # Drop the placeholder of a reply that never started
+                    await crud.message.delete_if_empty(db, id=message_id)
+            except Exception as e:
+                logger.warning(
+                    "chat_reply_persist_failed", message_id=message_id, error=str(e)
+                )
+
+
+def build_outline_prompt(context: dict, req: GenerationRequest) -> str:
+    return outline_context.build_prompt(context, req.target_word_count)
+
+
+def check_admission(
+    model_config: ResolvedModelConfig, messages: List[Dict[str, str]]
+) -> None:
+    try:
+        scheduler.check_admission(model_config, messages)
+    except scheduler.QueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers=scheduler.retry_after_header(e),
+        ) from None
+
+
+def stream_response(
+    request: Request,
+    stream: stream_registry.ResumableStream,
+    last_seq: int = 0,
+    headers: Optional[Dict[str, str]] = None,
+) -> StreamingResponse:
+    return StreamingResponse(
+        cancel_on_disconnect(
+            request,
+            encode_sequenced(stream.id, stream_registry.subscribe(stream, last_seq)),
+        ),
+        media_type="text/event-stream",
+        headers={"X-Stream-Id": stream.id, **(headers or {})},
+    )
+
+
+def resume_response(
+    request: Request, last_event_id: Optional[str]
+) -> Optional[StreamingResponse]:
+    """Reattaches to a known stream when the client sent a Last-Event-ID."""
+    parsed = stream_registry.parse_last_event_id(last_event_id)
+    if parsed is None:
+        return None
+    stream = stream_registry.get(parsed[0])
+    if stream is None:
+        return None
+    return stream_response(request, stream, parsed[1])
 
 
 # --- AI Generation Router ---
@@ -80,44 +361,103 @@ async def get_initial_prompt(req: GenerationRequest, db: Annotated[AsyncSession,
         db, req.project_id, req.worldview_id, req.writing_style_id
     )
 
-    return prompt_service.create_outline_generation_prompt(
-        core_concept=context["project"].core_concept,
-        worldview=context["worldview"],
-        writing_style=context["writing_style"],
-        target_word_count=req.target_word_count,
-    )
+    return build_outline_prompt(context, req)
 
 
 @router.post("/generate-outline-stream")
 async def generate_outline_stream(
-    req: GenerationRequestWithPrompt, db: Annotated[AsyncSession, Depends(get_db)]
+    req: GenerationRequestWithPrompt,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    last_event_id: Annotated[str | None, Header()] = None,
 ):
-    ai_model = await crud_setting.ai_model.get(db, id=req.ai_model_id)
-    if not ai_model:
+    resumed = resume_response(request, last_event_id)
+    if resumed is not None:
+        return resumed
+
+    model_config = await model_config_cache.get_model_config(db, req.ai_model_id)
+    if not model_config:
         raise HTTPException(status_code=404, detail="AI Model not found")
 
-    return StreamingResponse(
-        ai_service.generate_outline_from_config(
-            model_config=ai_model,
-            prompt=req.prompt,
-        ),
-        media_type="text/event-stream",
+    context = None
+    if req.save_outline:
+        context = await get_generation_context(
+            db, req.project_id, req.worldview_id, req.writing_style_id
+        )
+
+    fallback = await get_fallback_config(db, req)
+    events, cache_status = await outline_events(
+        db, model_config, req.prompt, req, fallback, req.hedge_delay()
     )
+    parser = outline_parser.OutlineStreamParser()
+    events = outline_parser.with_outline_fields(events, parser)
+    if context is not None:
+        events = save_streamed_outline(events, parser, req, context)
+    headers = {"X-Generation-Cache": cache_status} if cache_status else None
+    return stream_response(request, stream_registry.start(events), headers=headers)
 
 
 @router.post("/chat-stream")
-async def chat_stream(req: ChatRequest, db: Annotated[AsyncSession, Depends(get_db)]):
-    ai_model = await crud_setting.ai_model.get(db, id=req.ai_model_id)
-    if not ai_model:
+async def chat_stream(
+    req: ChatRequest,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    resumed = resume_response(request, last_event_id)
+    if resumed is not None:
+        return resumed
+
+    model_config = await model_config_cache.get_model_config(db, req.ai_model_id)
+    if not model_config:
         raise HTTPException(status_code=404, detail="AI Model not found")
 
-    return StreamingResponse(
-        ai_service.generate_chat_completion(
-            model_config=ai_model,
-            messages=[message.dict() for message in req.messages],
-        ),
-        media_type="text/event-stream",
+    messages = await chat_messages(db, req, model_config)
+    messages, report = chat_context.assemble(
+        messages, chat_context.budget_for(model_config, req.max_context_tokens)
+    )
+    fallback = await get_fallback_config(db, req)
+    check_admission(model_config, messages)
+    events = ai_service.stream_chat_events(
+        model_config=model_config,
+        messages=messages,
+        fallback=fallback,
+        hedged=fallback is not None,
     )
+    if fallback is not None:
+        events = hedging.hedge(
+            events,
+            lambda: ai_service.stream_chat_events(fallback, messages),
+            req.hedge_delay(),
+        )
+    headers = {"X-Context-Tokens": report.header()}
+    if req.conversation_id is not None and req.save_messages:
+        message_id = await save_chat_turn(db, req)
+        events = persist_reply(events, message_id)
+        headers["X-Assistant-Message-Id"] = str(message_id)
+    stream = stream_registry.start(events)
+    return stream_response(request, stream, headers=headers)
+
+
+@router.get("/streams/{stream_id}")
+async def resume_stream(
+    stream_id: str,
+    request: Request,
+    last_event_id: Annotated[str | None, Header()] = None,
+    after: int = 0,
+):
+    """
+    Resumes a chat or outline stream after the event named by the
+    Last-Event-ID header (or the `after` sequence number) without calling
+    the AI provider again.
+    """
+    stream = stream_registry.get(stream_id)
+    if stream is None:
+        raise HTTPException(status_code=404, detail="Stream not found or expired")
+    parsed = stream_registry.parse_last_event_id(last_event_id)
+    if parsed is not None and parsed[0] == stream_id:
+        after = parsed[1]
+    return stream_response(request, stream, after)
 
 
 @router.post("/generate-outline")
@@ -126,41 +466,115 @@ async def generate_outline(req: GenerationRequest, db: Annotated[AsyncSession, D
         db, req.project_id, req.worldview_id, req.writing_style_id
     )
 
-    ai_model = await crud_setting.ai_model.get(db, id=req.ai_model_id)
-    if not ai_model:
+    model_config = await model_config_cache.get_model_config(db, req.ai_model_id)
+    if not model_config:
         raise HTTPException(status_code=404, detail="AI Model not found")
 
-    prompt = prompt_service.create_outline_generation_prompt(
-        core_concept=context["project"].core_concept,
-        worldview=context["worldview"],
-        writing_style=context["writing_style"],
-        target_word_count=req.target_word_count,
+    prompt = build_outline_prompt(context, req)
+
+    events, _ = await outline_events(db, model_config, prompt, req)
+    result = await ai_events.collect(events)
+    if result.error is not None:
+        raise HTTPException(status_code=500, detail=result.error)
+
+    return {"status": "success", "outline": result.content}
+
+
+async def _stream_outline_batch(
+    req: BatchGenerationRequest,
+    model_config: ResolvedModelConfig,
+    prompt: str,
+    settings_snapshot: dict,
+):
+    parsers = [outline_parser.OutlineStreamParser() for _ in range(req.variants)]
+    failed = [False] * req.variants
+    max_parallel = min(
+        req.max_parallel or settings.OUTLINE_BATCH_MAX_PARALLEL,
+        settings.OUTLINE_BATCH_MAX_PARALLEL,
     )
 
-    stream = ai_service.generate_outline_from_config(
-        model_config=ai_model,
-        prompt=prompt,
+    async for index, event in outline_batch.stream_variants(
+        model_config,
+        prompt,
+        req.sampling_params(),
+        req.variants,
+        max_parallel,
+        project_id=req.project_id,
+    ):
+        if event is None:
+            status = "error" if failed[index] else "success"
+            yield format_sse("variant_done", {"variant": index, "status": status})
+            continue
+        fields = []
+        if isinstance(event, ContentEvent):
+            fields = parsers[index].feed(event.chunk)
+        elif isinstance(event, ErrorEvent):
+            failed[index] = True
+        yield format_sse(event.event, {"variant": index, **event.payload()})
+        for field, value in fields:
+            field_event = OutlineFieldEvent(field, value)
+            yield format_sse(
+                field_event.event, {"variant": index, **field_event.payload()}
+            )
+
+    variants = [
+        i for i in range(req.variants) if parsers[i].text.strip() and not failed[i]
+    ]
+    outlines = [
+        setting_schemas.GeneratedOutlineCreate(
+            project_id=req.project_id,
+            version_name=f"Variant {i + 1}",
+            target_word_count=req.target_word_count,
+            worldview_id=req.worldview_id,
+            writing_style_id=req.writing_style_id,
+            settings_snapshot=settings_snapshot,
+            outline_data=parsers[i].result(),
+        )
+        for i in variants
+    ]
+    ids: List[int] = []
+    if outlines:
+        async with SessionLocal() as db:
+            ids = await crud_setting.generated_outline.create_many(
+                db, objs_in=outlines
+            )
+    yield format_sse(
+        "saved",
+        {"outlines": [{"variant": i, "id": id} for i, id in zip(variants, ids)]},
+    )
+
+
+@router.post("/generate-outline-batch")
+async def generate_outline_batch(
+    req: BatchGenerationRequest,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    """
+    Generates several candidate outlines for one project from a single prompt.
+    Events of all variants are multiplexed into one stream, tagged with their
+    variant index; the finished outlines are saved together at the end.
+    """
+    context = await get_generation_context(
+        db, req.project_id, req.worldview_id, req.writing_style_id
     )
 
-    full_content = ""
-    async for sse_event in stream:
-        lines = sse_event.strip().split("\n")
-        event_type = None
-        data_str = ""
-        for line in lines:
-            if line.startswith("event:"):
-                event_type = line.split(":", 1)[1].strip()
-            elif line.startswith("data:"):
-                data_str = line.split(":", 1)[1].strip()
-
-        if event_type == "error":
-            error_data = json.loads(data_str)
-            raise HTTPException(
-                status_code=500, detail=error_data.get("error", "Unknown AI error")
-            ) from None
-
-        if event_type == "content" and data_str:
-            data = json.loads(data_str)
-            full_content += data.get("chunk", "")
-
-    return {"status": "success", "outline": full_content}
+    model_config = await model_config_cache.get_model_config(db, req.ai_model_id)
+    if not model_config:
+        raise HTTPException(status_code=404, detail="AI Model not found")
+
+    prompt = build_outline_prompt(context, req)
+    check_admission(model_config, ai_service.outline_messages(prompt))
+
+    settings_snapshot = {
+        "ai_model_id": req.ai_model_id,
+        "worldview": context["worldview"],
+        "writing_style": context["writing_style"],
+    }
+    return StreamingResponse(
+        cancel_on_disconnect(
+            request,
+            _stream_outline_batch(req, model_config, prompt, settings_snapshot),
+        ),
+        media_type="text/event-stream",
+    )
@@ -1,9 +1,11 @@
-from typing import Annotated, Any, List
+from typing import Annotated, Any, Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
+from app.api import bulk
+from app.api.pagination import Pagination
 from app.database import get_db
 
 router = APIRouter()
@@ -21,13 +23,12 @@ async def get_character_or_404(
 @router.get("/", response_model=List[schemas.Character])
 async def read_characters(
     db: Annotated[AsyncSession, Depends(get_db)],
-    skip: int = 0,
-    limit: int = 100,
+    page: Pagination,
 ) -> Any:
     """
     Retrieve characters.
     """
-    characters = await crud.character.get_multi(db, skip=skip, limit=limit)
+    characters = await page.fetch(crud.character, db)
     return characters
 
 
@@ -44,6 +45,42 @@ async def create_character(
     return character
 
 
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.Character])
+async def create_characters(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    items: Annotated[List[Dict[str, Any]], Body()],
+) -> Any:
+    """
+    Create several characters; invalid items are reported and the rest created.
+    """
+    return await bulk.create(crud.character, db, items, schemas.CharacterCreate)
+
+
+@router.put("/bulk", response_model=schemas.BulkResult[schemas.Character])
+async def update_characters(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    items: Annotated[List[Dict[str, Any]], Body()],
+) -> Any:
+    """
+    Update several characters, each item carrying the id of its character.
+    """
+    return await bulk.update(crud.character, db, items, schemas.CharacterUpdate)
+
+
+@router.post("/bulk/delete", response_model=schemas.BulkResult[schemas.Character])
+async def delete_characters(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    req: schemas.BulkDelete,
+) -> Any:
+    """
+    Delete several characters.
+    """
+    return await bulk.remove(crud.character, db, req.ids)
+
+
 @router.get("/{character_id}", response_model=schemas.Character)
 async def read_character(
     *,
@@ -59,15 +96,17 @@ async def read_character(
 async def update_character(
     *,
     db: Annotated[AsyncSession, Depends(get_db)],
-    character: Annotated[models.Character, Depends(get_character_or_404)],
+    character_id: int,
     character_in: schemas.CharacterUpdate,
 ) -> Any:
     """
     Update a character.
     """
-    character = await crud.character.update(
-        db=db, db_obj=character, obj_in=character_in
+    character = await crud.character.update_by_id(
+        db=db, id=character_id, obj_in=character_in
     )
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
     return character
 
 
@@ -75,10 +114,12 @@ async def update_character(
 async def delete_character(
     *,
     db: Annotated[AsyncSession, Depends(get_db)],
-    character: Annotated[models.Character, Depends(get_character_or_404)],
+    character_id: int,
 ) -> Any:
     """
     Delete a character.
     """
-    character = await crud.character.remove(db=db, id=character.id)
+    character = await crud.character.remove(db=db, id=character_id)
+    if not character:
+        raise HTTPException(status_code=404, detail="Character not found")
     return character
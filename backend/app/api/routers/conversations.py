@@ -1,11 +1,12 @@
 from typing import Annotated, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app import crud, schemas
+from app.crud.pagination import InvalidCursor
 from app.database import get_db
 
 router = APIRouter()
@@ -30,6 +31,29 @@ async def read_conversations(
     conversations = result.scalars().unique().all()
     return conversations
 
+@router.get("/index", response_model=List[schemas.ConversationListItem])
+async def read_conversation_index(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    response: Response,
+    project_id: int | None = None,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 50,
+):
+    """
+    Conversations newest first, with their message count, last-message time
+    and a preview but no messages. The X-Next-Cursor header holds the
+    `cursor` of the next page.
+    """
+    try:
+        page = await crud.conversation.get_index(
+            db, project_id=project_id, cursor=cursor, limit=limit
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    if page.next_cursor is not None:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
+
 @router.get("/{conversation_id}", response_model=schemas.Conversation)
 async def read_conversation(
     conversation_id: int,
@@ -45,7 +69,7 @@ async def update_conversation(
     *,
     db: Annotated[AsyncSession, Depends(get_db)],
     conversation_id: int,
-    conversation_in: schemas.ConversationCreate,
+    conversation_in: schemas.ConversationUpdate,
 ):
     db_conversation = await crud.conversation.get_with_messages(db, id=conversation_id)
     if not db_conversation:
@@ -53,6 +77,24 @@ async def update_conversation(
     conversation = await crud.conversation.update(db=db, db_obj=db_conversation, obj_in=conversation_in)
     return conversation
 
+@router.post("/{conversation_id}/messages", response_model=List[schemas.Message])
+async def append_messages(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    conversation_id: int,
+    messages_in: List[schemas.MessageCreate],
+):
+    """Adds messages to the end of a conversation without resending its history."""
+    if await crud.conversation.get(db, id=conversation_id) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return await crud.message.bulk_create(
+        db,
+        objs_in=[
+            {**message_in.model_dump(), "conversation_id": conversation_id}
+            for message_in in messages_in
+        ],
+    )
+
 @router.delete("/{conversation_id}", response_model=schemas.Conversation)
 async def delete_conversation(
     conversation_id: int,
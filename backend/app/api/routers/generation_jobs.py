@@ -0,0 +1,104 @@
+from typing import Annotated, AsyncGenerator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.api.routers.ai_generation import GenerationRequest
+from app.database import SessionLocal, get_db
+from app.models.generation_job import JobStatus
+from app.services import job_queue, model_config_cache, stream_registry
+from app.services.sse import cancel_on_disconnect, encode_sequenced, format_sse
+
+# Seconds between status events while a subscribed job is still queued
+QUEUED_HEARTBEAT_SECONDS = 15.0
+
+router = APIRouter(
+    prefix="/ai/jobs",
+    tags=["AI Generation Jobs"],
+)
+
+
+async def _job_state(job_id: int) -> dict:
+    async with SessionLocal() as db:
+        job = await crud.generation_job.get(db, job_id)
+        return schemas.GenerationJob.model_validate(job).model_dump(mode="json")
+
+
+async def _stream_job(
+    job_id: int, last_event_id: str | None
+) -> AsyncGenerator[str, None]:
+    state = await _job_state(job_id)
+    yield format_sse("job", state)
+
+    running = job_queue.running(job_id)
+    while running is None and state["status"] == JobStatus.QUEUED.value:
+        running = await job_queue.wait_running(job_id, QUEUED_HEARTBEAT_SECONDS)
+        if running is None:
+            state = await _job_state(job_id)
+            yield format_sse("job", state)
+    if running is None:
+        return
+
+    last_seq = 0
+    parsed = stream_registry.parse_last_event_id(last_event_id)
+    if parsed is not None and parsed[0] == running.stream.id:
+        last_seq = parsed[1]
+    async for frame in encode_sequenced(
+        running.stream.id, stream_registry.subscribe(running.stream, last_seq)
+    ):
+        yield frame
+    await running.finished.wait()
+    yield format_sse("job", await _job_state(job_id))
+
+
+@router.post("/outline", response_model=schemas.GenerationJob, status_code=202)
+async def submit_outline_job(
+    req: GenerationRequest, db: Annotated[AsyncSession, Depends(get_db)]
+):
+    """
+    Queues an outline generation that runs in the background. The job can be
+    polled, or its progress subscribed to, and the finished outline is saved
+    as a GeneratedOutline whose id is reported on the job.
+    """
+    if not await crud.project.get(db, id=req.project_id):
+        raise HTTPException(status_code=404, detail="Project not found")
+    if not await model_config_cache.get_model_config(db, req.ai_model_id):
+        raise HTTPException(status_code=404, detail="AI Model not found")
+
+    job = await crud.generation_job.submit(
+        db,
+        kind=job_queue.OUTLINE,
+        params=req.model_dump(exclude={"bypass_cache"}),
+    )
+    job_queue.submit(job.id)
+    return job
+
+
+@router.get("/{job_id}", response_model=schemas.GenerationJob)
+async def read_job(job_id: int, db: Annotated[AsyncSession, Depends(get_db)]):
+    job = await crud.generation_job.get(db, id=job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/{job_id}/events")
+async def subscribe_job(
+    job_id: int,
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    last_event_id: Annotated[str | None, Header()] = None,
+):
+    """
+    Streams a job's progress: a `job` status event, the generation events of
+    a running job (resumable with Last-Event-ID), and a final `job` event
+    once it has finished.
+    """
+    if await crud.generation_job.get(db, id=job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        cancel_on_disconnect(request, _stream_job(job_id, last_event_id)),
+        media_type="text/event-stream",
+    )
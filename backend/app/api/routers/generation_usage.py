@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, List
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import schemas
+from app.database import get_db
+from app.services import usage_tracker
+
+router = APIRouter(
+    prefix="/ai/usage",
+    tags=["AI Usage"],
+)
+
+
+@router.get("/stats", response_model=List[schemas.ModelUsageStats])
+async def read_usage_stats(
+    db: Annotated[AsyncSession, Depends(get_db)],
+    window_minutes: Annotated[int, Query(ge=1, le=60 * 24 * 31)] = 60,
+    ai_model_id: int | None = None,
+    route: str | None = None,
+):
+    """
+    Token totals and TTFT, duration and tokens/second percentiles per AI model
+    over the last `window_minutes`.
+    """
+    # Include the generations that finished since the last batch was written
+    await usage_tracker.flush()
+    since = datetime.now(timezone.utc) - timedelta(minutes=window_minutes)
+    return await usage_tracker.stats(
+        db, since=since, ai_model_id=ai_model_id, route=route
+    )
@@ -0,0 +1,16 @@
+from fastapi import APIRouter
+
+from app.core import metrics
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+)
+
+
+@router.get("/")
+async def read_metrics():
+    """
+    Returns the metrics recorded by this worker process.
+    """
+    return metrics.snapshot()
@@ -1,9 +1,11 @@
-from typing import Annotated, List
+from typing import Annotated, Any, Dict, List
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, schemas
+from app.api import bulk
+from app.api.pagination import Pagination
 from app.database import get_db
 
 router = APIRouter(
@@ -21,10 +23,30 @@ async def create_project(
 @router.get("/", response_model=List[schemas.Project])
 async def read_projects(
     db: Annotated[AsyncSession, Depends(get_db)],
-    skip: int = 0,
-    limit: int = 100
+    page: Pagination
 ):
-    return await crud.project.get_multi(db, skip=skip, limit=limit)
+    return await page.fetch(crud.project, db)
+
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.Project])
+async def create_projects(
+    items: Annotated[List[Dict[str, Any]], Body()],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    return await bulk.create(crud.project, db, items, schemas.ProjectCreate)
+
+@router.put("/bulk", response_model=schemas.BulkResult[schemas.Project])
+async def update_projects(
+    items: Annotated[List[Dict[str, Any]], Body()],
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    return await bulk.update(crud.project, db, items, schemas.ProjectBase)
+
+@router.post("/bulk/delete", response_model=schemas.BulkResult[schemas.Project])
+async def delete_projects(
+    req: schemas.BulkDelete,
+    db: Annotated[AsyncSession, Depends(get_db)]
+):
+    return await bulk.remove(crud.project, db, req.ids)
 
 @router.get("/{project_id}", response_model=schemas.Project)
 async def read_project(
@@ -42,20 +64,17 @@ async def update_project(
     project_in: schemas.ProjectBase,
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    db_project = await crud.project.get(db, id=project_id)
+    db_project = await crud.project.update_by_id(db=db, id=project_id, obj_in=project_in)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-
-    return await crud.project.update(db=db, db_obj=db_project, obj_in=project_in)
+    return db_project
 
 @router.delete("/{project_id}", response_model=schemas.Project)
 async def delete_project(
     project_id: int,
     db: Annotated[AsyncSession, Depends(get_db)]
 ):
-    db_project = await crud.project.get(db, id=project_id)
+    db_project = await crud.project.remove(db=db, id=project_id)
     if db_project is None:
         raise HTTPException(status_code=404, detail="Project not found")
-
-    await crud.project.remove(db=db, id=project_id)
     return db_project
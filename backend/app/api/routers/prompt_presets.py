@@ -1,8 +1,10 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, Any, Dict, List
+from fastapi import APIRouter, Body, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import crud, models, schemas
+from app.api import bulk
+from app.api.pagination import Pagination
 from app.database import get_db
 
 router = APIRouter()
@@ -21,16 +23,48 @@ async def create_prompt_preset(
 
 @router.get("/", response_model=List[schemas.PromptPreset])
 async def read_prompt_presets(
+    page: Pagination,
     db: AsyncSession = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
 ):
     """
     Retrieve prompt presets.
     """
-    prompt_presets = await crud.prompt_preset.get_multi(db=db, skip=skip, limit=limit)
+    prompt_presets = await page.fetch(crud.prompt_preset, db)
     return prompt_presets
 
+@router.post("/bulk", response_model=schemas.BulkResult[schemas.PromptPreset])
+async def create_prompt_presets(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    items: Annotated[List[Dict[str, Any]], Body()],
+):
+    """
+    Create several prompt presets; invalid items are reported and the rest created.
+    """
+    return await bulk.create(crud.prompt_preset, db, items, schemas.PromptPresetCreate)
+
+@router.put("/bulk", response_model=schemas.BulkResult[schemas.PromptPreset])
+async def update_prompt_presets(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    items: Annotated[List[Dict[str, Any]], Body()],
+):
+    """
+    Update several prompt presets, each item carrying the id of its preset.
+    """
+    return await bulk.update(crud.prompt_preset, db, items, schemas.PromptPresetUpdate)
+
+@router.post("/bulk/delete", response_model=schemas.BulkResult[schemas.PromptPreset])
+async def delete_prompt_presets(
+    *,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    req: schemas.BulkDelete,
+):
+    """
+    Delete several prompt presets.
+    """
+    return await bulk.remove(crud.prompt_preset, db, req.ids)
+
 @router.put("/{id}", response_model=schemas.PromptPreset)
 async def update_prompt_preset(
     *,
@@ -41,10 +75,9 @@ async def update_prompt_preset(
     """
     Update a prompt preset.
     """
-    prompt_preset = await crud.prompt_preset.get(db=db, id=id)
+    prompt_preset = await crud.prompt_preset.update_by_id(db=db, id=id, obj_in=prompt_preset_in)
     if not prompt_preset:
         raise HTTPException(status_code=404, detail="Prompt preset not found")
-    prompt_preset = await crud.prompt_preset.update(db=db, db_obj=prompt_preset, obj_in=prompt_preset_in)
     return prompt_preset
 
 @router.get("/{id}", response_model=schemas.PromptPreset)
@@ -70,8 +103,7 @@ async def delete_prompt_preset(
     """
     Delete a prompt preset.
     """
-    prompt_preset = await crud.prompt_preset.get(db=db, id=id)
+    prompt_preset = await crud.prompt_preset.remove(db=db, id=id)
     if not prompt_preset:
         raise HTTPException(status_code=404, detail="Prompt preset not found")
-    prompt_preset = await crud.prompt_preset.remove(db=db, id=id)
     return prompt_preset
@@ -1,14 +1,17 @@
-from typing import Annotated, List, Type, TypeVar
+from typing import Annotated, Any, Callable, Dict, List, Optional, Type, TypeVar
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.security import decrypt_data
+from app import schemas
+from app.api import bulk
+from app.api.pagination import Pagination
 from app.crud import crud_setting
 from app.crud.base import CRUDBase
 from app.database import get_db
 from app.schemas import setting as setting_schemas
+from app.services import ai_client_pool, model_config_cache, prompt_templates
 
 # Pydantic models
 ModelType = TypeVar("ModelType", bound=BaseModel)
@@ -25,9 +28,12 @@ def create_settings_router(
     response_model: Type[SchemaInDBType],
     create_schema: Type[CreateSchemaType],
     update_schema: Type[UpdateSchemaType],
+    on_change: Optional[Callable[[int], None]] = None,
 ) -> APIRouter:
     """
     Generic factory to create an async CRUD router for a setting model.
+    `on_change` is called with the item id after an update or delete, e.g. to
+    drop cached derived data.
     """
     router = APIRouter(prefix=prefix, tags=[tag])
     entity_name = tag.rstrip("s")
@@ -37,30 +43,74 @@ def create_settings_router(
         return await crud_instance.create(db=db, obj_in=item_in)
 
     @router.get("/", response_model=List[response_model])
-    async def read_items(
-        db: Annotated[AsyncSession, Depends(get_db)], skip: int = 0, limit: int = 100
-    ):
-        return await crud_instance.get_multi(db, skip=skip, limit=limit)
+    async def read_items(db: Annotated[AsyncSession, Depends(get_db)], page: Pagination):
+        return await page.fetch(crud_instance, db)
+
+    # Registered before the /{item_id} routes, which would also match /bulk
+    _add_bulk_routes(
+        router,
+        crud_instance=crud_instance,
+        response_model=response_model,
+        create_schema=create_schema,
+        update_schema=update_schema,
+        on_change=on_change,
+    )
 
     @router.put("/{item_id}", response_model=response_model)
     async def update_item(
         item_id: int, item_in: update_schema, db: Annotated[AsyncSession, Depends(get_db)]
     ):
-        db_item = await crud_instance.get(db, id=item_id)
+        db_item = await crud_instance.update_by_id(db=db, id=item_id, obj_in=item_in)
         if not db_item:
             raise HTTPException(status_code=404, detail=f"{entity_name} not found")
-        return await crud_instance.update(db=db, db_obj=db_item, obj_in=item_in)
+        if on_change is not None:
+            on_change(item_id)
+        return db_item
 
     @router.delete("/{item_id}", response_model=response_model)
     async def delete_item(item_id: int, db: Annotated[AsyncSession, Depends(get_db)]):
         db_item = await crud_instance.remove(db=db, id=item_id)
         if not db_item:
             raise HTTPException(status_code=404, detail=f"{entity_name} not found")
+        if on_change is not None:
+            on_change(item_id)
         return db_item
 
     return router
 
 
+def _add_bulk_routes(
+    router: APIRouter,
+    *,
+    crud_instance: CRUDBase,
+    response_model: Type[SchemaInDBType],
+    create_schema: Type[CreateSchemaType],
+    update_schema: Type[UpdateSchemaType],
+    on_change: Optional[Callable[[int], None]],
+) -> None:
+    @router.post("/bulk", response_model=schemas.BulkResult[response_model])
+    async def create_items(
+        items: Annotated[List[Dict[str, Any]], Body()],
+        db: Annotated[AsyncSession, Depends(get_db)],
+    ):
+        return await bulk.create(crud_instance, db, items, create_schema)
+
+    @router.put("/bulk", response_model=schemas.BulkResult[response_model])
+    async def update_items(
+        items: Annotated[List[Dict[str, Any]], Body()],
+        db: Annotated[AsyncSession, Depends(get_db)],
+    ):
+        return await bulk.update(
+            crud_instance, db, items, update_schema, on_change=on_change
+        )
+
+    @router.post("/bulk/delete", response_model=schemas.BulkResult[response_model])
+    async def delete_items(
+        req: schemas.BulkDelete, db: Annotated[AsyncSession, Depends(get_db)]
+    ):
+        return await bulk.remove(crud_instance, db, req.ids, on_change=on_change)
+
+
 # --- Create individual CRUD routers using the factory ---
 worldview_router = create_settings_router(
     crud_instance=crud_setting.worldview,
@@ -87,8 +137,25 @@ prompt_template_router = create_settings_router(
     response_model=setting_schemas.PromptTemplateInDB,
     create_schema=setting_schemas.PromptTemplateCreate,
     update_schema=setting_schemas.PromptTemplateBase,
+    on_change=prompt_templates.invalidate,
 )
 
+
+@prompt_template_router.post("/{template_id}/render")
+async def render_prompt_template(
+    template_id: int,
+    req: setting_schemas.PromptTemplateRender,
+    db: Annotated[AsyncSession, Depends(get_db)],
+):
+    template = await crud_setting.prompt_template.get(db, id=template_id)
+    if not template:
+        raise HTTPException(status_code=404, detail="Prompt Template not found")
+    try:
+        text = prompt_templates.get_compiled(template).render(req.variables)
+    except prompt_templates.TemplateError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+    return {"text": text}
+
 # --- AI Model has custom endpoints, so we create it separately ---
 ai_model_router = create_settings_router(
     crud_instance=crud_setting.ai_model,
@@ -102,19 +169,17 @@ ai_model_router = create_settings_router(
 
 @ai_model_router.post("/{model_id}/test-connection")
 async def test_ai_connection(model_id: int, db: Annotated[AsyncSession, Depends(get_db)]):
-    from openai import AsyncOpenAI
-
-    db_model = await crud_setting.ai_model.get(db, id=model_id)
-    if not db_model:
+    model_config = await model_config_cache.get_model_config(db, model_id)
+    if not model_config:
         raise HTTPException(status_code=404, detail="AI Model not found")
 
     try:
-        api_key_to_test = decrypt_data(db_model.api_key)
-        client = AsyncOpenAI(
-            base_url=db_model.api_url,
-            api_key=api_key_to_test,
-        )
-        await client.models.list()
+        async with ai_client_pool.lease(
+            model_config.id,
+            api_url=model_config.api_url,
+            api_key=model_config.api_key,
+        ) as client:
+            await client.models.list()
         return {"status": "success", "message": "连接成功"}
     except Exception as e:
         raise HTTPException(
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,6 +9,87 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "app"
     SECRET_KEY: str = "KPmx9G8G7-ZTKYthOeHy5zHZ3aP8n9NoNwrqTH1KzBY="
 
+    # Connection pool shared by all upstream AI calls of one AIModel
+    AI_HTTP_MAX_CONNECTIONS: int = 100
+    AI_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    AI_HTTP_KEEPALIVE_EXPIRY: float = 60.0
+    AI_HTTP_CONNECT_TIMEOUT: float = 10.0
+    AI_HTTP_READ_TIMEOUT: float = 600.0
+
+    # Seconds a decrypted AIModel config stays in the in-process cache
+    MODEL_CONFIG_CACHE_TTL: float = 300.0
+
+    # SSE frame coalescing: consecutive deltas are merged for at most this long
+    # (0 disables coalescing) or until the merged frame reaches the byte budget
+    SSE_COALESCE_WINDOW_MS: int = 40
+    SSE_COALESCE_MAX_BYTES: int = 2048
+
+    # Opt-in cache of outline generation results (memory LRU + database table)
+    GENERATION_CACHE_ENABLED: bool = False
+    GENERATION_CACHE_MAX_ENTRIES: int = 256
+
+    # Identical in-flight outline generations share one upstream stream
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Per-model admission control (AIModel columns override the concurrency)
+    SCHEDULER_DEFAULT_MAX_CONCURRENCY: int = 8
+    SCHEDULER_MAX_QUEUE: int = 32
+    # Requests that would wait longer than this for the rate limits get a 429
+    SCHEDULER_MAX_RATE_WAIT: float = 30.0
+
+    # Upper bound on concurrent generations of one batch outline request
+    OUTLINE_BATCH_MAX_PARALLEL: int = 4
+
+    # Resumable streams: events kept per stream, how long a finished stream
+    # stays resumable, and how long an unfinished one waits for a reconnect
+    # once its last client disconnected before the upstream is cancelled
+    STREAM_BUFFER_EVENTS: int = 2048
+    STREAM_RESUME_GRACE_SECONDS: float = 120.0
+    STREAM_DETACH_TIMEOUT_SECONDS: float = 5.0
+
+    # Background generation jobs: local workers, how often a running job saves
+    # its partial output, and how many times a job is started before giving up
+    JOB_WORKERS: int = 2
+    JOB_CHECKPOINT_SECONDS: float = 2.0
+    JOB_MAX_ATTEMPTS: int = 3
+    # How long a process owns a running job without renewing its lease; an
+    # expired job is taken to be orphaned and queued again by any process
+    JOB_LEASE_SECONDS: float = 60.0
+
+    # Chat context assembly: window assumed for models without context_window
+    # (None: their prompts are not trimmed unless the request sets a budget),
+    # and the part of it kept free for the reply
+    CONTEXT_DEFAULT_WINDOW: Optional[int] = None
+    CONTEXT_RESPONSE_RESERVE: int = 1024
+
+    # Rolling conversation summaries: once the messages not yet summarized
+    # exceed the trigger, all but the most recent tail are folded into the
+    # conversation's summary (0 disables summarization)
+    SUMMARY_TRIGGER_TOKENS: int = 6000
+    SUMMARY_KEEP_RECENT_TOKENS: int = 2000
+
+    # Hedged streams: wait this long for the primary model's first event
+    # before also sending the request to the fallback model
+    HEDGE_DELAY_MS: int = 2000
+
+    # Upstream retries with jittered exponential backoff (per-model overrides
+    # live on AIModel)
+    UPSTREAM_MAX_RETRIES: int = 2
+    UPSTREAM_RETRY_BASE_DELAY_MS: int = 500
+    UPSTREAM_RETRY_MAX_DELAY_MS: int = 8000
+
+    # Per-generation usage rows are written in batches
+    USAGE_FLUSH_SECONDS: float = 5.0
+    USAGE_FLUSH_ROWS: int = 200
+    # Rows beyond this are dropped while the database is unreachable
+    USAGE_MAX_PENDING_ROWS: int = 10000
+
+    # Largest number of items accepted by a bulk endpoint
+    BULK_MAX_ITEMS: int = 1000
+
+    # How often a streamed assistant reply is appended to its message row
+    CHAT_CHECKPOINT_SECONDS: float = 1.0
+
     @property
     def DATABASE_URL(self) -> str:
         return str(
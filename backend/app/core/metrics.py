@@ -0,0 +1,92 @@
+# backend/app/core/metrics.py
+"""
+Minimal in-process metrics. Values live in the worker process that recorded
+them and are exposed as JSON by the /metrics endpoint.
+"""
+
+from typing import Dict
+
+
+class Counter:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def set(self, value) -> None:
+        self.value = value
+
+    def snapshot(self):
+        return self.value
+
+
+class Summary:
+    """Count, sum and max of observed values (e.g. durations in seconds)."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "max": round(self.max, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+        }
+
+
+_metrics: Dict[str, object] = {}
+
+
+def _key(name: str, labels: Dict[str, object]) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{rendered}}}"
+
+
+def _get(cls, name: str, labels: Dict[str, object]):
+    key = _key(name, labels)
+    metric = _metrics.get(key)
+    if metric is None:
+        metric = _metrics[key] = cls()
+    return metric
+
+
+def counter(name: str, **labels) -> Counter:
+    return _get(Counter, name, labels)
+
+
+def gauge(name: str, **labels) -> Gauge:
+    return _get(Gauge, name, labels)
+
+
+def summary(name: str, **labels) -> Summary:
+    return _get(Summary, name, labels)
+
+
+def snapshot() -> Dict[str, object]:
+    return {key: metric.snapshot() for key, metric in sorted(_metrics.items())}
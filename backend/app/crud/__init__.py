@@ -1,5 +1,7 @@
 from .crud_character import character
 from .crud_conversation import conversation
+from .crud_generation_job import generation_job
+from .crud_generation_usage import generation_usage
 from .crud_message import message
 from .crud_outline_node import outline_node
 from .crud_project import project
@@ -1,10 +1,35 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from pydantic import BaseModel
-from sqlalchemy import inspect, select
+from sqlalchemy import (
+    and_,
+    case,
+    delete,
+    func,
+    insert,
+    inspect,
+    literal,
+    or_,
+    select,
+    update,
+)
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.exc import StaleDataError
 
+from app.crud.pagination import InvalidCursor, Page, decode_cursor, encode_cursor
 from app.database import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
@@ -13,8 +38,28 @@ UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Columns get_page can order by; they must be NOT NULL, as a NULL sort
+    # value cannot be compared in the keyset condition
+    sortable: Tuple[str, ...] = ("id",)
+
     def __init__(self, model: Type[ModelType]):
         self.model = model
+        # Mapper metadata, looked up once per model rather than on each write
+        mapper = inspect(model)
+        self._columns = mapper.columns
+        self._json_columns = frozenset(
+            column.key for column in mapper.columns if isinstance(column.type, JSONB)
+        )
+        self._collections = tuple(
+            relationship.key
+            for relationship in mapper.relationships
+            if relationship.uselist
+        )
+        self._cascades_deletes = any(
+            relationship.cascade.delete for relationship in mapper.relationships
+        )
+        # The ORM bumps version_id_col on flush; the Core updates here must too
+        self._version_column = mapper.version_id_col
 
     async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
         result = await db.execute(select(self.model).filter(self.model.id == id))
@@ -23,16 +68,81 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     async def get_multi(
         self, db: AsyncSession, *, skip: int = 0, limit: int = 100
     ) -> List[ModelType]:
-        result = await db.execute(select(self.model).offset(skip).limit(limit))
+        """Offset pagination, kept for existing clients; prefer get_page."""
+        result = await db.execute(
+            select(self.model).order_by(self.model.id).offset(skip).limit(limit)
+        )
         return result.scalars().all()
 
-    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = obj_in.model_dump()
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+    async def get_page(
+        self,
+        db: AsyncSession,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        order_by: str = "id",
+        descending: bool = False,
+    ) -> Page:
+        """
+        Keyset pagination ordered by (`order_by`, id). `cursor` is the
+        next_cursor of the previous page; raises InvalidCursor for a cursor
+        that is malformed or was made for another ordering. A limit of 0
+        gives an empty page without a cursor.
+        """
+        if order_by not in self.sortable:
+            raise InvalidCursor(f"Cannot order by '{order_by}'")
+        if limit <= 0:
+            return Page([], None)
+        column = getattr(self.model, order_by)
+        id_column = self.model.id
+        keys = [id_column] if order_by == "id" else [column, id_column]
+        query = select(self.model).order_by(
+            *(key.desc() if descending else key for key in keys)
+        )
+        if cursor is not None:
+            value, last_id = decode_cursor(
+                cursor, order_by, descending, column.type.python_type
+            )
+
+            def past(key, bound):
+                return key < bound if descending else key > bound
+
+            if order_by == "id":
+                query = query.where(past(id_column, last_id))
+            else:
+                query = query.where(
+                    or_(
+                        past(column, value),
+                        and_(column == value, past(id_column, last_id)),
+                    )
+                )
+
+        # One extra row tells whether there is a next page
+        result = await db.execute(query.limit(limit + 1))
+        items = list(result.scalars().all())
+        if len(items) <= limit:
+            return Page(items, None)
+        items = items[:limit]
+        last = items[-1]
+        return Page(
+            items,
+            encode_cursor(order_by, descending, getattr(last, order_by), last.id),
+        )
+
+    async def create(
+        self, db: AsyncSession, *, obj_in: Union[CreateSchemaType, Dict[str, Any]]
+    ) -> ModelType:
+        """Inserts the row with one INSERT ... RETURNING."""
+        values = obj_in if isinstance(obj_in, dict) else obj_in.model_dump()
+        result = await db.scalars(
+            insert(self.model).values(**values).returning(self.model)
+        )
+        db_obj = result.one()
+        # A new row has nothing in its collections; marking them loaded saves
+        # a lazy load the detached object could not do
+        for name in self._collections:
+            set_committed_value(db_obj, name, [])
+        return (await self._commit_detached(db, [db_obj]))[0]
 
     async def update(
         self,
@@ -41,36 +151,220 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db_obj: ModelType,
         obj_in: Union[UpdateSchemaType, Dict[str, Any]],
     ) -> ModelType:
+        if self._version_column is None:
+            updated = await self.update_by_id(db, id=db_obj.id, obj_in=obj_in)
+        else:
+            version = getattr(db_obj, self._version_column.key)
+            updated = await self.update_by_id(
+                db, id=db_obj.id, obj_in=obj_in, version=version
+            )
+        return updated if updated is not None else db_obj
+
+    async def update_by_id(
+        self,
+        db: AsyncSession,
+        *,
+        id: int,
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> Optional[ModelType]:
+        """
+        Applies the changes with one UPDATE ... RETURNING, without loading the
+        row first; JSONB dicts are merged into the stored value. Returns None
+        if there is no such row. For a versioned model, `version` is the
+        version the caller read; raises StaleDataError if the row has since
+        been updated.
+        """
+        db_objs = await self._update_rows(
+            db, {id: self._changes(obj_in)}, version=version
+        )
+        if not db_objs and version is not None:
+            await db.rollback()
+            raise StaleDataError(
+                f"{self.model.__name__} {id} is no longer at version {version}"
+            )
+        db_objs = await self._commit_detached(db, db_objs)
+        return db_objs[0] if db_objs else None
+
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[Union[CreateSchemaType, Dict[str, Any]]],
+    ) -> List[ModelType]:
+        """Inserts the rows with one multi-row INSERT ... RETURNING."""
+        if not objs_in:
+            return []
+        rows = [o if isinstance(o, dict) else o.model_dump() for o in objs_in]
+        result = await db.scalars(
+            insert(self.model).returning(self.model, sort_by_parameter_order=True),
+            rows,
+        )
+        return await self._commit_detached(db, result.all())
+
+    async def bulk_update(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Dict[int, Union[UpdateSchemaType, Dict[str, Any]]],
+    ) -> List[ModelType]:
+        """
+        Applies the changes of each id with one UPDATE ... RETURNING, each
+        changed column being set through a CASE on id. JSONB dicts are merged
+        into the stored value as in update(). Ids that do not exist are left
+        out of the result.
+        """
+        if not objs_in:
+            return []
+        db_objs = await self._update_rows(
+            db, {id: self._changes(obj_in) for id, obj_in in objs_in.items()}
+        )
+        return await self._commit_detached(db, db_objs)
+
+    def _changes(
+        self, obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+    ) -> Dict[str, Any]:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
+        return {
+            field: value
+            for field, value in update_data.items()
+            if field in self._columns and field != "id"
+        }
+
+    async def _update_rows(
+        self,
+        db: AsyncSession,
+        changes: Dict[int, Dict[str, Any]],
+        version: Optional[int] = None,
+    ) -> List[ModelType]:
+        """
+        Writes `changes` (by id) in one statement, without committing. A
+        versioned model has its version incremented; `version`, given for a
+        single row, is the version it must still be at.
+        """
+        # PostgreSQL merges JSONB with ||; elsewhere (SQLite in the tests) the
+        # stored values are read and merged here
+        server_merge = db.get_bind().dialect.name == "postgresql"
+        if not server_merge:
+            await self._merge_json(db, changes)
+
+        fields = {field for data in changes.values() for field in data}
+        if not fields:
+            result = await db.scalars(
+                select(self.model).where(self.model.id.in_(changes))
+            )
+            return list(result.all())
+
+        if len(changes) == 1:
+            (data,) = changes.values()
+            values = {
+                field: self._set_value(field, value, server_merge)
+                for field, value in data.items()
+            }
+        else:
+            values = {
+                field: case(
+                    {
+                        id: self._set_value(field, data[field], server_merge)
+                        for id, data in changes.items()
+                        if field in data
+                    },
+                    value=self.model.id,
+                    else_=getattr(self.model, field),
+                )
+                for field in fields
+            }
+        query = update(self.model).where(self.model.id.in_(changes))
+        if self._version_column is not None:
+            values[self._version_column.key] = self._version_column + 1
+            if version is not None:
+                query = query.where(self._version_column == version)
+        result = await db.scalars(
+            query.values(values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+        return list(result.all())
+
+    def _set_value(self, field: str, value: Any, server_merge: bool):
+        column = getattr(self.model, field)
+        new_value = literal(value, self._columns[field].type)
+        if server_merge and field in self._json_columns and isinstance(value, dict):
+            return case(
+                (
+                    func.jsonb_typeof(column) == "object",
+                    column.op("||", return_type=column.type)(new_value),
+                ),
+                else_=new_value,
+            )
+        return new_value
 
-        for field, value in update_data.items():
-            if hasattr(db_obj, field):
-                column_type = inspect(self.model).columns[field].type
-                current_value = getattr(db_obj, field)
-
-                if (
-                    isinstance(column_type, JSONB)
-                    and isinstance(current_value, dict)
-                    and isinstance(value, dict)
-                ):
-                    merged_value = current_value.copy()
-                    merged_value.update(value)
-                    setattr(db_obj, field, merged_value)
-                else:
-                    setattr(db_obj, field, value)
-
-        db.add(db_obj)
+    async def _merge_json(
+        self, db: AsyncSession, changes: Dict[int, Dict[str, Any]]
+    ) -> None:
+        """Merges JSONB dicts in `changes` into the stored values, in one query."""
+        merging = {
+            id: [
+                field
+                for field, value in data.items()
+                if field in self._json_columns and isinstance(value, dict)
+            ]
+            for id, data in changes.items()
+        }
+        merging = {id: fields for id, fields in merging.items() if fields}
+        if not merging:
+            return
+        json_fields = sorted({field for fields in merging.values() for field in fields})
+        result = await db.execute(
+            select(self.model.id, *(getattr(self.model, f) for f in json_fields)).where(
+                self.model.id.in_(merging)
+            )
+        )
+        for row in result:
+            for field in merging[row.id]:
+                current = getattr(row, field)
+                if isinstance(current, dict):
+                    changes[row.id][field] = {**current, **changes[row.id][field]}
+
+    async def bulk_remove(
+        self, db: AsyncSession, *, ids: Sequence[int]
+    ) -> List[ModelType]:
+        """
+        Deletes the rows with one DELETE ... RETURNING. Ids that do not exist
+        are left out of the result.
+        """
+        if not ids:
+            return []
+        result = await db.scalars(
+            delete(self.model)
+            .where(self.model.id.in_(ids))
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+        return await self._commit_detached(db, result.all())
+
+    async def _commit_detached(
+        self, db: AsyncSession, db_objs: Sequence[ModelType]
+    ) -> List[ModelType]:
+        # RETURNING already loaded the rows as committed, so they are detached
+        # instead of being expired by the commit and refreshed one by one
+        db_objs = list(db_objs)
+        for db_obj in db_objs:
+            db.expunge(db_obj)
         await db.commit()
-        await db.refresh(db_obj)
-        return db_obj
+        return db_objs
 
     async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
-        result = await db.execute(select(self.model).filter(self.model.id == id))
-        obj = result.scalars().first()
-        if obj:
-            await db.delete(obj)
-            await db.commit()
-        return obj
+        if self._cascades_deletes:
+            # The ORM deletes the related rows that the database does not
+            result = await db.execute(select(self.model).filter(self.model.id == id))
+            obj = result.scalars().first()
+            if obj:
+                await db.delete(obj)
+                await db.commit()
+            return obj
+        db_objs = await self.bulk_remove(db, ids=[id])
+        return db_objs[0] if db_objs else None
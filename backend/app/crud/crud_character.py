@@ -4,7 +4,7 @@ from app.schemas.character import CharacterCreate, CharacterUpdate
 
 
 class CRUDCharacter(CRUDBase[Character, CharacterCreate, CharacterUpdate]):
-    pass
+    sortable = ("id", "name")
 
 
 character = CRUDCharacter(Character)
@@ -1,18 +1,26 @@
-from typing import Any, Dict, Union
+from typing import Any, Dict, Optional, Union
 
 from pydantic import BaseModel
-from sqlalchemy import select
+from sqlalchemy import delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.crud.base import CRUDBase
+from app.crud.crud_message import message as message_crud
+from app.crud.pagination import Page, decode_cursor, encode_cursor
 from app.models.conversation import Conversation
+from app.models.conversation_summary import ConversationSummary
 from app.models.message import Message
-from app.schemas.conversation import ConversationCreate
+from app.schemas.conversation import ConversationCreate, ConversationUpdate
+
+# Characters of the last message shown in the conversation index
+PREVIEW_CHARS = 80
 
 
 class CRUDConversation(CRUDBase[Conversation, ConversationCreate, BaseModel]):
-    async def create(self, db: AsyncSession, *, obj_in: ConversationCreate) -> Conversation:
+    async def create(
+        self, db: AsyncSession, *, obj_in: ConversationCreate
+    ) -> Conversation:
         # Create the Conversation object without messages first
         conversation_data = obj_in.dict(exclude={"messages"})
         db_conversation = Conversation(**conversation_data)
@@ -28,7 +36,8 @@ class CRUDConversation(CRUDBase[Conversation, ConversationCreate, BaseModel]):
             db.add(db_message)
 
         await db.commit()
-        await db.refresh(db_conversation) # Refresh again to establish relationships in the session
+        # Refresh again to establish relationships in the session
+        await db.refresh(db_conversation)
 
         # Finally, re-fetch the object with the relationship explicitly loaded for the response
         stmt = (
@@ -39,7 +48,9 @@ class CRUDConversation(CRUDBase[Conversation, ConversationCreate, BaseModel]):
         result = await db.execute(stmt)
         return result.scalar_one()
 
-    async def get_with_messages(self, db: AsyncSession, *, id: int) -> Conversation | None:
+    async def get_with_messages(
+        self, db: AsyncSession, *, id: int
+    ) -> Conversation | None:
         stmt = (
             select(self.model)
             .options(selectinload(self.model.messages))
@@ -48,34 +59,98 @@ class CRUDConversation(CRUDBase[Conversation, ConversationCreate, BaseModel]):
         result = await db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_index(
+        self,
+        db: AsyncSession,
+        *,
+        project_id: Optional[int] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+    ) -> Page:
+        """
+        A page of conversations, newest first, each with its message count
+        and the time and start of its last message; no message is loaded in
+        full. Raises InvalidCursor for a bad cursor.
+        """
+        query = select(
+            Conversation.id,
+            Conversation.title,
+            Conversation.project_id,
+            Conversation.created_at,
+            select(func.count(Message.id))
+            .where(Message.conversation_id == Conversation.id)
+            .scalar_subquery()
+            .label("message_count"),
+            select(func.max(Message.id))
+            .where(Message.conversation_id == Conversation.id)
+            .scalar_subquery()
+            .label("last_message_id"),
+        )
+        if project_id is not None:
+            query = query.where(Conversation.project_id == project_id)
+        if cursor is not None:
+            _, last_id = decode_cursor(cursor, "id", True, int)
+            query = query.where(Conversation.id < last_id)
+        # One extra row tells whether there is a next page
+        page = query.order_by(Conversation.id.desc()).limit(limit + 1).subquery()
+
+        result = await db.execute(
+            select(
+                page.c.id,
+                page.c.title,
+                page.c.project_id,
+                page.c.created_at,
+                page.c.message_count,
+                Message.created_at.label("last_message_at"),
+                func.substr(Message.content, 1, PREVIEW_CHARS).label("preview"),
+            )
+            .outerjoin(Message, Message.id == page.c.last_message_id)
+            .order_by(page.c.id.desc())
+        )
+        rows = result.all()
+        if len(rows) <= limit:
+            return Page(rows, None)
+        rows = rows[:limit]
+        return Page(rows, encode_cursor("id", True, rows[-1].id, rows[-1].id))
+
     async def update(
         self,
         db: AsyncSession,
         *,
         db_obj: Conversation,
-        obj_in: Union[ConversationCreate, Dict[str, Any]],
+        obj_in: Union[ConversationUpdate, Dict[str, Any]],
     ) -> Conversation:
+        """
+        Updates the title and synchronizes the messages (see
+        crud.message.sync); `db_obj` must have its messages loaded.
+        """
         conversation_id = db_obj.id  # Store ID before the session expires the object
         if isinstance(obj_in, dict):
-            update_data = obj_in
-        else:
-            update_data = obj_in.dict(exclude_unset=True)
+            obj_in = ConversationUpdate.model_validate(obj_in)
 
-        # Update conversation fields
-        db_obj.title = update_data.get("title", db_obj.title)
-
-        # Replace messages
-        if "messages" in update_data:
-            # Delete old messages
-            for message in db_obj.messages:
-                await db.delete(message)
+        if "title" in obj_in.model_fields_set:
+            await db.execute(
+                update(Conversation)
+                .where(Conversation.id == conversation_id)
+                .values(title=obj_in.title)
+            )
 
-            # Create new messages
-            for message_in in update_data["messages"]:
-                db_message = Message(**message_in, conversation_id=db_obj.id)
-                db.add(db_message)
+        if obj_in.messages is not None:
+            first_changed = await message_crud.sync(
+                db,
+                conversation_id=conversation_id,
+                stored=sorted(db_obj.messages, key=lambda m: m.id),
+                messages=obj_in.messages,
+            )
+            if first_changed is not None:
+                # The summary no longer matches messages it folded in
+                await db.execute(
+                    delete(ConversationSummary).where(
+                        ConversationSummary.conversation_id == conversation_id,
+                        ConversationSummary.last_message_id >= first_changed,
+                    )
+                )
 
-        db.add(db_obj)
         await db.commit()
 
         # Re-fetch to ensure relationships are loaded for the response
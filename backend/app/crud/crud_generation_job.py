@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app.crud.base import CRUDBase
+from app.models.generation_job import GenerationJob, JobStatus
+from app.schemas.generation_job import GenerationJob as GenerationJobSchema
+
+
+class CRUDGenerationJob(
+    CRUDBase[GenerationJob, GenerationJobSchema, GenerationJobSchema]
+):
+    async def submit(
+        self, db: AsyncSession, *, kind: str, params: Dict[str, Any]
+    ) -> GenerationJob:
+        return await self.create(
+            db, obj_in={"kind": kind, "params": params, "status": JobStatus.QUEUED}
+        )
+
+    async def set_fields(self, db: AsyncSession, id: int, **values: Any) -> None:
+        """Updates a job's columns in one statement and commits."""
+        await db.execute(update(self.model).where(self.model.id == id).values(**values))
+        await db.commit()
+
+    async def claim(
+        self, db: AsyncSession, id: int, *, worker: str, lease_seconds: float
+    ) -> bool:
+        """
+        Marks a queued job as running under `worker`'s lease; False if it is
+        not queued (any more). On PostgreSQL a job another process is claiming
+        is skipped rather than waited for.
+        """
+        queued = (
+            select(self.model.id)
+            .where(self.model.id == id, self.model.status == JobStatus.QUEUED)
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id.in_(queued))
+            .values(
+                status=JobStatus.RUNNING,
+                attempts=self.model.attempts + 1,
+                started_at=func.now(),
+                claimed_by=worker,
+                lease_expires_at=_lease_until(lease_seconds),
+                content=None,
+                reasoning_chars=0,
+                content_chars=0,
+            )
+        )
+        await db.commit()
+        return result.rowcount == 1
+
+    async def renew_leases(
+        self, db: AsyncSession, *, worker: str, lease_seconds: float
+    ) -> None:
+        """Extends the leases of the jobs `worker` is running."""
+        await db.execute(
+            update(self.model)
+            .where(
+                self.model.claimed_by == worker,
+                self.model.status == JobStatus.RUNNING,
+            )
+            .values(lease_expires_at=_lease_until(lease_seconds))
+        )
+        await db.commit()
+
+    async def release_leases(self, db: AsyncSession, *, worker: str) -> None:
+        """Expires the leases of `worker`'s running jobs, so they are picked up
+        again without waiting for the lease to run out."""
+        await db.execute(
+            update(self.model)
+            .where(
+                self.model.claimed_by == worker,
+                self.model.status == JobStatus.RUNNING,
+            )
+            .values(lease_expires_at=None)
+        )
+        await db.commit()
+
+    async def requeue_expired(
+        self, db: AsyncSession, *, max_attempts: int
+    ) -> List[int]:
+        """
+        Puts running jobs whose lease expired (their process stopped) back in
+        the queue and returns their ids, oldest first. Jobs that were already
+        started `max_attempts` times are failed instead.
+        """
+        expired = (
+            select(self.model.id)
+            .where(
+                self.model.status == JobStatus.RUNNING,
+                or_(
+                    self.model.lease_expires_at.is_(None),
+                    self.model.lease_expires_at < datetime.now(timezone.utc),
+                ),
+            )
+            .with_for_update(skip_locked=True)
+        )
+        result = await db.execute(expired)
+        ids = list(result.scalars().all())
+        if not ids:
+            await db.commit()
+            return []
+        await db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids), self.model.attempts >= max_attempts)
+            .values(
+                status=JobStatus.FAILED,
+                error="Gave up after repeated interruptions",
+                finished_at=func.now(),
+            )
+        )
+        result = await db.execute(
+            update(self.model)
+            .where(self.model.id.in_(ids), self.model.status == JobStatus.RUNNING)
+            .values(status=JobStatus.QUEUED, claimed_by=None, lease_expires_at=None)
+            .returning(self.model.id)
+        )
+        requeued = sorted(result.scalars().all())
+        await db.commit()
+        return requeued
+
+    async def requeue_unfinished(
+        self, db: AsyncSession, *, max_attempts: int
+    ) -> List[int]:
+        """
+        Requeues the jobs of stopped processes (see requeue_expired) and
+        returns the ids of all queued jobs, oldest first.
+        """
+        await self.requeue_expired(db, max_attempts=max_attempts)
+        result = await db.execute(
+            select(self.model.id)
+            .where(self.model.status == JobStatus.QUEUED)
+            .order_by(self.model.id)
+        )
+        ids = list(result.scalars().all())
+        await db.commit()
+        return ids
+
+
+def _lease_until(lease_seconds: float) -> datetime:
+    # Leases are compared across processes, so they are set from UTC wall time
+    return datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+
+
+generation_job = CRUDGenerationJob(GenerationJob)
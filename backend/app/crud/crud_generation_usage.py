@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from pydantic import BaseModel
+from sqlalchemy import Row, Select, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.generation_usage import GenerationUsage
+
+# Percentiles of the statistics, and the max as PERCENTILES[-1]
+PERCENTILES = (("p50", 0.50), ("p90", 0.90), ("p99", 0.99), ("max", 1.0))
+
+
+class CRUDGenerationUsage(CRUDBase[GenerationUsage, BaseModel, BaseModel]):
+    async def insert_many(
+        self, db: AsyncSession, *, rows: List[Dict[str, Any]]
+    ) -> None:
+        """Inserts usage rows in a single executemany statement and commits."""
+        if not rows:
+            return
+        await db.execute(insert(self.model), rows)
+        await db.commit()
+
+    def _window(
+        self,
+        query,
+        since: datetime,
+        ai_model_id: Optional[int],
+        route: Optional[str],
+    ):
+        query = query.where(self.model.created_at >= since)
+        if ai_model_id is not None:
+            query = query.where(self.model.ai_model_id == ai_model_id)
+        if route is not None:
+            query = query.where(self.model.route == route)
+        return query
+
+    async def aggregate_since(
+        self,
+        db: AsyncSession,
+        *,
+        since: datetime,
+        ai_model_id: Optional[int] = None,
+        route: Optional[str] = None,
+    ) -> Sequence[Row]:
+        """
+        The usage statistics of rows created since `since`, one row per model,
+        computed by the database (PostgreSQL only). Timing columns are named
+        `<column>_<percentile>` after PERCENTILES, NULL when there is no value.
+        """
+        result = await db.execute(
+            self.aggregate_query(since=since, ai_model_id=ai_model_id, route=route)
+        )
+        return result.all()
+
+    def aggregate_query(
+        self,
+        *,
+        since: datetime,
+        ai_model_id: Optional[int],
+        route: Optional[str],
+    ) -> Select:
+        ok = self.model.status == "ok"
+        timings = [
+            (self.model.ttft_ms, None),
+            (self.model.duration_ms, ok),
+            (self.model.tokens_per_second, None),
+        ]
+        percentiles = []
+        for column, condition in timings:
+            for name, fraction in PERCENTILES:
+                # Nearest rank, as summarize() computes it
+                aggregate = func.percentile_disc(fraction).within_group(column)
+                if condition is not None:
+                    aggregate = aggregate.filter(condition)
+                percentiles.append(aggregate.label(f"{column.key}_{name}"))
+
+        query = select(
+            self.model.ai_model_id,
+            func.count().label("requests"),
+            func.count().filter(self.model.status == "error").label("errors"),
+            func.count().filter(self.model.status == "cancelled").label("cancelled"),
+            func.sum(self.model.prompt_tokens).label("prompt_tokens"),
+            func.sum(self.model.completion_tokens).label("completion_tokens"),
+            func.sum(self.model.reasoning_tokens).label("reasoning_tokens"),
+            *percentiles,
+        )
+        query = self._window(query, since, ai_model_id, route)
+        return query.group_by(self.model.ai_model_id).order_by(
+            self.model.ai_model_id.asc().nulls_last()
+        )
+
+    async def get_since(
+        self,
+        db: AsyncSession,
+        *,
+        since: datetime,
+        ai_model_id: Optional[int] = None,
+        route: Optional[str] = None,
+    ) -> Sequence[Row]:
+        """The columns the usage statistics need, for rows created since `since`."""
+        query = select(
+            self.model.ai_model_id,
+            self.model.status,
+            self.model.prompt_tokens,
+            self.model.completion_tokens,
+            self.model.reasoning_tokens,
+            self.model.ttft_ms,
+            self.model.duration_ms,
+            self.model.tokens_per_second,
+        )
+        result = await db.execute(self._window(query, since, ai_model_id, route))
+        return result.all()
+
+
+generation_usage = CRUDGenerationUsage(GenerationUsage)
@@ -1,10 +1,101 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.crud.base import CRUDBase
 from app.models.message import Message
-from app.schemas.message import MessageCreate
+from app.schemas.message import MessageCreate, MessageUpdate
 
 
 class CRUDMessage(CRUDBase[Message, MessageCreate, MessageCreate]):
-    pass
+    async def append(
+        self, db: AsyncSession, *, conversation_id: int, objs_in: List[MessageCreate]
+    ) -> List[int]:
+        """Adds messages to the end of a conversation and returns their ids."""
+        db_objs = [
+            Message(**obj_in.model_dump(), conversation_id=conversation_id)
+            for obj_in in objs_in
+        ]
+        db.add_all(db_objs)
+        await db.flush()
+        ids = [db_obj.id for db_obj in db_objs]
+        await db.commit()
+        return ids
+
+    async def sync(
+        self,
+        db: AsyncSession,
+        *,
+        conversation_id: int,
+        stored: List[Message],
+        messages: List[MessageUpdate],
+    ) -> Optional[int]:
+        """
+        Writes only the difference between a conversation's `stored` messages
+        (oldest first) and `messages`, without committing. Each message is
+        matched to the stored one at its position and updated if it changed;
+        stored messages past the end are deleted and the extra ones inserted.
+        A message carrying the id of a different stored message means the
+        history was rewritten from there, so the rest is replaced. Returns the
+        lowest id of the changed and deleted messages, if any.
+        """
+        changed: Dict[int, Dict[str, Any]] = {}
+        kept = 0
+        for db_message, message in zip(stored, messages):
+            if message.id is not None and message.id != db_message.id:
+                break
+            # Fields the client left out (e.g. reasoning) are kept as stored
+            values = message.model_dump(exclude={"id"}, exclude_unset=True)
+            if any(getattr(db_message, f) != v for f, v in values.items()):
+                changed[db_message.id] = values
+            kept += 1
+
+        removed = [db_message.id for db_message in stored[kept:]]
+        if removed:
+            await db.execute(
+                delete(Message)
+                .where(Message.id.in_(removed))
+                .execution_options(synchronize_session=False)
+            )
+        if changed:
+            await self._update_rows(db, changed)
+        if messages[kept:]:
+            await db.execute(
+                insert(Message),
+                [
+                    {**m.model_dump(exclude={"id"}), "conversation_id": conversation_id}
+                    for m in messages[kept:]
+                ],
+            )
+        touched = [*changed, *removed]
+        return min(touched) if touched else None
+
+    async def append_text(
+        self, db: AsyncSession, *, id: int, content: str = "", reasoning: str = ""
+    ) -> None:
+        """Appends to a message's content and reasoning in the database."""
+        values = {}
+        if content:
+            values["content"] = Message.content + content
+        if reasoning:
+            values["reasoning_content"] = (
+                func.coalesce(Message.reasoning_content, "") + reasoning
+            )
+        if not values:
+            return
+        await db.execute(update(Message).where(Message.id == id).values(**values))
+        await db.commit()
+
+    async def delete_if_empty(self, db: AsyncSession, *, id: int) -> None:
+        await db.execute(
+            delete(Message).where(
+                Message.id == id,
+                Message.content == "",
+                Message.reasoning_content.is_(None),
+            )
+        )
+        await db.commit()
 
 
 message = CRUDMessage(Message)
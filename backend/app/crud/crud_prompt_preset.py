@@ -3,6 +3,6 @@ from app.models.prompt_preset import PromptPreset
 from app.schemas.prompt_preset import PromptPresetCreate, PromptPresetUpdate
 
 class CRUDPromptPreset(CRUDBase[PromptPreset, PromptPresetCreate, PromptPresetUpdate]):
-    pass
+    sortable = ("id", "name")
 
 prompt_preset = CRUDPromptPreset(PromptPreset)
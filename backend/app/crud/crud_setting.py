@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Sequence
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,13 +7,14 @@ from app.core.security import encrypt_data
 from app.crud.base import CRUDBase
 from app.models import setting as models
 from app.schemas import setting as schemas
+from app.services import ai_client_pool, model_config_cache
 
 
 # CRUD for Worldview
 class CRUDWorldview(
     CRUDBase[models.Worldview, schemas.WorldviewCreate, schemas.WorldviewBase]
 ):
-    pass
+    sortable = ("id", "name")
 
 
 worldview = CRUDWorldview(models.Worldview)
@@ -23,7 +24,7 @@ worldview = CRUDWorldview(models.Worldview)
 class CRUDWritingStyle(
     CRUDBase[models.WritingStyle, schemas.WritingStyleCreate, schemas.WritingStyleBase]
 ):
-    pass
+    sortable = ("id", "name")
 
 
 writing_style = CRUDWritingStyle(models.WritingStyle)
@@ -35,7 +36,19 @@ class CRUDPromptTemplate(
         models.PromptTemplate, schemas.PromptTemplateCreate, schemas.PromptTemplateBase
     ]
 ):
-    pass
+    sortable = ("id", "name")
+
+    async def get_by_name(
+        self, db: AsyncSession, *, name: str
+    ) -> Optional[models.PromptTemplate]:
+        """The oldest template with this name (names are not unique)."""
+        result = await db.execute(
+            select(self.model)
+            .where(self.model.name == name)
+            .order_by(self.model.id)
+            .limit(1)
+        )
+        return result.scalars().first()
 
 
 prompt_template = CRUDPromptTemplate(models.PromptTemplate)
@@ -59,34 +72,39 @@ class CRUDGeneratedOutline(
         )
         return result.scalars().all()
 
+    async def create_many(
+        self, db: AsyncSession, *, objs_in: List[schemas.GeneratedOutlineCreate]
+    ) -> List[int]:
+        """Inserts several outlines in one transaction and returns their ids."""
+        db_objs = [self.model(**obj_in.model_dump()) for obj_in in objs_in]
+        db.add_all(db_objs)
+        await db.flush()
+        ids = [db_obj.id for db_obj in db_objs]
+        await db.commit()
+        return ids
+
 
 generated_outline = CRUDGeneratedOutline(models.GeneratedOutline)
 
 
 # CRUD for AIModel
 class CRUDAIModel(CRUDBase[models.AIModel, schemas.AIModelCreate, schemas.AIModelBase]):
+    sortable = ("id", "name")
+
     async def create(
         self, db: AsyncSession, *, obj_in: schemas.AIModelCreate
     ) -> models.AIModel:
-        db_obj = models.AIModel(
-            name=obj_in.name,
-            api_url=obj_in.api_url,
-            api_key=encrypt_data(obj_in.api_key),
-            model_name=obj_in.model_name,
-            model_type=obj_in.model_type,
-        )
-        db.add(db_obj)
-        await db.commit()
-        await db.refresh(db_obj)
+        # Encrypts the key and invalidates the cached config
+        (db_obj,) = await self.bulk_create(db, objs_in=[obj_in])
         return db_obj
 
-    async def update(
+    async def update_by_id(
         self,
         db: AsyncSession,
         *,
-        db_obj: models.AIModel,
+        id: int,
         obj_in: schemas.AIModelBase | Dict[str, Any],
-    ) -> models.AIModel:
+    ) -> Optional[models.AIModel]:
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -95,7 +113,67 @@ class CRUDAIModel(CRUDBase[models.AIModel, schemas.AIModelCreate, schemas.AIMode
         if "api_key" in update_data and update_data["api_key"]:
             update_data["api_key"] = encrypt_data(update_data["api_key"])
 
-        return await super().update(db, db_obj=db_obj, obj_in=update_data)
+        if "api_url" in update_data or "api_key" in update_data:
+            # Connection settings changed: the pooled client must be rebuilt
+            ai_client_pool.invalidate(id)
+
+        db_obj = await super().update_by_id(db, id=id, obj_in=update_data)
+        model_config_cache.invalidate(id)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[models.AIModel]:
+        obj = await super().remove(db, id=id)
+        if obj:
+            ai_client_pool.invalidate(id)
+            model_config_cache.invalidate(id)
+        return obj
+
+    async def bulk_create(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Sequence[schemas.AIModelCreate | Dict[str, Any]],
+    ) -> List[models.AIModel]:
+        rows = []
+        for obj_in in objs_in:
+            row = obj_in if isinstance(obj_in, dict) else obj_in.model_dump()
+            rows.append({**row, "api_key": encrypt_data(row["api_key"])})
+        db_objs = await super().bulk_create(db, objs_in=rows)
+        for db_obj in db_objs:
+            model_config_cache.invalidate(db_obj.id)
+        return db_objs
+
+    async def bulk_update(
+        self,
+        db: AsyncSession,
+        *,
+        objs_in: Dict[int, schemas.AIModelBase | Dict[str, Any]],
+    ) -> List[models.AIModel]:
+        changes = {}
+        for id, obj_in in objs_in.items():
+            if isinstance(obj_in, dict):
+                update_data = dict(obj_in)
+            else:
+                update_data = obj_in.model_dump(exclude_unset=True)
+            if update_data.get("api_key"):
+                update_data["api_key"] = encrypt_data(update_data["api_key"])
+            changes[id] = update_data
+
+        db_objs = await super().bulk_update(db, objs_in=changes)
+        for db_obj in db_objs:
+            if "api_url" in changes[db_obj.id] or "api_key" in changes[db_obj.id]:
+                ai_client_pool.invalidate(db_obj.id)
+            model_config_cache.invalidate(db_obj.id)
+        return db_objs
+
+    async def bulk_remove(
+        self, db: AsyncSession, *, ids: Sequence[int]
+    ) -> List[models.AIModel]:
+        db_objs = await super().bulk_remove(db, ids=ids)
+        for db_obj in db_objs:
+            ai_client_pool.invalidate(db_obj.id)
+            model_config_cache.invalidate(db_obj.id)
+        return db_objs
 
 
 ai_model = CRUDAIModel(models.AIModel)
@@ -0,0 +1,52 @@
+"""
+Opaque keyset cursors. A cursor holds the sort key, direction, and the sort
+value and id of the last row of a page; the next page starts strictly after
+that (value, id) pair, so it is found through the index instead of by
+skipping rows, and rows inserted or deleted meanwhile do not shift pages.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, NamedTuple, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class Page(NamedTuple):
+    items: list
+    # None on the last page
+    next_cursor: Optional[str]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(order_by: str, descending: bool, value: Any, id: int) -> str:
+    payload = json.dumps(
+        [order_by, descending, _encode_value(value), id], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, order_by: str, descending: bool, python_type: type
+) -> Tuple[Any, int]:
+    """The (sort value, id) of a cursor made for the same ordering."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key, direction, value, id = json.loads(base64.urlsafe_b64decode(padded))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+    if key != order_by or direction != descending or not isinstance(id, int):
+        raise InvalidCursor("Cursor does not match the requested ordering")
+    if python_type is datetime and isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif not isinstance(value, (python_type, type(None))):
+        raise InvalidCursor("Malformed cursor")
+    return value, id
@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -6,14 +8,33 @@ from app.api.routers import (
     ai_generation,
     characters,
     conversations,
+    generation_jobs,
+    generation_usage,
+    metrics,
     outline_nodes,
     projects,
     settings,
     prompt_presets,
 )
+from app.services import ai_client_pool, job_queue, usage_tracker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await usage_tracker.start()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await usage_tracker.stop()
+    # Close the pooled upstream AI connections
+    await ai_client_pool.close_all()
+
 
 app = FastAPI(
-    title="A AI Writing System", description="Using AI to Write", version="0.1.01"
+    title="A AI Writing System",
+    description="Using AI to Write",
+    version="0.1.01",
+    lifespan=lifespan,
 )
 
 origins = [
@@ -27,6 +48,13 @@ app.add_middleware(
     allow_credentials=True,  # 支持 cookie
     allow_methods=["*"],  # 允许所有方法
     allow_headers=["*"],  # 允许所有请求头
+    expose_headers=[
+        "X-Stream-Id",
+        "X-Generation-Cache",
+        "X-Context-Tokens",
+        "X-Assistant-Message-Id",
+        "X-Next-Cursor",
+    ],
 )
 
 setup_logging()
@@ -35,6 +63,8 @@ app.include_router(projects.router, prefix="/api/v1", tags=["projects"])
 app.include_router(outline_nodes.router, prefix="/api/v1", tags=["outline-nodes"])
 app.include_router(settings.router, prefix="/api/v1", tags=["settings"])
 app.include_router(ai_generation.router, prefix="/api/v1", tags=["ai"])
+app.include_router(generation_jobs.router, prefix="/api/v1", tags=["ai"])
+app.include_router(generation_usage.router, prefix="/api/v1", tags=["ai"])
 app.include_router(
     conversations.router, prefix="/api/v1/conversations", tags=["conversations"]
 )
@@ -43,6 +73,8 @@ app.include_router(
     prompt_presets.router, prefix="/api/v1/prompt-presets", tags=["prompt_presets"]
 )
 
+app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
+
 
 @app.get("/")
 def get_root():
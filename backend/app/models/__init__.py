@@ -1,5 +1,9 @@
 from .character import Character
 from .conversation import Conversation
+from .conversation_summary import ConversationSummary
+from .generation_cache import GenerationCacheEntry
+from .generation_job import GenerationJob
+from .generation_usage import GenerationUsage
 from .message import Message
 from .outline_node import OutlineNode
 from .project import Project
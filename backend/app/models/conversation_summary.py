@@ -0,0 +1,23 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ConversationSummary(Base):
+    __tablename__ = "conversation_summaries"
+
+    # One rolling summary per conversation
+    conversation_id = Column(
+        Integer, ForeignKey("conversations.id", ondelete="CASCADE"), primary_key=True
+    )
+    # Inclusive range of the message ids folded into the summary
+    first_message_id = Column(Integer, nullable=False)
+    last_message_id = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    ai_model_id = Column(
+        Integer, ForeignKey("ai_models.id", ondelete="SET NULL"), nullable=True
+    )
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
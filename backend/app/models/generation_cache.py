@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class GenerationCacheEntry(Base):
+    __tablename__ = "generation_cache_entries"
+
+    # sha256 of (model, rendered prompt, sampling params)
+    key = Column(String(64), primary_key=True)
+    ai_model_id = Column(
+        Integer,
+        ForeignKey("ai_models.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    content = Column(Text, nullable=False)
+    reasoning = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
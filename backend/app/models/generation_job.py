@@ -0,0 +1,49 @@
+import enum
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.database import Base
+from app.database_types import JsonEncodedDict
+
+# Use JSONB for PostgreSQL, and a JSON-like type for other databases (like SQLite in tests)
+JSON_TYPE = JSONB().with_variant(JsonEncodedDict, "sqlite")
+
+
+class JobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class GenerationJob(Base):
+    __tablename__ = "generation_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # e.g. "outline"
+    status = Column(
+        Enum(JobStatus), default=JobStatus.QUEUED, nullable=False, index=True
+    )
+    params = Column(JSON_TYPE, nullable=False)  # The submitted request
+    attempts = Column(Integer, default=0, nullable=False)
+
+    # The process running the job, which renews the lease while it is alive
+    claimed_by = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Progress, checkpointed while the generation streams
+    content = Column(Text, nullable=True)
+    reasoning_chars = Column(Integer, default=0, nullable=False)
+    content_chars = Column(Integer, default=0, nullable=False)
+
+    # Result
+    error = Column(Text, nullable=True)
+    generated_outline_id = Column(
+        Integer, ForeignKey("generated_outlines.id", ondelete="SET NULL"), nullable=True
+    )
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
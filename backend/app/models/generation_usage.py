@@ -0,0 +1,49 @@
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class GenerationUsage(Base):
+    """One upstream generation: its token usage and timings."""
+
+    __tablename__ = "generation_usage"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ai_model_id = Column(
+        Integer, ForeignKey("ai_models.id", ondelete="SET NULL"), nullable=True
+    )
+    route = Column(String, nullable=False)  # e.g. "chat", "outline", "summary"
+    project_id = Column(
+        Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True
+    )
+    status = Column(String, nullable=False)  # "ok", "error" or "cancelled"
+
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    reasoning_tokens = Column(Integer, default=0, nullable=False)
+    # True when the upstream reported no usage and the counts are estimates
+    usage_estimated = Column(Boolean, default=False, nullable=False)
+
+    # Milliseconds from the request (including the scheduler wait) to the
+    # first reasoning or content token, and to the end of the stream
+    ttft_ms = Column(Float, nullable=True)
+    duration_ms = Column(Float, nullable=False)
+    # Completion tokens per second after the first token
+    tokens_per_second = Column(Float, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_generation_usage_model_created", "ai_model_id", "created_at"),
+        Index("ix_generation_usage_created", "created_at"),
+    )
@@ -46,6 +46,10 @@ class PromptTemplate(Base):
     category = Column(Enum(PromptCategory))
     template_text = Column(Text, nullable=False)
     variables = Column(JSON_TYPE)
+    # Incremented on every update; keys the compiled template cache
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
 class GeneratedOutline(Base):
     __tablename__ = "generated_outlines"
@@ -82,3 +86,16 @@ class AIModel(Base):
     api_key = Column(String, nullable=False) # In a real app, this should be encrypted
     model_name = Column(String, nullable=False)
     model_type = Column(Enum(ModelType), nullable=False)
+
+    # Admission control; NULL means the server default / unlimited
+    max_concurrency = Column(Integer, nullable=True)
+    requests_per_minute = Column(Integer, nullable=True)
+    tokens_per_minute = Column(Integer, nullable=True)
+
+    # Context window in tokens; NULL means CONTEXT_DEFAULT_WINDOW, if set
+    context_window = Column(Integer, nullable=True)
+
+    # Upstream retry policy; NULL means UPSTREAM_MAX_RETRIES and
+    # UPSTREAM_RETRY_BASE_DELAY_MS
+    max_retries = Column(Integer, nullable=True)
+    retry_base_delay_ms = Column(Integer, nullable=True)
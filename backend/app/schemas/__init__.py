@@ -1,6 +1,15 @@
+from .bulk import BulkDelete, BulkItemError, BulkResult
 from .character import Character, CharacterCreate, CharacterUpdate
-from .conversation import Conversation, ConversationBase, ConversationCreate
-from .message import Message, MessageBase, MessageCreate
+from .conversation import (
+    Conversation,
+    ConversationBase,
+    ConversationCreate,
+    ConversationListItem,
+    ConversationUpdate,
+)
+from .generation_job import GenerationJob
+from .generation_usage import ModelUsageStats, Percentiles
+from .message import Message, MessageBase, MessageCreate, MessageUpdate
 from .outline_node import OutlineNode, OutlineNodeBase, OutlineNodeCreate
 from .project import Project, ProjectBase, ProjectCreate
 from .prompt_preset import PromptPreset, PromptPresetCreate, PromptPresetUpdate
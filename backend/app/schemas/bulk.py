@@ -0,0 +1,23 @@
+from typing import Any, Generic, List, Optional, TypeVar
+
+from pydantic import BaseModel
+
+ItemType = TypeVar("ItemType")
+
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+
+class BulkItemError(BaseModel):
+    # Position of the item in the request
+    index: int
+    id: Optional[int] = None
+    detail: Any
+
+
+class BulkResult(BaseModel, Generic[ItemType]):
+    """The items that were written, and why the others were not."""
+
+    items: List[ItemType]
+    errors: List[BulkItemError]
@@ -3,7 +3,7 @@ from typing import List, Optional
 
 from pydantic import BaseModel, ConfigDict
 
-from .message import Message, MessageCreate
+from .message import Message, MessageCreate, MessageUpdate
 
 
 class ConversationBase(BaseModel):
@@ -15,6 +15,11 @@ class ConversationCreate(ConversationBase):
     messages: List[MessageCreate]
 
 
+class ConversationUpdate(ConversationBase):
+    # The full list of messages; omitted to keep them as they are
+    messages: Optional[List[MessageUpdate]] = None
+
+
 class Conversation(ConversationBase):
     id: int
     project_id: Optional[int] = None
@@ -22,3 +27,17 @@ class Conversation(ConversationBase):
     messages: List[Message] = []
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class ConversationListItem(ConversationBase):
+    """A conversation in the index, without its messages."""
+
+    id: int
+    project_id: Optional[int] = None
+    created_at: datetime
+    message_count: int
+    last_message_at: Optional[datetime] = None
+    # The start of the last message
+    preview: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
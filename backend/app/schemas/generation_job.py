@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel, ConfigDict
+
+from app.models.generation_job import JobStatus
+
+
+class GenerationJob(BaseModel):
+    id: int
+    kind: str
+    status: JobStatus
+    attempts: int
+    content: Optional[str] = None
+    reasoning_chars: int
+    content_chars: int
+    error: Optional[str] = None
+    generated_outline_id: Optional[int] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class Percentiles(BaseModel):
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+class ModelUsageStats(BaseModel):
+    ai_model_id: Optional[int] = None
+    requests: int
+    errors: int
+    cancelled: int
+    prompt_tokens: int
+    completion_tokens: int
+    reasoning_tokens: int
+    ttft_ms: Optional[Percentiles] = None
+    duration_ms: Optional[Percentiles] = None
+    tokens_per_second: Optional[Percentiles] = None
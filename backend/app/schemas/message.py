@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Optional
 
 from pydantic import BaseModel, ConfigDict
 
@@ -6,12 +7,18 @@ from pydantic import BaseModel, ConfigDict
 class MessageBase(BaseModel):
     role: str
     content: str
+    reasoning_content: Optional[str] = None
 
 
 class MessageCreate(MessageBase):
     pass
 
 
+class MessageUpdate(MessageBase):
+    # The stored message this one stands for; unset to match by position
+    id: Optional[int] = None
+
+
 class Message(MessageBase):
     id: int
     conversation_id: int
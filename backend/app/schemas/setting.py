@@ -62,11 +62,16 @@ class PromptTemplateCreate(PromptTemplateBase):
 
 class PromptTemplateInDB(PromptTemplateBase):
     id: int
+    version: int
 
     class Config:
         from_attributes = True
 
 
+class PromptTemplateRender(BaseModel):
+    variables: Dict[str, Any] = {}
+
+
 # --- GeneratedOutline Schemas ---
 class GeneratedOutlineBase(BaseModel):
     project_id: int
@@ -97,6 +102,12 @@ class AIModelBase(BaseModel):
     api_key: str
     model_name: str
     model_type: ModelType
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    context_window: Optional[int] = None
+    max_retries: Optional[int] = None
+    retry_base_delay_ms: Optional[int] = None
 
 
 class AIModelCreate(AIModelBase):
@@ -109,6 +120,12 @@ class AIModelUpdate(BaseModel):
     api_key: Optional[str] = None
     model_name: Optional[str] = None
     model_type: Optional[ModelType] = None
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    context_window: Optional[int] = None
+    max_retries: Optional[int] = None
+    retry_base_delay_ms: Optional[int] = None
 
 
 class AIModelInDB(AIModelBase):
@@ -0,0 +1,121 @@
+# backend/app/services/ai_client_pool.py
+import asyncio
+import contextlib
+import hashlib
+from typing import AsyncIterator, Dict, List, Set
+
+import httpx
+import structlog
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "client", "users", "retired")
+
+    def __init__(self, fingerprint: str, client: AsyncOpenAI):
+        self.fingerprint = fingerprint
+        self.client = client
+        # Leases not yet released; a retired client is closed once none is left
+        self.users = 0
+        self.retired = False
+
+
+# AIModel.id -> pooled client
+_clients: Dict[int, _Entry] = {}
+# Clients replaced by an update but still serving in-flight streams
+_retired: List[_Entry] = []
+# Closes of idle retired clients, referenced until they finish
+_closing: Set[asyncio.Task] = set()
+
+
+def _fingerprint(api_url: str, api_key: str) -> str:
+    return hashlib.sha256(f"{api_url}\x00{api_key}".encode()).hexdigest()
+
+
+def _build_client(api_url: str, api_key: str) -> AsyncOpenAI:
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.AI_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.AI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.AI_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.AI_HTTP_READ_TIMEOUT,
+            connect=settings.AI_HTTP_CONNECT_TIMEOUT,
+        ),
+    )
+    # Retries are done by services.retries, per the model's retry policy
+    return AsyncOpenAI(
+        base_url=api_url, api_key=api_key, http_client=http_client, max_retries=0
+    )
+
+
+def _retire(entry: _Entry) -> None:
+    entry.retired = True
+    if entry.users:
+        _retired.append(entry)
+        return
+    try:
+        task = asyncio.get_running_loop().create_task(entry.client.close())
+    except RuntimeError:
+        # No event loop to close it on; close_all does it on shutdown
+        _retired.append(entry)
+        return
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+def _get_entry(model_id: int, api_url: str, api_key: str) -> _Entry:
+    fingerprint = _fingerprint(api_url, api_key)
+    entry = _clients.get(model_id)
+    if entry is not None:
+        if entry.fingerprint == fingerprint:
+            return entry
+        _retire(entry)
+
+    entry = _Entry(fingerprint, _build_client(api_url, api_key))
+    _clients[model_id] = entry
+    logger.info("ai_client_created", model_id=model_id)
+    return entry
+
+
+@contextlib.asynccontextmanager
+async def lease(
+    model_id: int, *, api_url: str, api_key: str
+) -> AsyncIterator[AsyncOpenAI]:
+    """
+    Lends the long-lived client of an AI model for one upstream call, building
+    it on first use. The client is rebuilt when the URL or the (decrypted) key
+    changes; the replaced one is closed when its last lease is released.
+    """
+    entry = _get_entry(model_id, api_url, api_key)
+    entry.users += 1
+    try:
+        yield entry.client
+    finally:
+        entry.users -= 1
+        # close_all() may already have closed it and emptied _retired
+        if entry.retired and not entry.users and entry in _retired:
+            _retired.remove(entry)
+            await entry.client.close()
+
+
+def invalidate(model_id: int) -> None:
+    """Drops the pooled client of a model so the next call rebuilds it."""
+    entry = _clients.pop(model_id, None)
+    if entry is not None:
+        _retire(entry)
+
+
+async def close_all() -> None:
+    """Closes every pooled client. Called on application shutdown."""
+    clients = [entry.client for entry in [*_clients.values(), *_retired]]
+    _clients.clear()
+    _retired.clear()
+    await asyncio.gather(
+        *(client.close() for client in clients), *_closing, return_exceptions=True
+    )
@@ -0,0 +1,112 @@
+# backend/app/services/ai_events.py
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, ClassVar, List, Optional, Union
+
+
+@dataclass(slots=True)
+class ReasoningEvent:
+    event: ClassVar[str] = "reasoning"
+    chunk: str
+
+    def payload(self) -> dict:
+        return {"chunk": self.chunk}
+
+
+@dataclass(slots=True)
+class ContentEvent:
+    event: ClassVar[str] = "content"
+    chunk: str
+
+    def payload(self) -> dict:
+        return {"chunk": self.chunk}
+
+
+@dataclass(slots=True)
+class ErrorEvent:
+    event: ClassVar[str] = "error"
+    error: str
+
+    def payload(self) -> dict:
+        return {"error": self.error}
+
+
+@dataclass(slots=True)
+class UsageEvent:
+    event: ClassVar[str] = "usage"
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    reasoning_tokens: int = 0
+
+    def payload(self) -> dict:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "reasoning_tokens": self.reasoning_tokens,
+        }
+
+
+@dataclass(slots=True)
+class OutlineFieldEvent:
+    """A top-level field of a streamed JSON outline, as soon as it is complete."""
+
+    event: ClassVar[str] = "outline_field"
+    field: str
+    value: Any
+
+    def payload(self) -> dict:
+        return {"field": self.field, "value": self.value}
+
+
+@dataclass(slots=True)
+class OutlineSavedEvent:
+    event: ClassVar[str] = "saved"
+    id: int
+
+    def payload(self) -> dict:
+        return {"id": self.id}
+
+
+AIEvent = Union[
+    ReasoningEvent,
+    ContentEvent,
+    ErrorEvent,
+    UsageEvent,
+    OutlineFieldEvent,
+    OutlineSavedEvent,
+]
+
+# Events whose text can be concatenated without changing their meaning
+TEXT_EVENTS = (ReasoningEvent, ContentEvent)
+
+
+@dataclass(slots=True)
+class GenerationResult:
+    """A fully consumed event stream."""
+
+    content: str = ""
+    reasoning: str = ""
+    error: Optional[str] = None
+    usage: Optional[UsageEvent] = None
+
+
+async def collect(events: AsyncIterable[AIEvent]) -> GenerationResult:
+    """
+    Consumes an event stream, joining the text chunks once at the end.
+    Stops at the first error event.
+    """
+    content: List[str] = []
+    reasoning: List[str] = []
+    result = GenerationResult()
+    async for event in events:
+        if isinstance(event, ContentEvent):
+            content.append(event.chunk)
+        elif isinstance(event, ReasoningEvent):
+            reasoning.append(event.chunk)
+        elif isinstance(event, UsageEvent):
+            result.usage = event
+        elif isinstance(event, ErrorEvent):
+            result.error = event.error
+            break
+    result.content = "".join(content)
+    result.reasoning = "".join(reasoning)
+    return result
@@ -1,89 +1,268 @@
 # backend/app/services/ai_service.py
+import hashlib
 import json
-from typing import AsyncGenerator, Dict, List
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+)
 
-from openai import AsyncOpenAI
+import openai
 
-from app.core.security import decrypt_data
-from app.models.setting import AIModel
+from app.core import metrics
+from app.services import ai_client_pool, retries, usage_tracker
+from app.services.ai_events import (
+    AIEvent,
+    ContentEvent,
+    ErrorEvent,
+    ReasoningEvent,
+    UsageEvent,
+)
+from app.services.model_config_cache import ResolvedModelConfig
+from app.services.scheduler import Priority, schedule
+from app.services.sse import close_iterator, encode_events
 
 
-async def generate_chat_completion(
-    model_config: AIModel,
+def _usage_event(usage) -> UsageEvent:
+    details = getattr(usage, "completion_tokens_details", None)
+    return UsageEvent(
+        prompt_tokens=usage.prompt_tokens or 0,
+        completion_tokens=usage.completion_tokens or 0,
+        reasoning_tokens=getattr(details, "reasoning_tokens", None) or 0,
+    )
+
+
+# Models whose upstream rejected stream_options; they are asked without it
+_usage_unsupported: Set[int] = set()
+
+
+def outline_messages(prompt: str) -> List[Dict[str, str]]:
+    return [{"role": "user", "content": prompt}]
+
+
+def request_key(
+    model_config: ResolvedModelConfig,
     messages: List[Dict[str, str]],
-) -> AsyncGenerator[str, None]:
-    decrypted_api_key = decrypt_data(model_config.api_key)
-    client = AsyncOpenAI(
-        base_url=model_config.api_url,
-        api_key=decrypted_api_key,
+    sampling: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Content address of a generation: identical inputs give identical keys."""
+    material = json.dumps(
+        [
+            model_config.id,
+            model_config.api_url,
+            model_config.model_name,
+            messages,
+            sampling or {},
+        ],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
     )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
 
-    try:
-        stream = await client.chat.completions.create(
-            model=model_config.model_name,
-            messages=messages,
-            stream=True,
-        )
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
 
-            reasoning_chunk = getattr(delta, "reasoning_content", None)
-            if reasoning_chunk:
-                data = json.dumps({"chunk": reasoning_chunk})
-                yield f"event: reasoning\ndata: {data}\n\n"
+def stream_chat_events(
+    model_config: ResolvedModelConfig,
+    messages: List[Dict[str, str]],
+    sampling: Optional[Dict[str, Any]] = None,
+    priority: Priority = Priority.INTERACTIVE,
+    fallback: Optional[ResolvedModelConfig] = None,
+    route: str = "chat",
+    project_id: Optional[int] = None,
+    hedged: bool = False,
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Streams a chat completion as typed events. Models that support a separate
+    'reasoning_content' field (such as deepseek-reasoner) produce reasoning
+    events before the content ones. Transient upstream errors are retried per
+    the model's retry policy; a failure that persists ends the stream with an
+    error event, unless a `fallback` model is given to continue the reply.
+    `sampling` holds optional parameters such as temperature or top_p. The call
+    waits for the model's scheduler to admit it at the given priority. Its
+    usage is recorded under `route` and `project_id`. When the call is
+    `hedged` with the same fallback, a failure before the first event is
+    left to the hedge, which starts the fallback itself.
+    """
+    progress = retries.Progress()
 
-            if delta.content:
-                data = json.dumps({"chunk": delta.content})
-                yield f"event: content\ndata: {data}\n\n"
+    def generation(config: ResolvedModelConfig) -> AsyncIterator[AIEvent]:
+        events = schedule(
+            config,
+            priority,
+            messages,
+            _stream_upstream(config, messages, sampling, progress),
+        )
+        return usage_tracker.track(events, config.id, messages, route, project_id)
 
-    except Exception as e:
-        data = json.dumps({"error": str(e)})
-        yield f"event: error\ndata: {data}\n\n"
+    events = generation(model_config)
+    if fallback is None:
+        return events
+    return _failover(events, fallback, lambda: generation(fallback), hedged)
 
 
-async def generate_outline_from_config(
-    model_config: AIModel,
-    prompt: str,
-) -> AsyncGenerator[str, None]:
+async def _failover(
+    events: AsyncIterator[AIEvent],
+    fallback: ResolvedModelConfig,
+    continuation: Callable[[], AsyncIterator[AIEvent]],
+    after_output: bool = False,
+) -> AsyncGenerator[AIEvent, None]:
     """
-    Generates a novel outline as a stream based on the provided prompt.
-    This function is designed to handle models that support separate 'reasoning_content'
-    and 'content' fields in the stream, such as deepseek-reasoner.
-    It yields Server-Sent Events (SSE) formatted strings.
+    Continues the generation on `fallback` when `events` fails; with
+    `after_output`, only once `events` has produced something, an earlier
+    error being passed through.
     """
-    # 1. Decrypt the API key
-    decrypted_api_key = decrypt_data(model_config.api_key)
+    failed = False
+    started = False
+    try:
+        async for event in events:
+            if isinstance(event, ErrorEvent):
+                if after_output and not started:
+                    yield event
+                    return
+                failed = True
+                break
+            started = True
+            yield event
+    finally:
+        # Releases the failed generation's scheduler slot and records its
+        # usage before the fallback starts
+        await close_iterator(events)
+    if failed:
+        metrics.counter("upstream_failovers", model_id=fallback.id).inc()
+        async for event in continuation():
+            yield event
 
-    # 2. Initialize the client
-    client = AsyncOpenAI(
-        base_url=model_config.api_url,
-        api_key=decrypted_api_key,
-    )
 
-    # 3. Make the streaming API call
+async def _stream_upstream(
+    model_config: ResolvedModelConfig,
+    messages: List[Dict[str, str]],
+    sampling: Optional[Dict[str, Any]],
+    progress: retries.Progress,
+) -> AsyncGenerator[AIEvent, None]:
     try:
-        stream = await client.chat.completions.create(
-            model=model_config.model_name,
-            messages=[{"role": "user", "content": prompt}],
-            stream=True,
-        )
-        async for chunk in stream:
-            delta = chunk.choices[0].delta
+        async for event in retries.retrying(
+            lambda request: _upstream_events(model_config, request, sampling),
+            messages,
+            retries.policy_for(model_config),
+            model_config.id,
+            progress,
+        ):
+            yield event
+    except Exception as e:
+        yield ErrorEvent(str(e))
 
-            # Check for reasoning_content (for models like deepseek-reasoner)
-            reasoning_chunk = getattr(delta, "reasoning_content", None)
-            if reasoning_chunk:
-                # SSE format: event name and data
-                data = json.dumps({"chunk": reasoning_chunk})
-                yield f"event: reasoning\ndata: {data}\n\n"
 
-            # Check for the final content
-            if delta.content:
-                data = json.dumps({"chunk": delta.content})
-                yield f"event: content\ndata: {data}\n\n"
+async def _upstream_events(
+    model_config: ResolvedModelConfig,
+    messages: List[Dict[str, str]],
+    sampling: Optional[Dict[str, Any]],
+) -> AsyncGenerator[AIEvent, None]:
+    """One upstream request; errors are raised to the retry loop."""
+    async with ai_client_pool.lease(
+        model_config.id,
+        api_url=model_config.api_url,
+        api_key=model_config.api_key,
+    ) as client:
+        stream = None
+        # False while the consumer may still abandon the stream midway
+        finished = False
+        try:
+            stream = await _create_stream(client, model_config, messages, sampling)
+            async for chunk in stream:
+                if chunk.usage is not None:
+                    yield _usage_event(chunk.usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
 
-    except Exception as e:
-        # In a real app, you'd want more robust error handling here.
-        # For now, we'll just yield an error message as a custom event.
-        data = json.dumps({"error": str(e)})
-        yield f"event: error\ndata: {data}\n\n"
+                # Check for reasoning_content (for models like deepseek-reasoner)
+                reasoning_chunk = getattr(delta, "reasoning_content", None)
+                if reasoning_chunk:
+                    yield ReasoningEvent(reasoning_chunk)
+
+                # Check for the final content
+                if delta.content:
+                    yield ContentEvent(delta.content)
+            finished = True
+        except Exception:
+            finished = True
+            raise
+        finally:
+            # Release the upstream connection right away when the consumer stops
+            if stream is not None:
+                await stream.close()
+            if not finished:
+                metrics.counter(
+                    "upstream_cancellations", model_id=model_config.id
+                ).inc()
+
+
+async def _create_stream(
+    client: openai.AsyncOpenAI,
+    model_config: ResolvedModelConfig,
+    messages: List[Dict[str, str]],
+    sampling: Optional[Dict[str, Any]],
+):
+    """Opens the stream, asking for a final usage chunk where supported."""
+    params = {
+        "model": model_config.model_name,
+        "messages": messages,
+        "stream": True,
+        **(sampling or {}),
+    }
+    if model_config.id not in _usage_unsupported:
+        try:
+            return await client.chat.completions.create(
+                **params, stream_options={"include_usage": True}
+            )
+        except openai.BadRequestError as e:
+            if "stream_options" not in str(e):
+                raise
+            _usage_unsupported.add(model_config.id)
+    return await client.chat.completions.create(**params)
+
+
+def stream_outline_events(
+    model_config: ResolvedModelConfig,
+    prompt: str,
+    sampling: Optional[Dict[str, Any]] = None,
+    priority: Priority = Priority.OUTLINE,
+    fallback: Optional[ResolvedModelConfig] = None,
+    route: str = "outline",
+    project_id: Optional[int] = None,
+    hedged: bool = False,
+) -> AsyncGenerator[AIEvent, None]:
+    return stream_chat_events(
+        model_config,
+        outline_messages(prompt),
+        sampling,
+        priority,
+        fallback,
+        route,
+        project_id,
+        hedged,
+    )
+
+
+def generate_chat_completion(
+    model_config: ResolvedModelConfig,
+    messages: List[Dict[str, str]],
+) -> AsyncGenerator[str, None]:
+    return encode_events(stream_chat_events(model_config, messages))
+
+
+def generate_outline_from_config(
+    model_config: ResolvedModelConfig,
+    prompt: str,
+) -> AsyncGenerator[str, None]:
+    """
+    Generates a novel outline as a stream based on the provided prompt.
+    It yields Server-Sent Events (SSE) formatted strings, with consecutive
+    small deltas coalesced into larger frames.
+    """
+    return encode_events(stream_outline_events(model_config, prompt))
@@ -0,0 +1,93 @@
+# backend/app/services/chat_context.py
+"""
+Token-budgeted assembly of chat prompts. System messages (the prompt preset
+segments) and the newest message are pinned; the remaining history is kept
+newest first until the budget is spent, truncating the oldest message that
+only partly fits and dropping everything before it. Without a budget the
+messages are sent as they are.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services import token_counter
+from app.services.model_config_cache import ResolvedModelConfig
+
+# A truncated message shorter than this is dropped instead
+MIN_TRUNCATED_TOKENS = 32
+TRUNCATION_MARK = "…"
+
+
+@dataclass(slots=True)
+class ContextReport:
+    # None when the prompt was not trimmed to a budget
+    budget: Optional[int]
+    input_tokens: int
+    prompt_tokens: int
+    dropped_messages: int = 0
+    truncated_messages: int = 0
+
+    @property
+    def trimmed_tokens(self) -> int:
+        return self.input_tokens - self.prompt_tokens
+
+    def header(self) -> str:
+        budget = "none" if self.budget is None else self.budget
+        return (
+            f"budget={budget}; input={self.input_tokens}; "
+            f"prompt={self.prompt_tokens}; trimmed={self.trimmed_tokens}; "
+            f"dropped_messages={self.dropped_messages}; "
+            f"truncated_messages={self.truncated_messages}"
+        )
+
+
+def budget_for(
+    model_config: ResolvedModelConfig, requested: Optional[int] = None
+) -> Optional[int]:
+    """The prompt budget: the model's window minus the reply reserve, capped
+    by the caller's budget. None if neither the model's window nor the
+    caller's budget is known."""
+    window = model_config.context_window or settings.CONTEXT_DEFAULT_WINDOW
+    if window is None:
+        return requested or None
+    budget = max(window - settings.CONTEXT_RESPONSE_RESERVE, 0)
+    return min(budget, requested) if requested else budget
+
+
+def assemble(
+    messages: List[Dict[str, str]], budget: Optional[int]
+) -> Tuple[List[Dict[str, str]], ContextReport]:
+    costs = [token_counter.count_message(message) for message in messages]
+    input_tokens = sum(costs) + token_counter.REPLY_OVERHEAD
+    if budget is None:
+        return list(messages), ContextReport(None, input_tokens, input_tokens)
+    pinned = {i for i, m in enumerate(messages) if m.get("role") == "system"}
+    if messages:
+        pinned.add(len(messages) - 1)
+
+    remaining = budget - token_counter.REPLY_OVERHEAD - sum(costs[i] for i in pinned)
+    kept: Dict[int, Dict[str, str]] = {i: messages[i] for i in pinned}
+    report = ContextReport(budget, input_tokens, input_tokens)
+
+    history = [i for i in range(len(messages)) if i not in pinned]
+    for position in range(len(history) - 1, -1, -1):
+        i = history[position]
+        if costs[i] <= remaining:
+            kept[i] = messages[i]
+            remaining -= costs[i]
+            continue
+
+        dropped = position + 1
+        room = remaining - token_counter.MESSAGE_OVERHEAD - 1
+        if room >= MIN_TRUNCATED_TOKENS:
+            content = token_counter.truncate_head(messages[i]["content"], room)
+            kept[i] = {**messages[i], "content": TRUNCATION_MARK + content}
+            report.truncated_messages = 1
+            dropped -= 1
+        report.dropped_messages = dropped
+        break
+
+    assembled = [kept[i] for i in sorted(kept)]
+    report.prompt_tokens = token_counter.count_messages(assembled)
+    return assembled, report
@@ -0,0 +1,177 @@
+# backend/app/services/conversation_memory.py
+"""
+Rolling conversation summaries. Once the messages of a conversation that its
+summary does not cover exceed SUMMARY_TRIGGER_TOKENS, a background task folds
+all but the most recent SUMMARY_KEEP_RECENT_TOKENS of them into the summary.
+The model only sees the previous summary plus the newly folded messages, so
+a summary is extended incrementally instead of being rebuilt from the whole
+transcript. Prompts then carry the summary and the unsummarized tail.
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.conversation import Conversation
+from app.models.conversation_summary import ConversationSummary
+from app.models.message import Message
+from app.services import ai_events, ai_service, prompt_service, token_counter
+from app.services.model_config_cache import ResolvedModelConfig
+from app.services.scheduler import Priority
+
+logger = structlog.get_logger(__name__)
+
+SUMMARY_PREFIX = "以下是此前对话的摘要：\n"
+
+# Conversations with a summary update in progress, and the tasks running them
+_pending: Set[int] = set()
+_tasks: Set[asyncio.Task] = set()
+
+
+def _as_dict(message: Message) -> Dict[str, str]:
+    return {"role": message.role, "content": message.content}
+
+
+async def _load_summary(
+    db: AsyncSession, conversation_id: int
+) -> Optional[ConversationSummary]:
+    result = await db.execute(
+        select(ConversationSummary).filter(
+            ConversationSummary.conversation_id == conversation_id
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+def _split(
+    messages: List[Message], summary: Optional[ConversationSummary]
+) -> Tuple[Optional[ConversationSummary], List[Message]]:
+    """Returns the summary that still applies and the messages after it."""
+    if summary is not None and any(m.id == summary.last_message_id for m in messages):
+        return summary, [m for m in messages if m.id > summary.last_message_id]
+    # No summary yet, or the messages were rewritten (with new ids) since
+    return None, messages
+
+
+def _to_fold(tail: List[Message]) -> List[Message]:
+    """The oldest messages of the tail, leaving the recent ones verbatim."""
+    kept = 0
+    for i in range(len(tail) - 1, -1, -1):
+        kept += token_counter.count_message(_as_dict(tail[i]))
+        if kept > settings.SUMMARY_KEEP_RECENT_TOKENS:
+            return tail[: i + 1]
+    return []
+
+
+async def history_messages(
+    db: AsyncSession, conversation: Conversation
+) -> List[Dict[str, str]]:
+    """
+    The stored history of a conversation as chat messages: a system message
+    with the summary, if any, followed by the messages it does not cover.
+    """
+    messages = sorted(conversation.messages, key=lambda m: m.id)
+    summary, tail = _split(messages, await _load_summary(db, conversation.id))
+    history = [_as_dict(message) for message in tail]
+    if summary is not None:
+        history.insert(
+            0, {"role": "system", "content": SUMMARY_PREFIX + summary.content}
+        )
+    return history
+
+
+def maybe_summarize(
+    conversation_id: int,
+    history: List[Dict[str, str]],
+    model_config: ResolvedModelConfig,
+) -> None:
+    """Starts a background summary update when `history` is over the trigger."""
+    if settings.SUMMARY_TRIGGER_TOKENS <= 0 or conversation_id in _pending:
+        return
+    unsummarized = sum(
+        token_counter.count_message(message)
+        for message in history
+        if message["role"] != "system"
+    )
+    if unsummarized <= settings.SUMMARY_TRIGGER_TOKENS:
+        return
+
+    _pending.add(conversation_id)
+    task = asyncio.create_task(_summarize(conversation_id, model_config))
+    _tasks.add(task)
+
+    def done(task: asyncio.Task) -> None:
+        _tasks.discard(task)
+        _pending.discard(conversation_id)
+
+    task.add_done_callback(done)
+
+
+async def _summarize(conversation_id: int, model_config: ResolvedModelConfig) -> None:
+    try:
+        async with SessionLocal() as db:
+            await _update_summary(db, conversation_id, model_config)
+    except Exception as e:
+        logger.warning(
+            "conversation_summary_failed",
+            conversation_id=conversation_id,
+            error=str(e),
+        )
+
+
+async def _update_summary(
+    db: AsyncSession, conversation_id: int, model_config: ResolvedModelConfig
+) -> None:
+    result = await db.execute(
+        select(Message)
+        .filter(Message.conversation_id == conversation_id)
+        .order_by(Message.id)
+    )
+    summary, tail = _split(
+        list(result.scalars().all()), await _load_summary(db, conversation_id)
+    )
+    fold = _to_fold(tail)
+    if not fold:
+        return
+
+    transcript = "\n".join(
+        f"[{message.role.capitalize()}]: {message.content}" for message in fold
+    )
+    prompt = prompt_service.create_summary_update_prompt(
+        summary.content if summary is not None else None, transcript
+    )
+    generated = await ai_events.collect(
+        ai_service.stream_chat_events(
+            model_config,
+            [{"role": "user", "content": prompt}],
+            priority=Priority.BACKGROUND,
+            route="summary",
+        )
+    )
+    if generated.error is not None or not generated.content.strip():
+        logger.warning(
+            "conversation_summary_failed",
+            conversation_id=conversation_id,
+            error=generated.error or "empty summary",
+        )
+        return
+
+    await db.merge(
+        ConversationSummary(
+            conversation_id=conversation_id,
+            first_message_id=(
+                summary.first_message_id if summary is not None else fold[0].id
+            ),
+            last_message_id=fold[-1].id,
+            content=generated.content.strip(),
+            ai_model_id=model_config.id,
+        )
+    )
+    await db.commit()
+    metrics.counter("conversation_summaries_updated").inc()
@@ -0,0 +1,111 @@
+# backend/app/services/generation_cache.py
+from collections import OrderedDict
+from typing import AsyncGenerator, AsyncIterator, List, Optional
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import metrics
+from app.core.config import settings
+from app.database import SessionLocal
+from app.models.generation_cache import GenerationCacheEntry
+from app.services.ai_events import (
+    AIEvent,
+    ContentEvent,
+    ErrorEvent,
+    GenerationResult,
+    ReasoningEvent,
+)
+
+logger = structlog.get_logger(__name__)
+
+# In-memory LRU tier: key -> result, most recently used last
+_lru: "OrderedDict[str, GenerationResult]" = OrderedDict()
+
+
+def enabled() -> bool:
+    return settings.GENERATION_CACHE_ENABLED
+
+
+def _remember(key: str, result: GenerationResult) -> None:
+    _lru[key] = result
+    _lru.move_to_end(key)
+    while len(_lru) > settings.GENERATION_CACHE_MAX_ENTRIES:
+        _lru.popitem(last=False)
+
+
+async def get(db: AsyncSession, key: str) -> Optional[GenerationResult]:
+    """Looks a result up in memory first, then in the persistent table."""
+    result = _lru.get(key)
+    if result is not None:
+        _lru.move_to_end(key)
+        metrics.counter("generation_cache_hits", tier="memory").inc()
+        return result
+
+    row = (
+        await db.execute(
+            select(GenerationCacheEntry).filter(GenerationCacheEntry.key == key)
+        )
+    ).scalar_one_or_none()
+    if row is None:
+        metrics.counter("generation_cache_misses").inc()
+        return None
+
+    result = GenerationResult(content=row.content, reasoning=row.reasoning or "")
+    _remember(key, result)
+    metrics.counter("generation_cache_hits", tier="db").inc()
+    return result
+
+
+async def put(key: str, model_id: int, result: GenerationResult) -> None:
+    _remember(key, result)
+    try:
+        async with SessionLocal() as db:
+            await db.merge(
+                GenerationCacheEntry(
+                    key=key,
+                    ai_model_id=model_id,
+                    content=result.content,
+                    reasoning=result.reasoning or None,
+                )
+            )
+            await db.commit()
+        metrics.counter("generation_cache_stores").inc()
+    except Exception as e:
+        # The in-memory tier still holds the result
+        logger.warning("generation_cache_store_failed", key=key, error=str(e))
+
+
+async def replay(result: GenerationResult) -> AsyncGenerator[AIEvent, None]:
+    if result.reasoning:
+        yield ReasoningEvent(result.reasoning)
+    if result.content:
+        yield ContentEvent(result.content)
+
+
+async def record(
+    key: str, model_id: int, events: AsyncIterator[AIEvent]
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Passes events through unchanged and stores the result once the stream
+    completes without error. Streams abandoned midway are not stored.
+    """
+    content: List[str] = []
+    reasoning: List[str] = []
+    failed = False
+    async for event in events:
+        if isinstance(event, ContentEvent):
+            content.append(event.chunk)
+        elif isinstance(event, ReasoningEvent):
+            reasoning.append(event.chunk)
+        elif isinstance(event, ErrorEvent):
+            failed = True
+        yield event
+
+    if content and not failed:
+        await put(
+            key,
+            model_id,
+            GenerationResult(content="".join(content), reasoning="".join(reasoning)),
+        )
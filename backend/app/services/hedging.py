@@ -0,0 +1,104 @@
+# backend/app/services/hedging.py
+"""
+Hedged generations. When the primary model has not produced its first event
+within the hedge delay (or fails before producing one), the same request is
+also sent to a fallback model. The stream that produces a usable first event
+first is passed through and the other upstream stream is cancelled at once.
+"""
+
+import asyncio
+from typing import AsyncGenerator, AsyncIterator, Callable, List, Optional, Tuple
+
+from app.core import metrics
+from app.services.ai_events import AIEvent, ErrorEvent
+from app.services.sse import close_iterator
+
+
+class _Leg:
+    __slots__ = ("name", "iterator", "pending", "error")
+
+    def __init__(self, name: str, events: AsyncIterator[AIEvent]):
+        self.name = name
+        self.iterator = events.__aiter__()
+        self.pending = asyncio.ensure_future(self.iterator.__anext__())
+        self.error: Optional[ErrorEvent] = None
+
+    def first(self) -> Optional[AIEvent]:
+        """The leg's first event, or None (recording the error) if it failed."""
+        try:
+            event = self.pending.result()
+        except StopAsyncIteration:
+            return None
+        except Exception as e:
+            event = ErrorEvent(str(e))
+        if isinstance(event, ErrorEvent):
+            self.error = event
+            return None
+        return event
+
+    async def close(self) -> None:
+        await close_iterator(self.iterator, self.pending)
+
+
+async def _race(
+    legs: List[_Leg],
+    active: List[_Leg],
+    fallback: Callable[[], AsyncIterator[AIEvent]],
+    delay: float,
+) -> Tuple[Optional[_Leg], Optional[AIEvent]]:
+    """Waits for the first leg with a usable first event, starting the fallback
+    when the delay expires or the primary fails; failed legs are closed."""
+    timeout: Optional[float] = delay
+    while active:
+        done, _ = await asyncio.wait(
+            {leg.pending for leg in active},
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        timeout = None
+        for leg in [leg for leg in active if leg.pending in done]:
+            first = leg.first()
+            if first is not None:
+                return leg, first
+            active.remove(leg)
+            await leg.close()
+
+        if len(legs) == 1:
+            legs.append(_Leg("fallback", fallback()))
+            active.append(legs[-1])
+            metrics.counter("hedged_requests").inc()
+    return None, None
+
+
+async def hedge(
+    primary: AsyncIterator[AIEvent],
+    fallback: Callable[[], AsyncIterator[AIEvent]],
+    delay: float,
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Yields the events of `primary`, or of the stream started by `fallback()`
+    if that one gets going first.
+    """
+    legs: List[_Leg] = [_Leg("primary", primary)]
+    active = list(legs)
+    try:
+        winner, first = await _race(legs, active, fallback, delay)
+        if winner is None:
+            errors = [leg.error for leg in legs if leg.error is not None]
+            if errors:
+                yield errors[0]
+            return
+
+        for leg in active:
+            if leg is not winner:
+                await leg.close()
+                metrics.counter("hedge_losers_cancelled").inc()
+        if len(legs) > 1:
+            metrics.counter("hedge_wins", leg=winner.name).inc()
+
+        yield first
+        async for event in winner.iterator:
+            yield event
+    finally:
+        for leg in active:
+            await leg.close()
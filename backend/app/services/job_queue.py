@@ -0,0 +1,296 @@
+# backend/app/services/job_queue.py
+"""
+Background outline generations. Jobs are persisted in the generation_jobs
+table and run by a small pool of asyncio workers in this process at
+background priority, so they only get the upstream capacity interactive
+requests leave over. A running job periodically saves its partial output and
+publishes its events through a resumable stream that clients can subscribe
+to. A running job is leased to its process, which renews the lease while it
+is alive; any process requeues jobs whose lease expired, on startup and
+periodically, so several processes can share the jobs table.
+"""
+
+import asyncio
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Optional
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import func
+
+from app import crud
+from app.core import metrics
+from app.core.config import settings
+from app.crud import crud_setting
+from app.database import SessionLocal
+from app.models.generation_job import JobStatus
+from app.schemas import setting as setting_schemas
+from app.services import (
+    ai_service,
+    model_config_cache,
+    outline_context,
+    outline_parser,
+    stream_registry,
+)
+from app.services.ai_events import ContentEvent, ErrorEvent, ReasoningEvent
+from app.services.scheduler import Priority
+
+logger = structlog.get_logger(__name__)
+
+OUTLINE = "outline"
+
+
+class RunningJob:
+    __slots__ = ("stream", "finished")
+
+    def __init__(self, stream: stream_registry.ResumableStream):
+        self.stream = stream
+        # Set once the job's final status is committed
+        self.finished = asyncio.Event()
+
+
+_queue: Optional[asyncio.Queue] = None
+_workers: List[asyncio.Task] = []
+_running: Dict[int, RunningJob] = {}
+_started = asyncio.Event()
+# Identifies this process in GenerationJob.claimed_by
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class JobFailed(Exception):
+    pass
+
+
+async def start() -> None:
+    """Starts the worker pool and re-enqueues unfinished jobs."""
+    global _queue
+    _queue = asyncio.Queue()
+    _workers[:] = [asyncio.create_task(_worker()) for _ in range(settings.JOB_WORKERS)]
+    _workers.append(asyncio.create_task(_maintain_leases()))
+    try:
+        async with SessionLocal() as db:
+            ids = await crud.generation_job.requeue_unfinished(
+                db, max_attempts=settings.JOB_MAX_ATTEMPTS
+            )
+    except Exception as e:
+        logger.warning("generation_job_recovery_failed", error=str(e))
+        return
+    for job_id in ids:
+        submit(job_id)
+    if ids:
+        logger.info("generation_jobs_recovered", count=len(ids))
+
+
+async def stop() -> None:
+    # Interrupted jobs stay 'running' in the database with an expired lease,
+    # so the next process to start or sweep recovers them at once
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    try:
+        async with SessionLocal() as db:
+            await crud.generation_job.release_leases(db, worker=WORKER_ID)
+    except Exception as e:
+        logger.warning("generation_job_release_failed", error=str(e))
+
+
+def submit(job_id: int) -> None:
+    """Hands a committed job to the workers (it waits for the next startup if
+    the pool is not running)."""
+    if _queue is not None:
+        _queue.put_nowait(job_id)
+        metrics.gauge("generation_jobs_queued").set(_queue.qsize())
+
+
+def running(job_id: int) -> Optional[RunningJob]:
+    return _running.get(job_id)
+
+
+async def wait_running(job_id: int, timeout: float) -> Optional[RunningJob]:
+    """Waits up to `timeout` seconds for a queued job to start in this process."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while job_id not in _running:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return None
+        try:
+            await asyncio.wait_for(_started.wait(), remaining)
+        except asyncio.TimeoutError:
+            return None
+    return _running[job_id]
+
+
+def _register(job_id: int, stream: stream_registry.ResumableStream) -> None:
+    global _started
+    _running[job_id] = RunningJob(stream)
+    started, _started = _started, asyncio.Event()
+    started.set()
+
+
+async def _worker() -> None:
+    while True:
+        job_id = await _queue.get()
+        metrics.gauge("generation_jobs_queued").set(_queue.qsize())
+        try:
+            await _run(job_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("generation_job_crashed", job_id=job_id)
+
+
+async def _maintain_leases() -> None:
+    """Renews the leases of this process's jobs and requeues expired ones."""
+    interval = settings.JOB_LEASE_SECONDS / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with SessionLocal() as db:
+                await crud.generation_job.renew_leases(
+                    db, worker=WORKER_ID, lease_seconds=settings.JOB_LEASE_SECONDS
+                )
+                ids = await crud.generation_job.requeue_expired(
+                    db, max_attempts=settings.JOB_MAX_ATTEMPTS
+                )
+        except Exception as e:
+            logger.warning("generation_job_lease_renewal_failed", error=str(e))
+            continue
+        for job_id in ids:
+            submit(job_id)
+        if ids:
+            logger.info("generation_jobs_recovered", count=len(ids))
+
+
+async def _run(job_id: int) -> None:
+    async with SessionLocal() as db:
+        claimed = await crud.generation_job.claim(
+            db, job_id, worker=WORKER_ID, lease_seconds=settings.JOB_LEASE_SECONDS
+        )
+        if not claimed:
+            return
+        job = await crud.generation_job.get(db, job_id)
+        params = dict(job.params)
+        final: Dict[str, Any]
+        try:
+            outline_id = await _generate_outline(db, job_id, params)
+        except JobFailed as e:
+            final = {"status": JobStatus.FAILED, "error": str(e)}
+        except asyncio.CancelledError:
+            _finish(job_id)
+            raise
+        except Exception as e:
+            final = {"status": JobStatus.FAILED, "error": f"Internal error: {e}"}
+        else:
+            final = {
+                "status": JobStatus.SUCCEEDED,
+                "generated_outline_id": outline_id,
+            }
+        try:
+            await crud.generation_job.set_fields(
+                db, job_id, finished_at=func.now(), **final
+            )
+        finally:
+            _finish(job_id)
+        metrics.counter("generation_jobs_finished", status=final["status"].value).inc()
+
+
+def _finish(job_id: int) -> None:
+    job = _running.pop(job_id, None)
+    if job is not None:
+        if not job.stream.done:
+            job.stream.task.cancel()
+        job.finished.set()
+
+
+async def _generate_outline(
+    db: AsyncSession, job_id: int, params: Dict[str, Any]
+) -> int:
+    context = await outline_context.load_context(
+        db,
+        params["project_id"],
+        params.get("worldview_id"),
+        params.get("writing_style_id"),
+    )
+    if context is None:
+        raise JobFailed("Project not found")
+    model_config = await model_config_cache.get_model_config(db, params["ai_model_id"])
+    if model_config is None:
+        raise JobFailed("AI Model not found")
+
+    prompt = outline_context.build_prompt(context, params["target_word_count"])
+    sampling = {
+        k: params[k] for k in ("temperature", "top_p") if params.get(k) is not None
+    }
+    parser = outline_parser.OutlineStreamParser()
+    events = ai_service.stream_outline_events(
+        model_config,
+        prompt,
+        sampling,
+        Priority.BACKGROUND,
+        route="outline_job",
+        project_id=params["project_id"],
+    )
+    stream = stream_registry.start(outline_parser.with_outline_fields(events, parser))
+    _register(job_id, stream)
+
+    await _consume(db, job_id, stream)
+
+    outline = setting_schemas.GeneratedOutlineCreate(
+        project_id=params["project_id"],
+        version_name=f"Job #{job_id}",
+        target_word_count=params["target_word_count"],
+        worldview_id=params.get("worldview_id"),
+        writing_style_id=params.get("writing_style_id"),
+        settings_snapshot={
+            "ai_model_id": params["ai_model_id"],
+            "worldview": context["worldview"],
+            "writing_style": context["writing_style"],
+        },
+        outline_data=parser.result(),
+    )
+    (outline_id,) = await crud_setting.generated_outline.create_many(
+        db, objs_in=[outline]
+    )
+    return outline_id
+
+
+async def _consume(
+    db: AsyncSession, job_id: int, stream: stream_registry.ResumableStream
+) -> None:
+    """Follows the job's stream, checkpointing its progress."""
+    loop = asyncio.get_running_loop()
+    chunks: List[str] = []
+    reasoning_chars = content_chars = 0
+    next_checkpoint = loop.time() + settings.JOB_CHECKPOINT_SECONDS
+
+    async for _, event in stream_registry.subscribe(stream):
+        if isinstance(event, ErrorEvent):
+            raise JobFailed(event.error)
+        if isinstance(event, ContentEvent):
+            chunks.append(event.chunk)
+            content_chars += len(event.chunk)
+        elif isinstance(event, ReasoningEvent):
+            reasoning_chars += len(event.chunk)
+        if loop.time() >= next_checkpoint:
+            await crud.generation_job.set_fields(
+                db,
+                job_id,
+                content="".join(chunks),
+                content_chars=content_chars,
+                reasoning_chars=reasoning_chars,
+            )
+            next_checkpoint = loop.time() + settings.JOB_CHECKPOINT_SECONDS
+
+    if not chunks:
+        raise JobFailed("The AI model returned no content")
+    await crud.generation_job.set_fields(
+        db,
+        job_id,
+        content="".join(chunks),
+        content_chars=content_chars,
+        reasoning_chars=reasoning_chars,
+    )
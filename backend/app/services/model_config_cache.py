@@ -0,0 +1,78 @@
+# backend/app/services/model_config_cache.py
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.security import decrypt_data
+from app.models.setting import AIModel, ModelType
+
+
+@dataclass(frozen=True, slots=True)
+class ResolvedModelConfig:
+    """An AIModel row with its API key already decrypted."""
+
+    id: int
+    name: str
+    api_url: str
+    api_key: str
+    model_name: str
+    model_type: ModelType
+    max_concurrency: Optional[int] = None
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    context_window: Optional[int] = None
+    max_retries: Optional[int] = None
+    retry_base_delay_ms: Optional[int] = None
+
+
+# AIModel.id -> (expiry on the monotonic clock, resolved config)
+_cache: Dict[int, Tuple[float, ResolvedModelConfig]] = {}
+
+
+def resolve(db_model: AIModel) -> ResolvedModelConfig:
+    return ResolvedModelConfig(
+        id=db_model.id,
+        name=db_model.name,
+        api_url=db_model.api_url,
+        api_key=decrypt_data(db_model.api_key),
+        model_name=db_model.model_name,
+        model_type=db_model.model_type,
+        max_concurrency=db_model.max_concurrency,
+        requests_per_minute=db_model.requests_per_minute,
+        tokens_per_minute=db_model.tokens_per_minute,
+        context_window=db_model.context_window,
+        max_retries=db_model.max_retries,
+        retry_base_delay_ms=db_model.retry_base_delay_ms,
+    )
+
+
+async def get_model_config(
+    db: AsyncSession, model_id: int
+) -> Optional[ResolvedModelConfig]:
+    """
+    Returns the resolved config of an AI model, hitting the database and
+    decrypting the key only on a cache miss. Writes through CRUDAIModel
+    invalidate the entry; the TTL bounds staleness across processes.
+    """
+    entry = _cache.get(model_id)
+    now = time.monotonic()
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    result = await db.execute(select(AIModel).filter(AIModel.id == model_id))
+    db_model = result.scalars().first()
+    if db_model is None:
+        _cache.pop(model_id, None)
+        return None
+
+    config = resolve(db_model)
+    _cache[model_id] = (now + settings.MODEL_CONFIG_CACHE_TTL, config)
+    return config
+
+
+def invalidate(model_id: int) -> None:
+    _cache.pop(model_id, None)
@@ -0,0 +1,56 @@
+# backend/app/services/outline_batch.py
+import asyncio
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple
+
+from app.services import ai_service
+from app.services.ai_events import AIEvent, ErrorEvent
+from app.services.model_config_cache import ResolvedModelConfig
+from app.services.sse import coalesce_deltas
+
+
+async def stream_variants(
+    model_config: ResolvedModelConfig,
+    prompt: str,
+    sampling: Optional[Dict[str, Any]],
+    count: int,
+    max_parallel: int,
+    project_id: Optional[int] = None,
+) -> AsyncGenerator[Tuple[int, Optional[AIEvent]], None]:
+    """
+    Runs `count` generations of the same prompt, at most `max_parallel` at a
+    time, and multiplexes their events as (variant index, event) pairs. A
+    variant is finished when its (index, None) pair is yielded.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max_parallel)
+
+    async def run(index: int) -> None:
+        try:
+            async with semaphore:
+                events = ai_service.stream_outline_events(
+                    model_config,
+                    prompt,
+                    sampling,
+                    route="outline_batch",
+                    project_id=project_id,
+                )
+                async for event in coalesce_deltas(events):
+                    queue.put_nowait((index, event))
+        except Exception as e:
+            # Report the variant as failed rather than as finished
+            queue.put_nowait((index, ErrorEvent(str(e))))
+        finally:
+            queue.put_nowait((index, None))
+
+    tasks = [asyncio.create_task(run(index)) for index in range(count)]
+    remaining = count
+    try:
+        while remaining:
+            index, event = await queue.get()
+            if event is None:
+                remaining -= 1
+            yield index, event
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
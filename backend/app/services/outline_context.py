@@ -0,0 +1,64 @@
+# backend/app/services/outline_context.py
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.crud import crud_setting
+from app.services import prompt_service
+
+
+async def load_context(
+    db: AsyncSession,
+    project_id: int,
+    worldview_id: Optional[int],
+    writing_style_id: Optional[int],
+) -> Optional[dict]:
+    """
+    Loads the project, settings and prompt template an outline is generated
+    from, or None if the project does not exist.
+    """
+    project = await crud.project.get(db, id=project_id)
+    if not project:
+        return None
+
+    worldview = (
+        await crud_setting.worldview.get(db, id=worldview_id) if worldview_id else None
+    )
+    writing_style = (
+        await crud_setting.writing_style.get(db, id=writing_style_id)
+        if writing_style_id
+        else None
+    )
+
+    template = await crud_setting.prompt_template.get_by_name(
+        db, name=prompt_service.OUTLINE_TEMPLATE_NAME
+    )
+
+    return {
+        "project": project,
+        "template": template,
+        "worldview": (
+            {c.name: getattr(worldview, c.name) for c in worldview.__table__.columns}
+            if worldview
+            else {}
+        ),
+        "writing_style": (
+            {
+                c.name: getattr(writing_style, c.name)
+                for c in writing_style.__table__.columns
+            }
+            if writing_style
+            else {}
+        ),
+    }
+
+
+def build_prompt(context: dict, target_word_count: int) -> str:
+    return prompt_service.create_outline_generation_prompt(
+        core_concept=context["project"].core_concept,
+        worldview=context["worldview"],
+        writing_style=context["writing_style"],
+        target_word_count=target_word_count,
+        template=context.get("template"),
+    )
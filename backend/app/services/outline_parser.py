@@ -0,0 +1,147 @@
+# backend/app/services/outline_parser.py
+import json
+import re
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services.ai_events import AIEvent, ContentEvent, OutlineFieldEvent
+
+_FENCE = re.compile(r"^\s*```[a-zA-Z]*\s*\n?|\n?\s*```\s*$")
+# The only characters that change the parser state
+_STRUCTURAL = re.compile(r'["\\{}\[\],]')
+
+
+def parse_outline(text: str) -> dict:
+    """
+    Parses the JSON outline produced for create_outline_generation_prompt.
+    Markdown code fences are tolerated; text that is not a JSON object is
+    kept under "raw" so that nothing the model produced is lost.
+    """
+    stripped = _FENCE.sub("", text.strip())
+    try:
+        data = json.loads(stripped)
+    except json.JSONDecodeError:
+        return {"raw": text}
+    return data if isinstance(data, dict) else {"raw": text}
+
+
+class OutlineStreamParser:
+    """
+    Parses a streamed JSON outline incrementally. Text before the opening
+    brace (such as a markdown fence) and after the closing one is ignored;
+    each top-level member is decoded once, as soon as the comma or brace that
+    ends it arrives, so the full document never needs a second parse.
+    """
+
+    __slots__ = (
+        "_chunks",
+        "_member",
+        "_fields",
+        "_offset",
+        "_depth",
+        "_in_string",
+        "_escaped",
+        "_closed",
+        "_failed",
+    )
+
+    def __init__(self):
+        self._chunks: List[str] = []
+        self._member: List[str] = []
+        self._fields: Dict[str, Any] = {}
+        self._offset = 0  # Stream position of the current chunk
+        self._depth = 0
+        self._in_string = False
+        self._escaped = -1  # Stream position of the character after a backslash
+        self._closed = False
+        self._failed = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consumes a chunk and returns the top-level fields it completed."""
+        self._chunks.append(chunk)
+        completed: List[Tuple[str, Any]] = []
+        if not (self._closed or self._failed):
+            start = 0 if self._depth else None
+            for match in _STRUCTURAL.finditer(chunk):
+                start = self._step(chunk, match.start(), start, completed)
+                if self._closed:
+                    break
+            else:
+                if start is not None:
+                    self._member.append(chunk[start:])
+        self._offset += len(chunk)
+        return completed
+
+    def _step(
+        self,
+        chunk: str,
+        i: int,
+        start: Optional[int],
+        completed: List[Tuple[str, Any]],
+    ) -> Optional[int]:
+        """Handles one structural character; returns the new member start."""
+        char = chunk[i]
+        if self._in_string:
+            self._step_in_string(char, self._offset + i)
+        elif self._depth == 0:
+            if char == "{":
+                self._depth = 1
+                return i + 1
+        elif char == '"':
+            self._in_string = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]" and self._depth > 1:
+            self._depth -= 1
+        elif char == "}" or (char == "," and self._depth == 1):
+            self._member.append(chunk[start:i])
+            self._complete_member(completed)
+            if char == "}":
+                self._depth = 0
+                self._closed = True
+            return i + 1
+        return start
+
+    def _step_in_string(self, char: str, position: int) -> None:
+        if position == self._escaped:
+            return
+        if char == "\\":
+            self._escaped = position + 1
+        elif char == '"':
+            self._in_string = False
+
+    def _complete_member(self, completed: List[Tuple[str, Any]]) -> None:
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return
+        try:
+            member = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            self._failed = True
+            return
+        self._fields.update(member)
+        completed.extend(member.items())
+
+    def result(self) -> dict:
+        """
+        The parsed outline. If the stream was not a well-formed JSON object
+        this falls back to parse_outline on the whole text.
+        """
+        if self._closed and not self._failed:
+            return dict(self._fields)
+        return parse_outline(self.text)
+
+
+async def with_outline_fields(
+    events: AsyncIterator[AIEvent], parser: OutlineStreamParser
+) -> AsyncGenerator[AIEvent, None]:
+    """Passes events through, adding an outline_field event per completed field."""
+    async for event in events:
+        yield event
+        if isinstance(event, ContentEvent):
+            for field, value in parser.feed(event.chunk):
+                yield OutlineFieldEvent(field, value)
@@ -0,0 +1,84 @@
+# backend/app/services/prompt_templates.py
+"""
+Server-side rendering of PromptTemplate rows. A template refers to its
+variables as `[name]`, where `name` is a key of the template's `variables`
+JSON; brackets around anything else are kept as literal text. A variable
+definition that is an object with a "default" makes the variable optional.
+
+Each template is parsed once into alternating literal and variable parts,
+cached by template id and row version, so rendering is a single join.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from app.models.setting import PromptTemplate
+
+_PLACEHOLDER = re.compile(r"\[([^\[\]\n]+)\]")
+
+
+class TemplateError(ValueError):
+    pass
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledTemplate:
+    # literals[i] precedes names[i]; len(literals) == len(names) + 1
+    literals: Tuple[str, ...]
+    names: Tuple[str, ...]
+    defaults: Dict[str, str]
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        parts = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = values.get(name)
+            if value is None:
+                value = self.defaults.get(name)
+                if value is None:
+                    raise TemplateError(f"Missing value for template variable '{name}'")
+            parts.append(value if isinstance(value, str) else str(value))
+            parts.append(literal)
+        return "".join(parts)
+
+
+def compile_template(
+    text: str, variables: Optional[Mapping[str, Any]] = None
+) -> CompiledTemplate:
+    declared = variables or {}
+    literals = []
+    names = []
+    start = 0
+    for match in _PLACEHOLDER.finditer(text):
+        name = match.group(1).strip()
+        if name not in declared:
+            continue
+        literals.append(text[start : match.start()])
+        names.append(name)
+        start = match.end()
+    literals.append(text[start:])
+
+    defaults = {
+        name: str(definition["default"])
+        for name, definition in declared.items()
+        if isinstance(definition, Mapping) and definition.get("default") is not None
+    }
+    return CompiledTemplate(tuple(literals), tuple(names), defaults)
+
+
+# PromptTemplate.id -> (row version, compiled template)
+_compiled: Dict[int, Tuple[int, CompiledTemplate]] = {}
+
+
+def get_compiled(template: PromptTemplate) -> CompiledTemplate:
+    """The compiled form of a template row, parsed once per row version."""
+    entry = _compiled.get(template.id)
+    if entry is not None and entry[0] == template.version:
+        return entry[1]
+    compiled = compile_template(template.template_text, template.variables)
+    _compiled[template.id] = (template.version, compiled)
+    return compiled
+
+
+def invalidate(template_id: int) -> None:
+    _compiled.pop(template_id, None)
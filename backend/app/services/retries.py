@@ -0,0 +1,174 @@
+# backend/app/services/retries.py
+"""
+Retries of upstream generations. Connection failures, timeouts, 429s and 5xx
+responses are retried with jittered exponential backoff, up to the model's
+retry limit. A stream that breaks after it produced output is resumed rather
+than restarted: the retry sends the partial reply back as an assistant prefix
+and asks the model to continue, so the client only receives the new text.
+"""
+
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional
+
+import httpx
+import openai
+import structlog
+
+from app.core import metrics
+from app.core.config import settings
+from app.services import prompt_service
+from app.services.ai_events import AIEvent, ContentEvent, ReasoningEvent
+from app.services.model_config_cache import ResolvedModelConfig
+
+logger = structlog.get_logger(__name__)
+
+# Client errors that are still worth another attempt
+_RETRY_STATUSES = {408, 409, 429}
+
+
+@dataclass(frozen=True, slots=True)
+class RetryPolicy:
+    max_retries: int
+    base_delay: float
+    max_delay: float
+
+    def backoff(self, attempt: int, error: Optional[BaseException] = None) -> float:
+        """
+        The delay before retry number `attempt` (from 1): uniformly random up
+        to base_delay * 2^(attempt - 1), capped at max_delay, and no shorter
+        than the Retry-After the upstream asked for (within the same cap).
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        delay = random.uniform(0, ceiling)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+def policy_for(model_config: ResolvedModelConfig) -> RetryPolicy:
+    max_retries = model_config.max_retries
+    if max_retries is None:
+        max_retries = settings.UPSTREAM_MAX_RETRIES
+    base_delay_ms = model_config.retry_base_delay_ms
+    if base_delay_ms is None:
+        base_delay_ms = settings.UPSTREAM_RETRY_BASE_DELAY_MS
+    return RetryPolicy(
+        max_retries=max_retries,
+        base_delay=base_delay_ms / 1000,
+        max_delay=settings.UPSTREAM_RETRY_MAX_DELAY_MS / 1000,
+    )
+
+
+def _retry_after(error: Optional[BaseException]) -> Optional[float]:
+    if not isinstance(error, openai.APIStatusError):
+        return None
+    try:
+        return float(error.response.headers.get("retry-after", ""))
+    except ValueError:
+        return None
+
+
+def retry_reason(error: BaseException) -> Optional[str]:
+    """Why an upstream error is worth retrying, or None if it is not."""
+    if isinstance(error, openai.APIStatusError):
+        status = error.status_code
+        if status in _RETRY_STATUSES or status >= 500:
+            return str(status)
+        return None
+    if isinstance(error, (openai.APITimeoutError, httpx.TimeoutException)):
+        return "timeout"
+    if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+        return "connection"
+    return None
+
+
+class Progress:
+    """What a generation has passed on so far, across retries and failover."""
+
+    __slots__ = ("content", "sent", "resumed")
+
+    def __init__(self):
+        self.content: List[str] = []
+        self.sent = False
+        self.resumed = False
+
+    def request(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """The messages for the next attempt, continuing any partial reply."""
+        if not self.sent:
+            return messages
+        self.resumed = True
+        if not self.content:
+            return messages
+        return [
+            *messages,
+            {"role": "assistant", "content": "".join(self.content)},
+            {"role": "user", "content": prompt_service.create_continuation_prompt()},
+        ]
+
+    def accept(self, event: AIEvent) -> bool:
+        """Records an event; False if it must not be passed on."""
+        if self.resumed and isinstance(event, ReasoningEvent):
+            # The client already has reasoning for this reply
+            return False
+        if isinstance(event, ContentEvent):
+            self.content.append(event.chunk)
+        self.sent = True
+        return True
+
+
+async def retrying(
+    open_stream: Callable[[List[Dict[str, str]]], AsyncIterator[AIEvent]],
+    messages: List[Dict[str, str]],
+    policy: RetryPolicy,
+    model_id: int,
+    progress: Progress,
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Yields the events of `open_stream(messages)`, retrying retryable errors
+    per `policy`; the last error is raised once the retries are exhausted.
+    """
+    loop = asyncio.get_running_loop()
+    attempt = 0
+    # When the first failure since the last event happened
+    failed_at: Optional[float] = None
+
+    def recovered() -> None:
+        nonlocal failed_at
+        if failed_at is not None:
+            metrics.summary("upstream_retry_delay_seconds", model_id=model_id).observe(
+                loop.time() - failed_at
+            )
+            failed_at = None
+
+    while True:
+        try:
+            async for event in open_stream(progress.request(messages)):
+                recovered()
+                if progress.accept(event):
+                    yield event
+            return
+        except Exception as e:
+            reason = retry_reason(e)
+            if reason is None or attempt >= policy.max_retries:
+                # The time spent retrying in vain is added latency too
+                recovered()
+                raise
+            attempt += 1
+            if failed_at is None:
+                failed_at = loop.time()
+            metrics.counter("upstream_retries", model_id=model_id, reason=reason).inc()
+            if progress.sent:
+                metrics.counter("upstream_resumes", model_id=model_id).inc()
+            delay = policy.backoff(attempt, e)
+            logger.info(
+                "upstream_retry",
+                model_id=model_id,
+                attempt=attempt,
+                reason=reason,
+                resumed=progress.sent,
+                delay=round(delay, 3),
+            )
+            await asyncio.sleep(delay)
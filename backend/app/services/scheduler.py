@@ -0,0 +1,237 @@
+# backend/app/services/scheduler.py
+import asyncio
+import enum
+import heapq
+import itertools
+import math
+import time
+from typing import AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.services import token_counter
+from app.services.ai_events import AIEvent, ErrorEvent, UsageEvent
+from app.services.model_config_cache import ResolvedModelConfig
+
+
+class Priority(enum.IntEnum):
+    """Lower values are served first."""
+
+    INTERACTIVE = 0
+    OUTLINE = 1
+    BACKGROUND = 2
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"AI model is busy, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to `per_minute` units."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay_for(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available."""
+        self._refill(now)
+        deficit = amount - self.tokens
+        return deficit / self.rate if deficit > 0 else 0.0
+
+    def consume(self, amount: float, now: float) -> None:
+        # May go negative: the debt delays the next callers
+        self._refill(now)
+        self.tokens -= amount
+
+
+class ModelScheduler:
+    """
+    Admission control for the upstream calls of one AI model: a concurrency
+    cap served in priority order, requests/min and tokens/min token buckets,
+    and a bounded wait queue.
+    """
+
+    def __init__(self, model_id: int):
+        self.model_id = model_id
+        self.limits: Tuple = ()
+        self.max_concurrency = settings.SCHEDULER_DEFAULT_MAX_CONCURRENCY
+        self.max_queue = settings.SCHEDULER_MAX_QUEUE
+        self.requests: Optional[TokenBucket] = None
+        self.tokens: Optional[TokenBucket] = None
+        self.active = 0
+        self.waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        # Moving average of how long a slot is held, for Retry-After estimates
+        self.hold_time = 1.0
+
+    def configure(self, model_config: ResolvedModelConfig) -> None:
+        limits = (
+            model_config.max_concurrency,
+            model_config.requests_per_minute,
+            model_config.tokens_per_minute,
+        )
+        if limits == self.limits:
+            return
+        self.limits = limits
+        self.max_concurrency = (
+            model_config.max_concurrency or settings.SCHEDULER_DEFAULT_MAX_CONCURRENCY
+        )
+        rpm, tpm = model_config.requests_per_minute, model_config.tokens_per_minute
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self._wake()
+
+    def _rate_delay(self, tokens: int, now: float) -> float:
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.delay_for(1, now)
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.delay_for(tokens, now))
+        return delay
+
+    def retry_after(self) -> float:
+        backlog = len(self.waiting) + 1
+        return max(1.0, self.hold_time * backlog / self.max_concurrency)
+
+    def check(self, tokens: int) -> None:
+        """Raises QueueFull if a new request would be rejected right now."""
+        if self.active >= self.max_concurrency and len(self.waiting) >= self.max_queue:
+            raise QueueFull(self.retry_after())
+        delay = self._rate_delay(tokens, time.monotonic())
+        if delay > settings.SCHEDULER_MAX_RATE_WAIT:
+            raise QueueFull(delay)
+
+    def _publish_depth(self) -> None:
+        model_id = self.model_id
+        metrics.gauge("scheduler_queue_depth", model_id=model_id).set(len(self.waiting))
+        metrics.gauge("scheduler_active", model_id=model_id).set(self.active)
+
+    def _wake(self) -> None:
+        while self.waiting and self.active < self.max_concurrency:
+            _, _, future = heapq.heappop(self.waiting)
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(None)
+        self._publish_depth()
+
+    async def _wait_for_slot(self, priority: Priority) -> None:
+        if self.active < self.max_concurrency and not self.waiting:
+            self.active += 1
+            self._publish_depth()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (int(priority), next(self._seq), future)
+        heapq.heappush(self.waiting, entry)
+        self._publish_depth()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was granted just before the cancellation
+                self.release(0.0)
+            elif entry in self.waiting:
+                self.waiting.remove(entry)
+                heapq.heapify(self.waiting)
+                self._publish_depth()
+            raise
+
+    async def acquire(self, priority: Priority, tokens: int) -> None:
+        """Waits for a slot and for the rate limits. Raises QueueFull."""
+        self.check(tokens)
+        started = time.monotonic()
+        await self._wait_for_slot(priority)
+        try:
+            now = time.monotonic()
+            delay = self._rate_delay(tokens, now)
+            if self.requests is not None:
+                self.requests.consume(1, now)
+            if self.tokens is not None:
+                self.tokens.consume(tokens, now)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:
+            self.release(0.0)
+            raise
+        metrics.summary(
+            "scheduler_wait_seconds", model_id=self.model_id, priority=priority.name
+        ).observe(time.monotonic() - started)
+
+    def charge(self, tokens: int) -> None:
+        """Adjusts the tokens/min bucket once the real usage is known."""
+        if self.tokens is not None and tokens:
+            self.tokens.consume(tokens, time.monotonic())
+
+    def release(self, held: float) -> None:
+        self.active -= 1
+        if held > 0:
+            self.hold_time = 0.8 * self.hold_time + 0.2 * held
+        self._wake()
+
+
+_schedulers: Dict[int, ModelScheduler] = {}
+
+
+def get_scheduler(model_config: ResolvedModelConfig) -> ModelScheduler:
+    scheduler = _schedulers.get(model_config.id)
+    if scheduler is None:
+        scheduler = _schedulers[model_config.id] = ModelScheduler(model_config.id)
+    scheduler.configure(model_config)
+    return scheduler
+
+
+def check_admission(
+    model_config: ResolvedModelConfig, messages: List[Dict[str, str]]
+) -> None:
+    """Fails fast with QueueFull when the model cannot take another request."""
+    try:
+        get_scheduler(model_config).check(token_counter.count_messages(messages))
+    except QueueFull:
+        metrics.counter("scheduler_rejections", model_id=model_config.id).inc()
+        raise
+
+
+async def schedule(
+    model_config: ResolvedModelConfig,
+    priority: Priority,
+    messages: List[Dict[str, str]],
+    events: AsyncIterator[AIEvent],
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Runs an upstream event stream once the model's scheduler admits it and
+    holds the slot until the stream ends.
+    """
+    scheduler = get_scheduler(model_config)
+    estimated = token_counter.count_messages(messages)
+    try:
+        await scheduler.acquire(priority, estimated)
+    except QueueFull as e:
+        metrics.counter("scheduler_rejections", model_id=model_config.id).inc()
+        yield ErrorEvent(str(e))
+        return
+
+    started = time.monotonic()
+    try:
+        async for event in events:
+            if isinstance(event, UsageEvent):
+                used = event.prompt_tokens + event.completion_tokens
+                scheduler.charge(used - estimated)
+            yield event
+    finally:
+        scheduler.release(time.monotonic() - started)
+
+
+def retry_after_header(error: QueueFull) -> Dict[str, str]:
+    return {"Retry-After": str(math.ceil(error.retry_after))}
@@ -0,0 +1,82 @@
+# backend/app/services/single_flight.py
+import asyncio
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, List
+
+from app.core import metrics
+from app.services.ai_events import AIEvent
+
+
+class _Flight:
+    """One upstream stream shared by every identical in-flight request."""
+
+    __slots__ = ("events", "done", "subscribers", "task", "changed")
+
+    def __init__(self):
+        self.events: List[AIEvent] = []
+        self.done = False
+        self.subscribers = 0
+        self.task: asyncio.Task | None = None
+        self.changed = asyncio.Event()
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+_flights: Dict[str, _Flight] = {}
+
+
+def in_flight(key: str) -> bool:
+    return key in _flights
+
+
+async def _produce(key: str, flight: _Flight, events: AsyncIterator[AIEvent]) -> None:
+    try:
+        async for event in events:
+            flight.events.append(event)
+            flight.notify()
+    finally:
+        flight.done = True
+        flight.notify()
+        if _flights.get(key) is flight:
+            del _flights[key]
+
+
+async def subscribe(
+    key: str, factory: Callable[[], AsyncIterator[AIEvent]]
+) -> AsyncGenerator[AIEvent, None]:
+    """
+    Yields the events of the request identified by `key`. The first caller
+    starts the upstream stream built by `factory`; identical requests arriving
+    while it runs attach to it and first replay the events already emitted.
+    The upstream stream is cancelled once its last subscriber goes away.
+    """
+    flight = _flights.get(key)
+    if flight is None:
+        flight = _Flight()
+        flight.task = asyncio.create_task(_produce(key, flight, factory()))
+        _flights[key] = flight
+        metrics.counter("single_flight_producers").inc()
+    else:
+        metrics.counter("single_flight_subscribers").inc()
+
+    flight.subscribers += 1
+    index = 0
+    try:
+        while True:
+            changed = flight.changed
+            if index < len(flight.events):
+                event = flight.events[index]
+                index += 1
+                yield event
+            elif flight.done:
+                return
+            else:
+                await changed.wait()
+    finally:
+        flight.subscribers -= 1
+        if flight.subscribers == 0 and not flight.done:
+            flight.task.cancel()
+            if _flights.get(key) is flight:
+                del _flights[key]
+            metrics.counter("single_flight_cancellations").inc()
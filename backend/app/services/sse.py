@@ -0,0 +1,187 @@
+# backend/app/services/sse.py
+import asyncio
+import contextlib
+import json
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Tuple, Type
+
+from starlette.requests import Request
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.ai_events import TEXT_EVENTS, AIEvent
+
+
+def format_sse(event: str, data: dict, id: Optional[str] = None) -> str:
+    frame = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return frame if id is None else f"id: {id}\n{frame}"
+
+
+async def encode_events(events: AsyncIterator[AIEvent]) -> AsyncGenerator[str, None]:
+    """Adapts a typed event stream to Server-Sent Events frames."""
+    async for event in coalesce_deltas(events):
+        yield format_sse(event.event, event.payload())
+
+
+async def encode_sequenced(
+    stream_id: str, events: AsyncIterator[Tuple[Optional[int], AIEvent]]
+) -> AsyncGenerator[str, None]:
+    """Encodes (sequence, event) pairs with '<stream id>:<sequence>' event ids."""
+    async for seq, event in events:
+        id = None if seq is None else f"{stream_id}:{seq}"
+        yield format_sse(event.event, event.payload(), id)
+
+
+class _DeltaBuffer:
+    """Accumulates the text of consecutive events of one text event type."""
+
+    __slots__ = ("window", "max_bytes", "kind", "chunks", "size", "deadline", "seen")
+
+    def __init__(self, window: float, max_bytes: int):
+        self.window = window
+        self.max_bytes = max_bytes
+        self.kind: Optional[Type] = None
+        self.chunks: List[str] = []
+        self.size = 0
+        self.deadline = 0.0
+        self.seen = False
+
+    def take(self) -> AIEvent:
+        event = self.kind("".join(self.chunks))
+        self.kind, self.chunks, self.size = None, [], 0
+        return event
+
+    def feed(self, event: AIEvent, now: float) -> List[AIEvent]:
+        """Buffers an event and returns the events that must be emitted now."""
+        ready: List[AIEvent] = []
+        if self.kind is not None and type(event) is not self.kind:
+            ready.append(self.take())
+
+        if not isinstance(event, TEXT_EVENTS) or not self.seen:
+            self.seen = True
+            ready.append(event)
+            return ready
+
+        if self.kind is None:
+            self.kind = type(event)
+            self.deadline = now + self.window
+        self.chunks.append(event.chunk)
+        self.size += len(event.chunk.encode("utf-8"))
+        if self.size >= self.max_bytes:
+            ready.append(self.take())
+        return ready
+
+
+async def close_iterator(
+    iterator: AsyncIterator, pending: Optional[asyncio.Future] = None
+) -> None:
+    """Cancels a pending __anext__ of an async iterator and closes it."""
+    if pending is not None:
+        pending.cancel()
+        with contextlib.suppress(BaseException):
+            await pending
+    aclose = getattr(iterator, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+def coalesce_deltas(
+    events: AsyncIterator[AIEvent],
+    *,
+    window: Optional[float] = None,
+    max_bytes: Optional[int] = None,
+) -> AsyncIterator[AIEvent]:
+    """
+    Merges consecutive reasoning/content events of the same type into one, so
+    that a provider sending 1-3 characters per chunk does not turn into
+    thousands of SSE frames. A merged event is emitted when the type changes,
+    when the buffer holds `max_bytes`, or `window` seconds after its first
+    chunk, whichever comes first. The very first event and any non-text event
+    (e.g. errors) are emitted right away; event order is always preserved.
+    """
+    if window is None:
+        window = settings.SSE_COALESCE_WINDOW_MS / 1000
+    if max_bytes is None:
+        max_bytes = settings.SSE_COALESCE_MAX_BYTES
+
+    if window <= 0:
+        return events
+    return _coalesce(events, _DeltaBuffer(window, max_bytes))
+
+
+async def _coalesce(
+    events: AsyncIterator[AIEvent], buffer: _DeltaBuffer
+) -> AsyncGenerator[AIEvent, None]:
+    loop = asyncio.get_running_loop()
+    iterator = events.__aiter__()
+    pending: Optional[asyncio.Future] = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+
+            timeout = None
+            if buffer.kind is not None:
+                timeout = max(0.0, buffer.deadline - loop.time())
+            done, _ = await asyncio.wait({pending}, timeout=timeout)
+            if not done:
+                # The window expired while waiting on the upstream
+                yield buffer.take()
+                continue
+
+            future, pending = pending, None
+            try:
+                event = future.result()
+            except StopAsyncIteration:
+                break
+            for ready in buffer.feed(event, loop.time()):
+                yield ready
+
+        if buffer.kind is not None:
+            yield buffer.take()
+    finally:
+        await close_iterator(iterator, pending)
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+def _route_path(request: Request) -> str:
+    # The route template (/ai/streams/{stream_id}), not the path of this
+    # request, so the counter gets one series per endpoint
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+async def cancel_on_disconnect(
+    request: Request, frames: AsyncIterator[str]
+) -> AsyncGenerator[str, None]:
+    """
+    Passes response frames through until the client disconnects, then closes
+    the frame iterator at once (and with it whatever produces the frames).
+    Under ASGI spec 2.4 servers Starlette only notices a disconnect when a
+    write fails, which for a slow upstream can take the whole generation.
+    """
+    disconnected = asyncio.ensure_future(_wait_for_disconnect(request))
+    iterator = frames.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    try:
+        while True:
+            pending = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait(
+                {pending, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if pending not in done:
+                metrics.counter("client_disconnects", route=_route_path(request)).inc()
+                return
+            future, pending = pending, None
+            try:
+                frame = future.result()
+            except StopAsyncIteration:
+                return
+            yield frame
+    finally:
+        disconnected.cancel()
+        await close_iterator(iterator, pending)
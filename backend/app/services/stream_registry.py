@@ -0,0 +1,156 @@
+# backend/app/services/stream_registry.py
+"""
+Resumable generation streams. Each stream runs detached from the HTTP
+response that started it and records its sequence-numbered events in a
+bounded ring buffer, so a client that lost its connection can reconnect with
+Last-Event-ID and continue without a new upstream call. Streams live in the
+worker process that started them.
+"""
+
+import asyncio
+import uuid
+from collections import deque
+from typing import AsyncGenerator, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+from app.services.ai_events import AIEvent, ErrorEvent
+from app.services.sse import coalesce_deltas
+
+
+class ResumableStream:
+    __slots__ = (
+        "id",
+        "buffer",
+        "next_seq",
+        "done",
+        "task",
+        "changed",
+        "subscribers",
+        "detach_timer",
+    )
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.buffer: Deque[Tuple[int, AIEvent]] = deque(
+            maxlen=settings.STREAM_BUFFER_EVENTS
+        )
+        self.next_seq = 1
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.detach_timer: Optional[asyncio.TimerHandle] = None
+
+    def notify(self) -> None:
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def append(self, event: AIEvent) -> None:
+        self.buffer.append((self.next_seq, event))
+        self.next_seq += 1
+        self.notify()
+
+
+_streams: Dict[str, ResumableStream] = {}
+
+
+def _forget(stream_id: str) -> None:
+    _streams.pop(stream_id, None)
+
+
+async def _produce(stream: ResumableStream, events: AsyncIterator[AIEvent]) -> None:
+    try:
+        async for event in coalesce_deltas(events):
+            stream.append(event)
+    finally:
+        stream.done = True
+        stream.notify()
+        # Keep the tail around so late reconnects can still replay it
+        asyncio.get_running_loop().call_later(
+            settings.STREAM_RESUME_GRACE_SECONDS, _forget, stream.id
+        )
+
+
+def start(events: AsyncIterator[AIEvent]) -> ResumableStream:
+    stream = ResumableStream()
+    stream.task = asyncio.create_task(_produce(stream, events))
+    _streams[stream.id] = stream
+    _schedule_abandon(stream)
+    return stream
+
+
+def get(stream_id: str) -> Optional[ResumableStream]:
+    return _streams.get(stream_id)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """Splits a '<stream id>:<sequence>' event id; None if malformed."""
+    if not value:
+        return None
+    stream_id, _, seq = value.partition(":")
+    if not seq.isdigit():
+        return None
+    return stream_id, int(seq)
+
+
+def _abandon(stream: ResumableStream) -> None:
+    stream.detach_timer = None
+    if stream.subscribers == 0 and not stream.done:
+        stream.task.cancel()
+        _forget(stream.id)
+        metrics.counter("resumable_streams_abandoned").inc()
+
+
+def _attach(stream: ResumableStream) -> None:
+    stream.subscribers += 1
+    if stream.detach_timer is not None:
+        stream.detach_timer.cancel()
+        stream.detach_timer = None
+
+
+def _schedule_abandon(stream: ResumableStream) -> None:
+    # Give the client a chance to (re)connect before cancelling upstream
+    stream.detach_timer = asyncio.get_running_loop().call_later(
+        settings.STREAM_DETACH_TIMEOUT_SECONDS, _abandon, stream
+    )
+
+
+def _detach(stream: ResumableStream) -> None:
+    stream.subscribers -= 1
+    if stream.subscribers == 0 and not stream.done:
+        _schedule_abandon(stream)
+
+
+async def subscribe(
+    stream: ResumableStream, last_seq: int = 0
+) -> AsyncGenerator[Tuple[Optional[int], AIEvent], None]:
+    """
+    Yields (sequence, event) pairs after `last_seq`, replaying buffered
+    events first. If the requested events were already evicted from the ring
+    buffer an error event without a sequence is yielded and the replay
+    continues from the oldest event still available.
+    """
+    _attach(stream)
+    if last_seq:
+        metrics.counter("resumable_streams_resumed").inc()
+    next_seq = last_seq + 1
+    try:
+        while True:
+            changed = stream.changed
+            if next_seq < stream.next_seq:
+                oldest = stream.buffer[0][0]
+                if next_seq < oldest:
+                    missing = f"events {next_seq}-{oldest - 1} are no longer available"
+                    next_seq = oldest
+                    yield None, ErrorEvent(missing)
+                    continue
+                seq, event = stream.buffer[next_seq - oldest]
+                next_seq += 1
+                yield seq, event
+            elif stream.done:
+                return
+            else:
+                await changed.wait()
+    finally:
+        _detach(stream)
@@ -0,0 +1,250 @@
+# backend/app/services/usage_tracker.py
+"""
+Per-generation accounting. Every upstream generation produces one
+GenerationUsage row with its token counts (as reported by the upstream, or
+estimated when it reports none), time to first token, duration and output
+rate. Rows are buffered in memory and written in batches, off the response
+path, every USAGE_FLUSH_SECONDS or once USAGE_FLUSH_ROWS are pending.
+"""
+
+import asyncio
+import math
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Sequence
+
+import structlog
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud, schemas
+from app.core import metrics
+from app.core.config import settings
+from app.crud.crud_generation_usage import PERCENTILES
+from app.database import SessionLocal
+from app.services import token_counter
+from app.services.ai_events import (
+    AIEvent,
+    ContentEvent,
+    ErrorEvent,
+    ReasoningEvent,
+    UsageEvent,
+)
+
+logger = structlog.get_logger(__name__)
+
+_pending: List[Dict[str, Any]] = []
+_wakeup: Optional[asyncio.Event] = None
+_flusher: Optional[asyncio.Task] = None
+
+
+async def start() -> None:
+    global _wakeup, _flusher
+    _wakeup = asyncio.Event()
+    _flusher = asyncio.create_task(_flush_periodically())
+
+
+async def stop() -> None:
+    global _flusher
+    if _flusher is not None:
+        _flusher.cancel()
+        await asyncio.gather(_flusher, return_exceptions=True)
+        _flusher = None
+    await flush()
+
+
+def record(row: Dict[str, Any]) -> None:
+    if len(_pending) >= settings.USAGE_MAX_PENDING_ROWS:
+        # The database is unreachable (or the flusher is not running)
+        metrics.counter("usage_rows_dropped").inc()
+        return
+    _pending.append(row)
+    if _wakeup is not None and len(_pending) >= settings.USAGE_FLUSH_ROWS:
+        _wakeup.set()
+
+
+async def flush() -> None:
+    """Writes the pending rows in one statement."""
+    if not _pending:
+        return
+    rows = _pending[:]
+    _pending.clear()
+    try:
+        async with SessionLocal() as db:
+            await crud.generation_usage.insert_many(db, rows=rows)
+        metrics.counter("usage_rows_written").inc(len(rows))
+    except Exception as e:
+        metrics.counter("usage_rows_dropped").inc(len(rows))
+        logger.warning("usage_flush_failed", rows=len(rows), error=str(e))
+
+
+async def _flush_periodically() -> None:
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), settings.USAGE_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+        await flush()
+
+
+async def track(
+    events: AsyncIterator[AIEvent],
+    model_id: int,
+    messages: List[Dict[str, str]],
+    route: str,
+    project_id: Optional[int] = None,
+) -> AsyncGenerator[AIEvent, None]:
+    """Passes the events of one generation through and records its usage."""
+    started = time.monotonic()
+    first_token: Optional[float] = None
+    usage: Optional[UsageEvent] = None
+    # The text, only counted if the upstream does not report usage
+    content: List[str] = []
+    reasoning_text: List[str] = []
+    status = "cancelled"
+    try:
+        async for event in events:
+            if isinstance(event, (ContentEvent, ReasoningEvent)):
+                if first_token is None:
+                    first_token = time.monotonic()
+                if isinstance(event, ContentEvent):
+                    content.append(event.chunk)
+                else:
+                    reasoning_text.append(event.chunk)
+            elif isinstance(event, UsageEvent):
+                usage = event
+            elif isinstance(event, ErrorEvent):
+                status = "error"
+            yield event
+        if status != "error":
+            status = "ok"
+    finally:
+        finished = time.monotonic()
+        if usage is not None:
+            prompt = usage.prompt_tokens
+            completion = usage.completion_tokens
+            reasoning = usage.reasoning_tokens
+        else:
+            prompt = token_counter.count_messages(messages)
+            reasoning = token_counter.count_text("".join(reasoning_text))
+            completion = token_counter.count_text("".join(content)) + reasoning
+        generating = finished - first_token if first_token is not None else 0.0
+        record(
+            {
+                "ai_model_id": model_id,
+                "route": route,
+                "project_id": project_id,
+                "status": status,
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+                "reasoning_tokens": reasoning,
+                "usage_estimated": usage is None,
+                "ttft_ms": (
+                    (first_token - started) * 1000 if first_token is not None else None
+                ),
+                "duration_ms": (finished - started) * 1000,
+                "tokens_per_second": (
+                    completion / generating if generating > 0 and completion else None
+                ),
+            }
+        )
+
+
+def _percentiles(values: List[float]) -> Optional[schemas.Percentiles]:
+    if not values:
+        return None
+    values = sorted(values)
+
+    def at(fraction: float) -> float:
+        # Nearest rank
+        return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+    return schemas.Percentiles(
+        p50=round(at(0.50), 2),
+        p90=round(at(0.90), 2),
+        p99=round(at(0.99), 2),
+        max=round(values[-1], 2),
+    )
+
+
+def summarize(rows: Sequence[Row]) -> List[schemas.ModelUsageStats]:
+    """Aggregates usage rows (see crud.generation_usage.get_since) per model."""
+    by_model: Dict[Optional[int], List[Row]] = defaultdict(list)
+    for row in rows:
+        by_model[row.ai_model_id].append(row)
+
+    stats = []
+    for model_id, model_rows in sorted(
+        by_model.items(), key=lambda item: (item[0] is None, item[0] or 0)
+    ):
+        statuses = Counter(row.status for row in model_rows)
+        stats.append(
+            schemas.ModelUsageStats(
+                ai_model_id=model_id,
+                requests=len(model_rows),
+                errors=statuses["error"],
+                cancelled=statuses["cancelled"],
+                prompt_tokens=sum(row.prompt_tokens for row in model_rows),
+                completion_tokens=sum(row.completion_tokens for row in model_rows),
+                reasoning_tokens=sum(row.reasoning_tokens for row in model_rows),
+                ttft_ms=_percentiles(
+                    [row.ttft_ms for row in model_rows if row.ttft_ms is not None]
+                ),
+                duration_ms=_percentiles(
+                    [row.duration_ms for row in model_rows if row.status == "ok"]
+                ),
+                tokens_per_second=_percentiles(
+                    [
+                        row.tokens_per_second
+                        for row in model_rows
+                        if row.tokens_per_second is not None
+                    ]
+                ),
+            )
+        )
+    return stats
+
+
+async def stats(
+    db: AsyncSession,
+    *,
+    since: datetime,
+    ai_model_id: Optional[int] = None,
+    route: Optional[str] = None,
+) -> List[schemas.ModelUsageStats]:
+    """
+    Usage statistics per model of the rows created since `since`. PostgreSQL
+    aggregates them itself; elsewhere (SQLite in the tests) the rows are read
+    and summarized here.
+    """
+    window = {"since": since, "ai_model_id": ai_model_id, "route": route}
+    if db.get_bind().dialect.name != "postgresql":
+        return summarize(await crud.generation_usage.get_since(db, **window))
+    rows = await crud.generation_usage.aggregate_since(db, **window)
+    return [_aggregated_stats(row) for row in rows]
+
+
+def _aggregated_percentiles(row: Row, column: str) -> Optional[schemas.Percentiles]:
+    values = {name: getattr(row, f"{column}_{name}") for name, _ in PERCENTILES}
+    if values["max"] is None:
+        return None
+    return schemas.Percentiles(
+        **{name: round(value, 2) for name, value in values.items()}
+    )
+
+
+def _aggregated_stats(row: Row) -> schemas.ModelUsageStats:
+    return schemas.ModelUsageStats(
+        ai_model_id=row.ai_model_id,
+        requests=row.requests,
+        errors=row.errors,
+        cancelled=row.cancelled,
+        prompt_tokens=row.prompt_tokens,
+        completion_tokens=row.completion_tokens,
+        reasoning_tokens=row.reasoning_tokens,
+        ttft_ms=_aggregated_percentiles(row, "ttft_ms"),
+        duration_ms=_aggregated_percentiles(row, "duration_ms"),
+        tokens_per_second=_aggregated_percentiles(row, "tokens_per_second"),
+    )
@@ -0,0 +1,282 @@
+"""
+Drives `/ai/chat-stream` or `/ai/generate-outline-stream` of a running backend
+at a fixed concurrency and reports time to first byte (the response headers),
+time to the first generated text, the latency between streamed frames,
+throughput and, given the server's pid, its CPU and RSS.
+
+    python -m benchmarks.mock_openai --port 9000 &
+    uvicorn app.main:app --port 8000 &
+    python -m benchmarks.load_stream --endpoint chat --concurrency 32 \\
+        --requests 256 --mock-url http://127.0.0.1:9000/v1 --server-pid <pid>
+
+With --mock-url an AIModel pointing at the mock server (and, for outlines, a
+project) is created first; otherwise pass --ai-model-id and --project-id.
+Every request carries a unique nonce so that neither the generation cache nor
+single-flight coalescing serves it from another request. CPU and RSS are read
+from /proc and are only available on Linux.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+
+TEXT_EVENTS = ("content", "reasoning")
+
+
+@dataclass
+class RequestResult:
+    status: int = 0
+    ttfb: Optional[float] = None
+    # Time to the first content or reasoning frame
+    ttft: Optional[float] = None
+    duration: float = 0.0
+    gaps: List[float] = field(default_factory=list)
+    frames: int = 0
+    text_chars: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class ProcessSample:
+    cpu_seconds: float
+    rss_bytes: int
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def at(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {
+        "mean": statistics.fmean(ordered),
+        "p50": at(0.50),
+        "p90": at(0.90),
+        "p99": at(0.99),
+        "max": ordered[-1],
+    }
+
+
+def sample_process(pid: int) -> Optional[ProcessSample]:
+    """CPU time and resident memory of a process, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            # Fields after the parenthesised command name; utime and stime are
+            # the 12th and 13th of them
+            stat = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    return ProcessSample(
+        cpu_seconds=(int(stat[11]) + int(stat[12])) / ticks,
+        rss_bytes=resident_pages * os.sysconf("SC_PAGE_SIZE"),
+    )
+
+
+async def monitor(
+    pid: int, interval: float, samples: List[ProcessSample], stop: asyncio.Event
+) -> None:
+    while not stop.is_set():
+        sample = sample_process(pid)
+        if sample is not None:
+            samples.append(sample)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+def request_body(args: argparse.Namespace, n: int) -> dict:
+    nonce = f"[{uuid.uuid4().hex} #{n}]"
+    if args.endpoint == "chat":
+        return {
+            "ai_model_id": args.ai_model_id,
+            "messages": [{"role": "user", "content": f"{args.prompt} {nonce}"}],
+        }
+    return {
+        "ai_model_id": args.ai_model_id,
+        "project_id": args.project_id,
+        "target_word_count": 100000,
+        "prompt": f"{args.prompt} {nonce}",
+        "bypass_cache": True,
+    }
+
+
+async def run_request(
+    client: httpx.AsyncClient, path: str, body: dict
+) -> RequestResult:
+    result = RequestResult()
+    start = time.perf_counter()
+    last_frame = None
+    event = None
+    try:
+        async with client.stream("POST", path, json=body) as response:
+            result.status = response.status_code
+            result.ttfb = time.perf_counter() - start
+            async for line in response.aiter_lines():
+                now = time.perf_counter()
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    result.frames += 1
+                    if last_frame is not None:
+                        result.gaps.append(now - last_frame)
+                    last_frame = now
+                    if event in TEXT_EVENTS:
+                        if result.ttft is None:
+                            result.ttft = now - start
+                        result.text_chars += len(json.loads(line[5:])["chunk"])
+                    elif event == "error":
+                        result.error = line[5:].strip()
+            if response.status_code >= 400:
+                result.error = result.error or f"HTTP {response.status_code}"
+    except httpx.HTTPError as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.duration = time.perf_counter() - start
+    return result
+
+
+async def setup(client: httpx.AsyncClient, args: argparse.Namespace) -> None:
+    """Creates the AIModel (and project) that point the backend at the mock."""
+    if args.ai_model_id is None:
+        response = await client.post(
+            "/settings/ai-models/",
+            json={
+                "name": f"load-test {uuid.uuid4().hex[:8]}",
+                "api_url": args.mock_url,
+                "api_key": "mock",
+                "model_name": "mock",
+                "model_type": "LANGUAGE_MODEL",
+                "max_concurrency": args.concurrency,
+            },
+        )
+        response.raise_for_status()
+        args.ai_model_id = response.json()["id"]
+    if args.endpoint == "outline" and args.project_id is None:
+        response = await client.post(
+            "/projects/", json={"name": "load-test", "core_concept": args.prompt}
+        )
+        response.raise_for_status()
+        args.project_id = response.json()["id"]
+
+
+async def run(args: argparse.Namespace) -> None:
+    path = (
+        "/ai/chat-stream" if args.endpoint == "chat" else "/ai/generate-outline-stream"
+    )
+    limits = httpx.Limits(max_connections=args.concurrency)
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=timeout
+    ) as client:
+        if args.ai_model_id is None or (
+            args.endpoint == "outline" and args.project_id is None
+        ):
+            if args.mock_url is None:
+                raise SystemExit("Pass --mock-url, or --ai-model-id (and --project-id)")
+            await setup(client, args)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for n in range(args.requests):
+            queue.put_nowait(n)
+        results: List[RequestResult] = []
+
+        async def worker() -> None:
+            while True:
+                try:
+                    n = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results.append(await run_request(client, path, request_body(args, n)))
+
+        samples: List[ProcessSample] = []
+        stop = asyncio.Event()
+        sampler = None
+        if args.server_pid is not None:
+            sampler = asyncio.create_task(
+                monitor(args.server_pid, args.sample_interval, samples, stop)
+            )
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        if sampler is not None:
+            await sampler
+
+    report(args, results, elapsed, samples)
+
+
+def report(
+    args: argparse.Namespace,
+    results: List[RequestResult],
+    elapsed: float,
+    samples: List[ProcessSample],
+) -> None:
+    failed = [r for r in results if r.error is not None]
+    print(
+        f"{args.endpoint}: {len(results)} requests at concurrency "
+        f"{args.concurrency} in {elapsed:.2f}s ({len(failed)} failed)"
+    )
+    rows = {
+        "ttfb (ms)": [r.ttfb * 1000 for r in results if r.ttfb is not None],
+        "ttft (ms)": [r.ttft * 1000 for r in results if r.ttft is not None],
+        "inter-chunk (ms)": [g * 1000 for r in results for g in r.gaps],
+        "duration (ms)": [r.duration * 1000 for r in results],
+    }
+    print(f"{'':>18} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+    for name, values in rows.items():
+        stats = _percentiles(values)
+        if stats:
+            print(f"{name:>18} " + " ".join(f"{v:9.1f}" for v in stats.values()))
+
+    frames = sum(r.frames for r in results)
+    chars = sum(r.text_chars for r in results)
+    print(
+        f"throughput: {len(results) / elapsed:.1f} req/s, "
+        f"{frames / elapsed:.0f} frames/s, {chars / elapsed:.0f} text chars/s"
+    )
+    if len(samples) >= 2:
+        cpu = samples[-1].cpu_seconds - samples[0].cpu_seconds
+        wall = elapsed if elapsed > 0 else 1.0
+        rss = [s.rss_bytes / 2**20 for s in samples]
+        print(
+            f"server: {cpu / wall * 100:.0f}% cpu, "
+            f"rss mean {statistics.fmean(rss):.0f} MiB, max {max(rss):.0f} MiB"
+        )
+    errors: Dict[str, int] = {}
+    for r in failed:
+        errors[r.error] = errors.get(r.error, 0) + 1
+    for error, count in sorted(errors.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {count} x {error[:120]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000/api/v1")
+    parser.add_argument("--endpoint", choices=("chat", "outline"), default="chat")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=128)
+    parser.add_argument("--mock-url", help="Create an AIModel pointing here")
+    parser.add_argument("--ai-model-id", type=int)
+    parser.add_argument("--project-id", type=int)
+    parser.add_argument("--prompt", default="写一个关于巨龙与失落魔法的故事。")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--server-pid", type=int)
+    parser.add_argument("--sample-interval", type=float, default=0.25)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
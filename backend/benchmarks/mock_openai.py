@@ -0,0 +1,241 @@
+"""
+A local server speaking the OpenAI chat-completions protocol, for load tests
+that must not reach a paid upstream. Streamed replies carry optional
+`reasoning_content` deltas followed by content deltas, emitted at a
+configurable token rate after a first-token delay; every delay is jittered,
+and a fraction of requests can fail up front or be cut off mid-stream.
+
+    python -m benchmarks.mock_openai --port 9000 --token-rate 80
+
+Point an AIModel's api_url at http://localhost:9000/v1 to use it.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass, fields
+from typing import AsyncGenerator, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+_WORDS = (
+    "王国 巨龙 魔法 骑士 旅途 城堡 预言 森林 秘密 黎明 "
+    "the kingdom slowly lost its magic as the dragons returned "
+).split()
+
+
+@dataclass
+class MockConfig:
+    tokens: int = 200
+    reasoning_tokens: int = 0
+    # Tokens per second once the first token has been sent
+    token_rate: float = 50.0
+    first_token_delay: float = 0.5
+    # Each delay is scaled by a random factor in [1 - jitter, 1 + jitter]
+    jitter: float = 0.2
+    # Fraction of requests answered with HTTP 500 before streaming starts
+    error_rate: float = 0.0
+    # Fraction of streams whose connection is dropped partway through
+    mid_stream_error_rate: float = 0.0
+    # "text", or "json" for an outline-shaped JSON object
+    content: str = "text"
+    seed: Optional[int] = None
+
+
+class _Abort(Exception):
+    """Raised inside a response body to drop the connection mid-stream."""
+
+
+def _caused_by_abort(exc: Optional[BaseException]) -> bool:
+    while exc is not None:
+        if isinstance(exc, _Abort):
+            return True
+        # An exception group raised by the response's task group
+        if any(_caused_by_abort(e) for e in getattr(exc, "exceptions", ())):
+            return True
+        exc = exc.__context__
+    return False
+
+
+def _quiet_aborts(record: logging.LogRecord) -> bool:
+    """Keeps the injected mid-stream failures out of the server's error log."""
+    return not (record.exc_info and _caused_by_abort(record.exc_info[1]))
+
+
+def _text_tokens(count: int, rng: random.Random) -> List[str]:
+    return [rng.choice(_WORDS) + " " for _ in range(count)]
+
+
+def _json_tokens(count: int, rng: random.Random) -> List[str]:
+    """An outline JSON object split into roughly `count` pieces."""
+    chapters = max(1, count // 40)
+    outline = {
+        "title": "".join(rng.choice(_WORDS) for _ in range(3)),
+        "summary": " ".join(rng.choice(_WORDS) for _ in range(count // 4)),
+        "chapters": [
+            {
+                "title": f"第{i + 1}章",
+                "summary": " ".join(rng.choice(_WORDS) for _ in range(8)),
+            }
+            for i in range(chapters)
+        ],
+    }
+    text = json.dumps(outline, ensure_ascii=False)
+    size = max(1, len(text) // max(1, count))
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def _chunk(completion_id: str, model: str, delta: dict, finish=None) -> str:
+    data = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+    }
+    return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+class MockUpstream:
+    """Generates the replies of the mock server from a MockConfig."""
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+
+    def jittered(self, seconds: float) -> float:
+        jitter = self.config.jitter
+        return max(0.0, seconds * self.rng.uniform(1 - jitter, 1 + jitter))
+
+    def fails(self, rate: float) -> bool:
+        return self.rng.random() < rate
+
+    def reply(self) -> Tuple[List[str], List[str]]:
+        """The reasoning and content tokens of one reply."""
+        make = _json_tokens if self.config.content == "json" else _text_tokens
+        return (
+            _text_tokens(self.config.reasoning_tokens, self.rng),
+            make(self.config.tokens, self.rng),
+        )
+
+    async def stream(self, body: dict) -> AsyncGenerator[str, None]:
+        config = self.config
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        model = body.get("model", "mock")
+        reasoning, content = self.reply()
+        deltas = [{"reasoning_content": token} for token in reasoning]
+        deltas += [{"content": token} for token in content]
+        abort_at = None
+        if self.fails(config.mid_stream_error_rate):
+            abort_at = self.rng.randrange(len(deltas) or 1)
+        interval = 1 / config.token_rate if config.token_rate > 0 else 0.0
+
+        yield _chunk(completion_id, model, {"role": "assistant", "content": ""})
+        await asyncio.sleep(self.jittered(config.first_token_delay))
+        for i, delta in enumerate(deltas):
+            if i == abort_at:
+                raise _Abort()
+            if i:
+                await asyncio.sleep(self.jittered(interval))
+            yield _chunk(completion_id, model, delta)
+        yield _chunk(completion_id, model, {}, finish="stop")
+        if (body.get("stream_options") or {}).get("include_usage"):
+            usage = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [],
+                "usage": _usage(_prompt_tokens(body), len(deltas)),
+            }
+            yield f"data: {json.dumps(usage)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    async def complete(self, body: dict) -> dict:
+        config = self.config
+        reasoning, content = self.reply()
+        total = len(reasoning) + len(content)
+        duration = total / config.token_rate if config.token_rate > 0 else 0.0
+        await asyncio.sleep(self.jittered(config.first_token_delay) + duration)
+        message = {"role": "assistant", "content": "".join(content)}
+        if reasoning:
+            message["reasoning_content"] = "".join(reasoning)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": _usage(_prompt_tokens(body), total),
+        }
+
+
+def create_app(config: MockConfig) -> FastAPI:
+    app = FastAPI(title="Mock OpenAI")
+    upstream = MockUpstream(config)
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "mock", "object": "model"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        if upstream.fails(config.error_rate):
+            return JSONResponse(
+                status_code=500,
+                content={
+                    "error": {"message": "Injected error", "type": "server_error"}
+                },
+            )
+        if body.get("stream"):
+            return StreamingResponse(
+                upstream.stream(body), media_type="text/event-stream"
+            )
+        return await upstream.complete(body)
+
+    return app
+
+
+def _prompt_tokens(body: dict) -> int:
+    # A rough count; the mock does not need to match any real tokenizer
+    return sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 2
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    defaults = MockConfig()
+    for field in fields(MockConfig):
+        default = getattr(defaults, field.name)
+        parser.add_argument(
+            "--" + field.name.replace("_", "-"),
+            type=int if field.name == "seed" else type(default),
+            default=default,
+        )
+    args = vars(parser.parse_args())
+    host, port = args.pop("host"), args.pop("port")
+    logging.getLogger("uvicorn.error").addFilter(_quiet_aborts)
+    uvicorn.run(
+        create_app(MockConfig(**args)), host=host, port=port, log_level="warning"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+
+# --- Test Database Setup ---
+DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+engine = create_async_engine(DATABASE_URL, echo=True)
+TestingSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+)
+
+
+async def override_get_db():
+    async with TestingSessionLocal() as session:
+        yield session
+
+
+app.dependency_overrides[get_db] = override_get_db
+
+
+# --- Pytest Fixtures ---
+@pytest.fixture(scope="session")
+def event_loop():
+    """Create an instance of the default event loop for each test session."""
+    loop = asyncio.get_event_loop_policy().new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest.fixture(scope="session", autouse=True)
+async def setup_database():
+    """Create database tables before tests run, and drop them after."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest.fixture(scope="module")
+async def client() -> AsyncClient:
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as c:
+        yield c
+
+
+@pytest.fixture
+def db_engine():
+    return engine
+
+
+@pytest.fixture
+def session_factory():
+    """Sessions on the test database, for code that opens its own."""
+    return TestingSessionLocal
+
+
+@pytest.fixture
+async def ai_model(client: AsyncClient, request) -> dict:
+    response = await client.post(
+        "/api/v1/settings/ai-models/",
+        json={
+            "name": f"Scripted {request.node.name}",
+            "api_url": "http://upstream.invalid/v1",
+            "api_key": "key",
+            "model_name": "scripted",
+            "model_type": "LANGUAGE_MODEL",
+        },
+    )
+    assert response.status_code == 200
+    return response.json()
@@ -0,0 +1,194 @@
+import json
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+
+from app.api.routers import ai_generation
+from app.core.config import settings
+from app.crud import crud_setting
+from app.services import ai_service, generation_cache
+from app.services.ai_events import ContentEvent, ErrorEvent, ReasoningEvent
+from tests.api.routers.test_conversations import create_conversation
+
+
+@pytest.fixture
+def script(monkeypatch, session_factory):
+    """Makes the chat stream replay the given events instead of calling out."""
+    monkeypatch.setattr(ai_generation, "SessionLocal", session_factory)
+    scripted = []
+
+    async def stream_chat_events(*args, **kwargs):
+        for scripted_event in scripted:
+            yield scripted_event
+
+    monkeypatch.setattr(ai_service, "stream_chat_events", stream_chat_events)
+    return scripted
+
+
+async def chat(client: AsyncClient, ai_model: dict, conversation_id: int, text: str):
+    return await client.post(
+        "/api/v1/ai/chat-stream",
+        json={
+            "ai_model_id": ai_model["id"],
+            "conversation_id": conversation_id,
+            "messages": [{"role": "user", "content": text}],
+        },
+    )
+
+
+async def test_chat_turn_is_saved_with_checkpoints(
+    client: AsyncClient, ai_model, script, db_engine, monkeypatch
+):
+    monkeypatch.setattr(settings, "CHAT_CHECKPOINT_SECONDS", 0.0)
+    script += [
+        ReasoningEvent("think "),
+        ReasoningEvent("more"),
+        ContentEvent("Hel"),
+        ContentEvent("lo"),
+    ]
+    conversation = await create_conversation(client, ["hi", "hey"])
+
+    updates = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.startswith("UPDATE messages"):
+            updates.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await chat(client, ai_model, conversation["id"], "question")
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    assert "Hel" in response.text
+
+    messages = (await client.get(f"/api/v1/conversations/{conversation['id']}")).json()[
+        "messages"
+    ]
+    assert [(m["role"], m["content"]) for m in messages[2:]] == [
+        ("user", "question"),
+        ("assistant", "Hello"),
+    ]
+    assert messages[3]["reasoning_content"] == "think more"
+    assert response.headers["X-Assistant-Message-Id"] == str(messages[3]["id"])
+    # One checkpoint per event, each appending to what the previous wrote
+    assert len(updates) == 4
+
+
+async def test_failed_reply_drops_its_placeholder(
+    client: AsyncClient, ai_model, script
+):
+    script.append(ErrorEvent("upstream down"))
+    conversation = await create_conversation(client, ["hi"])
+
+    response = await chat(client, ai_model, conversation["id"], "question")
+    assert "upstream down" in response.text
+
+    messages = (await client.get(f"/api/v1/conversations/{conversation['id']}")).json()[
+        "messages"
+    ]
+    assert [(m["role"], m["content"]) for m in messages] == [
+        ("user", "hi"),
+        ("user", "question"),
+    ]
+
+
+async def test_outline_stream_is_served_from_the_generation_cache(
+    client: AsyncClient, ai_model, script, session_factory, monkeypatch
+):
+    monkeypatch.setattr(settings, "GENERATION_CACHE_ENABLED", True)
+    monkeypatch.setattr(generation_cache, "SessionLocal", session_factory)
+    monkeypatch.setattr(generation_cache, "_lru", generation_cache.OrderedDict())
+    request = {
+        "project_id": 1,
+        "ai_model_id": ai_model["id"],
+        "target_word_count": 1000,
+        "prompt": "an outline",
+    }
+
+    script[:] = [ContentEvent("first draft")]
+    response = await client.post("/api/v1/ai/generate-outline-stream", json=request)
+    assert response.headers["X-Generation-Cache"] == "MISS"
+    assert "first draft" in response.text
+
+    # Whatever the model would answer now, the stored result is replayed
+    script[:] = [ContentEvent("second draft")]
+    response = await client.post("/api/v1/ai/generate-outline-stream", json=request)
+    assert response.headers["X-Generation-Cache"] == "HIT"
+    assert "first draft" in response.text
+
+    response = await client.post(
+        "/api/v1/ai/generate-outline-stream", json={**request, "bypass_cache": True}
+    )
+    assert response.headers["X-Generation-Cache"] == "MISS"
+    assert "second draft" in response.text
+
+    # The refreshed result also reached the database tier
+    generation_cache._lru.clear()
+    script[:] = []
+    response = await client.post("/api/v1/ai/generate-outline-stream", json=request)
+    assert response.headers["X-Generation-Cache"] == "HIT"
+    assert "second draft" in response.text
+
+
+def sse_events(text: str):
+    for frame in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        yield lines["event"], json.loads(lines["data"])
+
+
+async def test_batch_tags_variants_and_saves_only_the_successful_ones(
+    client: AsyncClient, ai_model, session_factory, monkeypatch
+):
+    monkeypatch.setattr(ai_generation, "SessionLocal", session_factory)
+    calls = []
+
+    async def stream_chat_events(*args, **kwargs):
+        calls.append(kwargs)
+        variant = len(calls) - 1
+        if variant == 1:
+            raise RuntimeError("connection reset")
+        yield ContentEvent(json.dumps({"main_conflict": f"conflict {variant}"}))
+
+    monkeypatch.setattr(ai_service, "stream_chat_events", stream_chat_events)
+    project = (await client.post("/api/v1/projects/", json={"name": "Batch"})).json()
+
+    response = await client.post(
+        "/api/v1/ai/generate-outline-batch",
+        json={
+            "project_id": project["id"],
+            "ai_model_id": ai_model["id"],
+            "target_word_count": 1000,
+            "variants": 3,
+            # One at a time, so the calls are made in variant order
+            "max_parallel": 1,
+        },
+    )
+    events = list(sse_events(response.text))
+
+    done = {
+        data["variant"]: data["status"]
+        for name, data in events
+        if name == "variant_done"
+    }
+    assert done == {0: "success", 1: "error", 2: "success"}
+    errors = [data for name, data in events if name == "error"]
+    assert [data["variant"] for data in errors] == [1]
+    assert "connection reset" in errors[0]["error"]
+    fields = [data for name, data in events if name == "outline_field"]
+    assert {(data["variant"], data["value"]) for data in fields} == {
+        (0, "conflict 0"),
+        (2, "conflict 2"),
+    }
+
+    name, saved = events[-1]
+    assert name == "saved"
+    assert [outline["variant"] for outline in saved["outlines"]] == [0, 2]
+    async with session_factory() as db:
+        for outline in saved["outlines"]:
+            row = await crud_setting.generated_outline.get(db, id=outline["id"])
+            assert row.version_name == f"Variant {outline['variant'] + 1}"
+            assert row.outline_data == {
+                "main_conflict": f"conflict {outline['variant']}"
+            }
@@ -0,0 +1,148 @@
+from httpx import AsyncClient
+from sqlalchemy import event
+
+
+async def create_conversation(client: AsyncClient, contents):
+    messages = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": content}
+        for i, content in enumerate(contents)
+    ]
+    response = await client.post(
+        "/api/v1/conversations/", json={"title": "Chat", "messages": messages}
+    )
+    return response.json()
+
+
+async def test_update_writes_only_changed_messages(client: AsyncClient, db_engine):
+    conversation = await create_conversation(client, ["a", "b", "c", "d"])
+    ids = [m["id"] for m in conversation["messages"]]
+    messages = [
+        {"role": m["role"], "content": m["content"]} for m in conversation["messages"]
+    ]
+    # Edit the second message and add a new one
+    messages[1]["content"] = "b2"
+    messages.append({"role": "user", "content": "e"})
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.put(
+            f"/api/v1/conversations/{conversation['id']}", json={"messages": messages}
+        )
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+    data = response.json()
+    assert [m["content"] for m in data["messages"]] == ["a", "b2", "c", "d", "e"]
+    # The stored messages keep their ids
+    assert [m["id"] for m in data["messages"]][:4] == ids
+    assert statements.count("UPDATE") == 1 and statements.count("INSERT") == 1
+    # Only the stale summary
+    assert statements.count("DELETE") == 1
+
+    response = await client.put(
+        f"/api/v1/conversations/{conversation['id']}",
+        json={"messages": messages[:2]},
+    )
+    assert [m["id"] for m in response.json()["messages"]] == ids[:2]
+
+
+async def test_rewritten_history_is_replaced_from_the_divergence(client: AsyncClient):
+    conversation = await create_conversation(client, ["a", "b", "c"])
+    first, _, third = conversation["messages"]
+    response = await client.put(
+        f"/api/v1/conversations/{conversation['id']}",
+        json={
+            "messages": [
+                {"id": first["id"], "role": "user", "content": "a"},
+                {"id": third["id"], "role": "user", "content": "c"},
+            ]
+        },
+    )
+    messages = response.json()["messages"]
+    assert [m["content"] for m in messages] == ["a", "c"]
+    assert messages[0]["id"] == first["id"]
+
+
+async def test_append_messages(client: AsyncClient):
+    conversation = await create_conversation(client, ["a"])
+    response = await client.post(
+        f"/api/v1/conversations/{conversation['id']}/messages",
+        json=[{"role": "assistant", "content": "b"}, {"role": "user", "content": "c"}],
+    )
+    assert [m["content"] for m in response.json()] == ["b", "c"]
+
+    response = await client.get(f"/api/v1/conversations/{conversation['id']}")
+    assert [m["content"] for m in response.json()["messages"]] == ["a", "b", "c"]
+
+    response = await client.post(
+        "/api/v1/conversations/999999/messages", json=[{"role": "user", "content": "x"}]
+    )
+    assert response.status_code == 404
+
+
+async def test_index_summarises_conversations(client: AsyncClient):
+    project = (await client.post("/api/v1/projects/", json={"name": "Index"})).json()
+    response = await client.post(
+        "/api/v1/conversations/",
+        json={
+            "title": "In project",
+            "project_id": project["id"],
+            "messages": [
+                {"role": "user", "content": "hi"},
+                {"role": "assistant", "content": "x" * 500},
+            ],
+        },
+    )
+    in_project = response.json()
+    response = await client.post(
+        "/api/v1/conversations/",
+        json={"title": "Empty", "project_id": project["id"], "messages": []},
+    )
+    empty = response.json()
+    await create_conversation(client, ["elsewhere"])
+
+    response = await client.get(
+        "/api/v1/conversations/index", params={"project_id": project["id"]}
+    )
+    assert response.status_code == 200
+    assert "X-Next-Cursor" not in response.headers
+    newest, oldest = response.json()
+    assert newest["id"] == empty["id"]
+    assert newest["message_count"] == 0
+    assert newest["preview"] is None and newest["last_message_at"] is None
+    assert oldest["id"] == in_project["id"]
+    assert oldest["message_count"] == 2
+    assert oldest["preview"] == "x" * 80
+    assert oldest["last_message_at"] == in_project["messages"][1]["created_at"]
+    assert "messages" not in oldest
+
+
+async def test_index_pages_by_cursor(client: AsyncClient):
+    project = (await client.post("/api/v1/projects/", json={"name": "Paged"})).json()
+    ids = []
+    for i in range(5):
+        response = await client.post(
+            "/api/v1/conversations/",
+            json={"title": f"c{i}", "project_id": project["id"], "messages": []},
+        )
+        ids.append(response.json()["id"])
+
+    seen = []
+    params = {"project_id": project["id"], "limit": 2}
+    while True:
+        response = await client.get("/api/v1/conversations/index", params=params)
+        seen += [item["id"] for item in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+    assert seen == ids[::-1]
+
+    response = await client.get(
+        "/api/v1/conversations/index", params={"cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
@@ -0,0 +1,30 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.models.generation_job import JobStatus
+
+
+async def test_only_expired_leases_are_requeued(db_engine):
+    async with AsyncSession(db_engine) as db:
+        alive = await crud.generation_job.submit(db, kind="outline", params={})
+        orphaned = await crud.generation_job.submit(db, kind="outline", params={})
+        assert await crud.generation_job.claim(
+            db, alive.id, worker="a", lease_seconds=60
+        )
+        assert await crud.generation_job.claim(
+            db, orphaned.id, worker="b", lease_seconds=-1
+        )
+        # Claimed once only
+        assert not await crud.generation_job.claim(
+            db, alive.id, worker="b", lease_seconds=60
+        )
+
+        requeued = await crud.generation_job.requeue_expired(db, max_attempts=3)
+        assert requeued == [orphaned.id]
+        assert (await crud.generation_job.get(db, alive.id)).status == JobStatus.RUNNING
+
+        await crud.generation_job.release_leases(db, worker="a")
+        assert await crud.generation_job.requeue_unfinished(db, max_attempts=3) == [
+            alive.id,
+            orphaned.id,
+        ]
@@ -1,48 +1,6 @@
 import pytest
-from httpx import AsyncClient, ASGITransport
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-import asyncio
-from fastapi.testclient import TestClient
-
-from app.main import app
-from app.database import get_db, Base
-from app.schemas import ProjectCreate
-
-# --- Test Database Setup ---
-DATABASE_URL = "sqlite+aiosqlite:///:memory:"
-engine = create_async_engine(DATABASE_URL, echo=True)
-TestingSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
-)
-
-async def override_get_db():
-    async with TestingSessionLocal() as session:
-        yield session
-
-app.dependency_overrides[get_db] = override_get_db
-
-# --- Pytest Fixtures ---
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for each test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
-
-@pytest.fixture(scope="session", autouse=True)
-async def setup_database():
-    """Create database tables before tests run, and drop them after."""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    yield
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
-
-@pytest.fixture(scope="module")
-async def client() -> AsyncClient:
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
-        yield c
+from httpx import AsyncClient
+from sqlalchemy import event
 
 
 # --- Tests ---
@@ -69,3 +27,102 @@ async def test_read_projects(client: AsyncClient):
     assert isinstance(data, list)
     assert len(data) > 0
     assert data[-1]["name"] == project_data["name"]
+
+@pytest.mark.asyncio
+async def test_read_projects_by_cursor(client: AsyncClient):
+    for i in range(5):
+        await client.post("/api/v1/projects/", json={"name": f"Paged {i}"})
+    expected = [p["id"] for p in (await client.get("/api/v1/projects/")).json()]
+
+    ids, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = await client.get("/api/v1/projects/", params=params)
+        assert response.status_code == 200
+        ids += [p["id"] for p in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert ids == expected
+
+    # The legacy offset mode pages through the same order
+    response = await client.get("/api/v1/projects/", params={"skip": 2, "limit": 2})
+    assert [p["id"] for p in response.json()] == expected[2:4]
+
+    response = await client.get("/api/v1/projects/", params={"cursor": "garbage"})
+    assert response.status_code == 400
+
+    response = await client.get("/api/v1/projects/", params={"limit": 0})
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+@pytest.mark.asyncio
+async def test_bulk_projects(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/projects/bulk",
+        json=[{"name": "Bulk A"}, {"description": "no name"}, {"name": "Bulk B"}],
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["name"] for p in data["items"]] == ["Bulk A", "Bulk B"]
+    assert [e["index"] for e in data["errors"]] == [1]
+    a, b = (p["id"] for p in data["items"])
+
+    response = await client.put(
+        "/api/v1/projects/bulk",
+        json=[
+            {"id": a, "name": "Bulk A2"},
+            {"id": b, "name": "Bulk B", "description": "second"},
+            {"id": 999999, "name": "missing"},
+        ],
+    )
+    data = response.json()
+    updated = {p["id"]: p for p in data["items"]}
+    assert updated[a]["name"] == "Bulk A2"
+    assert updated[b]["name"] == "Bulk B"
+    assert updated[b]["description"] == "second"
+    assert data["errors"] == [{"index": 2, "id": 999999, "detail": "Not found"}]
+
+    response = await client.post(
+        "/api/v1/projects/bulk/delete", json={"ids": [a, 999999]}
+    )
+    data = response.json()
+    assert [p["id"] for p in data["items"]] == [a]
+    assert [e["id"] for e in data["errors"]] == [999999]
+    assert (await client.get(f"/api/v1/projects/{a}")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_merges_json(client: AsyncClient):
+    response = await client.post(
+        "/api/v1/characters/bulk",
+        json=[{"name": "Hero", "custom_fields": {"a": 1, "b": 2}}],
+    )
+    hero = response.json()["items"][0]
+
+    response = await client.put(
+        "/api/v1/characters/bulk",
+        json=[{"id": hero["id"], "custom_fields": {"b": 3}}],
+    )
+    assert response.json()["items"][0]["custom_fields"] == {"a": 1, "b": 3}
+
+
+@pytest.mark.asyncio
+async def test_writes_take_one_statement(client: AsyncClient, db_engine):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = await client.post("/api/v1/projects/", json={"name": "One"})
+        project_id = response.json()["id"]
+        await client.put(f"/api/v1/projects/{project_id}", json={"name": "Two"})
+        response = await client.delete(f"/api/v1/projects/{project_id}")
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+    assert response.json()["name"] == "Two"
+    assert [s.split()[0] for s in statements] == ["INSERT", "UPDATE", "DELETE"]
@@ -0,0 +1,40 @@
+from httpx import AsyncClient
+
+from app.services import prompt_templates
+
+URL = "/api/v1/settings/prompt-templates"
+
+
+async def test_update_bumps_version_and_recompiles(client: AsyncClient):
+    response = await client.post(
+        f"{URL}/",
+        json={
+            "name": "Greeting",
+            "template_text": "Hello [name]",
+            "variables": {"name": "who"},
+        },
+    )
+    template = response.json()
+    assert template["version"] == 1
+    response = await client.post(
+        f"{URL}/{template['id']}/render", json={"variables": {"name": "Lin"}}
+    )
+    assert response.json()["text"] == "Hello Lin"
+    # What another worker holds: the update only invalidates this one's cache
+    stale = prompt_templates._compiled[template["id"]]
+
+    response = await client.put(
+        f"{URL}/{template['id']}",
+        json={
+            "name": "Greeting",
+            "template_text": "Goodbye [name]",
+            "variables": {"name": "who"},
+        },
+    )
+    assert response.json()["version"] == 2
+
+    prompt_templates._compiled[template["id"]] = stale
+    response = await client.post(
+        f"{URL}/{template['id']}/render", json={"variables": {"name": "Lin"}}
+    )
+    assert response.json()["text"] == "Goodbye Lin"
@@ -0,0 +1,57 @@
+import httpx
+import openai
+import pytest
+from openai import AsyncOpenAI
+
+from benchmarks.mock_openai import MockConfig, create_app
+
+
+def client(**config):
+    app = create_app(
+        MockConfig(token_rate=0, first_token_delay=0, jitter=0, seed=1, **config)
+    )
+    transport = httpx.ASGITransport(app=app)
+    return AsyncOpenAI(
+        base_url="http://mock/v1",
+        api_key="mock",
+        max_retries=0,
+        http_client=httpx.AsyncClient(transport=transport),
+    )
+
+
+async def test_streams_reasoning_then_content_and_usage():
+    stream = await client(tokens=5, reasoning_tokens=2).chat.completions.create(
+        model="mock",
+        messages=[{"role": "user", "content": "hi"}],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    kinds = []
+    usage = None
+    async for chunk in stream:
+        if chunk.usage is not None:
+            usage = chunk.usage
+        for choice in chunk.choices:
+            if getattr(choice.delta, "reasoning_content", None):
+                kinds.append("reasoning")
+            elif choice.delta.content:
+                kinds.append("content")
+
+    assert kinds == ["reasoning"] * 2 + ["content"] * 5
+    assert usage is not None and usage.completion_tokens == 7
+
+
+async def test_injects_errors():
+    with pytest.raises(openai.InternalServerError):
+        await client(error_rate=1.0).chat.completions.create(
+            model="mock", messages=[{"role": "user", "content": "hi"}]
+        )
+
+    # The in-process transport reads the whole body before returning, so the
+    # dropped connection already surfaces when the stream is opened
+    with pytest.raises(openai.APIConnectionError):
+        stream = await client(mid_stream_error_rate=1.0).chat.completions.create(
+            model="mock", messages=[{"role": "user", "content": "hi"}], stream=True
+        )
+        async for _ in stream:
+            pass
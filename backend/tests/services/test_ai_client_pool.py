@@ -0,0 +1,37 @@
+import asyncio
+
+import pytest
+
+from app.services import ai_client_pool
+
+
+@pytest.mark.asyncio
+async def test_replaced_client_is_closed_after_its_last_lease():
+    async with ai_client_pool.lease(
+        101, api_url="http://a/v1", api_key="k1"
+    ) as old_client:
+        async with ai_client_pool.lease(
+            101, api_url="http://b/v1", api_key="k1"
+        ) as new_client:
+            assert new_client is not old_client
+        # Still streaming on the old one
+        assert not old_client.is_closed()
+    assert old_client.is_closed()
+    assert not new_client.is_closed()
+
+    ai_client_pool.invalidate(101)
+    await asyncio.gather(*ai_client_pool._closing)
+    assert new_client.is_closed()
+    assert ai_client_pool._retired == []
+
+
+@pytest.mark.asyncio
+async def test_lease_outliving_close_all_releases_cleanly():
+    async with ai_client_pool.lease(
+        102, api_url="http://a/v1", api_key="k1"
+    ) as old_client:
+        async with ai_client_pool.lease(102, api_url="http://b/v1", api_key="k1"):
+            pass
+        await ai_client_pool.close_all()
+    assert old_client.is_closed()
+    assert ai_client_pool._retired == []
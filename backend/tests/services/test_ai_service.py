@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import ai_service
+from app.services.ai_events import ContentEvent, ErrorEvent
+
+
+@pytest.mark.asyncio
+async def test_failover_closes_the_failed_generation_first():
+    log = []
+
+    async def primary():
+        try:
+            yield ContentEvent("a")
+            yield ErrorEvent("upstream down")
+            yield ContentEvent("never")
+        finally:
+            log.append("primary closed")
+
+    async def fallback():
+        log.append("fallback started")
+        yield ContentEvent("b")
+
+    events = [
+        event
+        async for event in ai_service._failover(
+            primary(), SimpleNamespace(id=2), fallback
+        )
+    ]
+
+    assert [event.chunk for event in events] == ["a", "b"]
+    assert log == ["primary closed", "fallback started"]
+
+
+@pytest.mark.asyncio
+async def test_hedged_failover_leaves_early_errors_to_the_hedge():
+    started = []
+
+    async def primary():
+        yield ErrorEvent("upstream down")
+
+    async def fallback():
+        started.append(True)
+        yield ContentEvent("b")
+
+    events = [
+        event
+        async for event in ai_service._failover(
+            primary(), SimpleNamespace(id=2), fallback, after_output=True
+        )
+    ]
+
+    assert events == [ErrorEvent("upstream down")]
+    assert started == []
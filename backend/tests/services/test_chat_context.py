@@ -0,0 +1,59 @@
+from app.models.setting import ModelType
+from app.services import chat_context, token_counter
+from app.services.model_config_cache import ResolvedModelConfig
+
+
+def message(role, content):
+    return {"role": role, "content": content}
+
+
+def test_cjk_text_counts_one_token_per_character():
+    assert token_counter.count_text("你好，世界") == 5
+    assert token_counter.count_text("hello world!") == 3
+
+
+def test_oldest_history_is_dropped_first_and_system_is_pinned():
+    messages = [
+        message("system", "preset"),
+        message("user", "旧" * 200),
+        message("assistant", "新" * 40),
+        message("user", "question"),
+    ]
+    assembled, report = chat_context.assemble(messages, budget=80)
+
+    assert assembled == [messages[0], messages[2], messages[3]]
+    assert report.dropped_messages == 1
+    assert report.truncated_messages == 0
+    assert report.trimmed_tokens == report.input_tokens - report.prompt_tokens > 0
+    assert report.prompt_tokens <= 80
+
+
+def test_partly_fitting_message_keeps_its_end():
+    messages = [message("user", "a" * 400 + "END"), message("user", "now")]
+    assembled, report = chat_context.assemble(messages, budget=60)
+
+    assert assembled[0]["content"].startswith(chat_context.TRUNCATION_MARK)
+    assert assembled[0]["content"].endswith("END")
+    assert report.truncated_messages == 1
+    assert report.dropped_messages == 0
+    assert report.prompt_tokens <= 60
+
+
+def test_no_budget_keeps_every_message():
+    model_config = ResolvedModelConfig(
+        id=1,
+        name="m",
+        api_url="http://upstream",
+        api_key="k",
+        model_name="m",
+        model_type=ModelType.LANGUAGE_MODEL,
+    )
+    assert chat_context.budget_for(model_config) is None
+    assert chat_context.budget_for(model_config, 500) == 500
+
+    messages = [message("user", "旧" * 20000), message("user", "now")]
+    assembled, report = chat_context.assemble(messages, budget=None)
+
+    assert assembled == messages
+    assert report.trimmed_tokens == 0
+    assert "budget=none" in report.header()
@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+
+from app.core.config import settings
+from app.models.conversation_summary import ConversationSummary
+from app.models.message import Message
+from app.models.setting import ModelType
+from app.services import ai_service, conversation_memory, token_counter
+from app.services.ai_events import ContentEvent
+from app.services.model_config_cache import ResolvedModelConfig
+
+MODEL = ResolvedModelConfig(
+    id=1,
+    name="m",
+    api_url="http://upstream.invalid/v1",
+    api_key="key",
+    model_name="m",
+    model_type=ModelType.LANGUAGE_MODEL,
+)
+
+
+def messages(*contents):
+    return [
+        Message(id=i, role="user" if i % 2 else "assistant", content=content)
+        for i, content in enumerate(contents, start=1)
+    ]
+
+
+def summary(last_message_id, content="earlier"):
+    return ConversationSummary(
+        conversation_id=7,
+        first_message_id=1,
+        last_message_id=last_message_id,
+        content=content,
+        ai_model_id=MODEL.id,
+    )
+
+
+def keep_recent(monkeypatch, kept):
+    """Sets the verbatim tail to exactly the given messages."""
+    tokens = sum(token_counter.count_message({"content": m.content}) for m in kept)
+    monkeypatch.setattr(settings, "SUMMARY_KEEP_RECENT_TOKENS", tokens)
+
+
+class FakeSession:
+    """Serves the conversation's messages and records what gets saved."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.merged = []
+        self.committed = False
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.rows))
+
+    async def merge(self, instance):
+        self.merged.append(instance)
+
+    async def commit(self):
+        self.committed = True
+
+
+def serve_summary(monkeypatch, stored):
+    async def load_summary(db, conversation_id):
+        return stored
+
+    monkeypatch.setattr(conversation_memory, "_load_summary", load_summary)
+
+
+def test_split_returns_the_messages_after_the_summary():
+    history = messages("a", "b", "c", "d")
+    kept, tail = conversation_memory._split(history, summary(2))
+    assert kept.last_message_id == 2
+    assert [m.content for m in tail] == ["c", "d"]
+
+
+def test_split_discards_a_summary_of_rewritten_messages():
+    history = messages("a", "b", "c")
+    kept, tail = conversation_memory._split(history, summary(9))
+    assert kept is None
+    assert tail == history
+
+
+def test_to_fold_leaves_the_recent_tail(monkeypatch):
+    tail = messages("old " * 50, "older " * 50, "recent", "latest")
+    keep_recent(monkeypatch, tail[2:])
+    assert conversation_memory._to_fold(tail) == tail[:2]
+
+    keep_recent(monkeypatch, tail)
+    assert conversation_memory._to_fold(tail) == []
+
+
+async def test_history_starts_with_the_summary(monkeypatch):
+    serve_summary(monkeypatch, summary(2, "they met"))
+    conversation = SimpleNamespace(id=7, messages=messages("a", "b", "c"))
+
+    history = await conversation_memory.history_messages(None, conversation)
+    assert history == [
+        {"role": "system", "content": conversation_memory.SUMMARY_PREFIX + "they met"},
+        {"role": "user", "content": "c"},
+    ]
+
+
+async def test_history_ignores_a_stale_summary(monkeypatch):
+    serve_summary(monkeypatch, summary(9))
+    conversation = SimpleNamespace(id=7, messages=messages("a", "b"))
+
+    history = await conversation_memory.history_messages(None, conversation)
+    assert [m["content"] for m in history] == ["a", "b"]
+
+
+async def test_update_folds_all_but_the_recent_tail(monkeypatch):
+    rows = messages("a", "b", "c", "d", "e")
+    serve_summary(monkeypatch, summary(1, "before"))
+    keep_recent(monkeypatch, rows[3:])
+    prompts = []
+
+    async def stream_chat_events(model_config, chat, **kwargs):
+        prompts.append(chat[0]["content"])
+        yield ContentEvent(" updated ")
+
+    monkeypatch.setattr(ai_service, "stream_chat_events", stream_chat_events)
+    db = FakeSession(rows)
+    await conversation_memory._update_summary(db, 7, MODEL)
+
+    # Only the previous summary and the newly folded messages reach the model
+    assert "before" in prompts[0]
+    assert "[Assistant]: b" in prompts[0] and "[User]: c" in prompts[0]
+    assert "[User]: a" not in prompts[0] and "[Assistant]: d" not in prompts[0]
+    [saved] = db.merged
+    assert (saved.first_message_id, saved.last_message_id) == (1, 3)
+    assert saved.content == "updated"
+    assert db.committed
+
+
+async def test_update_restarts_from_a_stale_summary(monkeypatch):
+    rows = messages("a", "b", "c")
+    serve_summary(monkeypatch, summary(9, "gone"))
+    keep_recent(monkeypatch, rows[2:])
+    prompts = []
+
+    async def stream_chat_events(model_config, chat, **kwargs):
+        prompts.append(chat[0]["content"])
+        yield ContentEvent("fresh")
+
+    monkeypatch.setattr(ai_service, "stream_chat_events", stream_chat_events)
+    db = FakeSession(rows)
+    await conversation_memory._update_summary(db, 7, MODEL)
+
+    assert "gone" not in prompts[0]
+    [saved] = db.merged
+    assert (saved.first_message_id, saved.last_message_id) == (1, 2)
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.models.generation_cache import GenerationCacheEntry
+from app.services import generation_cache
+from app.services.ai_events import (
+    ContentEvent,
+    ErrorEvent,
+    GenerationResult,
+    ReasoningEvent,
+)
+
+
+@pytest.fixture(autouse=True)
+def stored(monkeypatch):
+    """Empties the memory tier and captures what would be persisted."""
+    monkeypatch.setattr(generation_cache, "_lru", generation_cache.OrderedDict())
+    stored = []
+
+    async def put(key, model_id, result):
+        stored.append((key, result))
+
+    monkeypatch.setattr(generation_cache, "put", put)
+    return stored
+
+
+async def events(*items):
+    for item in items:
+        yield item
+
+
+async def drain(stream):
+    return [event async for event in stream]
+
+
+async def test_completed_stream_is_stored(stored):
+    stream = generation_cache.record(
+        "k", 1, events(ReasoningEvent("why"), ContentEvent("a"), ContentEvent("b"))
+    )
+    assert len(await drain(stream)) == 3
+    assert stored == [("k", GenerationResult(content="ab", reasoning="why"))]
+
+
+async def test_failed_stream_is_not_stored(stored):
+    stream = generation_cache.record(
+        "k", 1, events(ContentEvent("a"), ErrorEvent("upstream down"))
+    )
+    await drain(stream)
+    assert stored == []
+
+
+async def test_abandoned_stream_is_not_stored(stored):
+    stream = generation_cache.record(
+        "k", 1, events(ContentEvent("a"), ContentEvent("b"))
+    )
+    assert await stream.__anext__() == ContentEvent("a")
+    await stream.aclose()
+    assert stored == []
+
+
+def test_memory_tier_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CACHE_MAX_ENTRIES", 2)
+    for key in ("a", "b"):
+        generation_cache._remember(key, GenerationResult(content=key))
+    # Using "a" again makes "b" the oldest
+    generation_cache._lru.move_to_end("a")
+    generation_cache._remember("c", GenerationResult(content="c"))
+
+    assert list(generation_cache._lru) == ["a", "c"]
+
+
+async def test_database_hit_fills_the_memory_tier():
+    row = GenerationCacheEntry(key="k", ai_model_id=1, content="text", reasoning=None)
+    queries = []
+
+    async def execute(statement):
+        queries.append(statement)
+        return SimpleNamespace(scalar_one_or_none=lambda: row)
+
+    db = SimpleNamespace(execute=execute)
+    first = await generation_cache.get(db, "k")
+    second = await generation_cache.get(db, "k")
+
+    assert first == second == GenerationResult(content="text", reasoning="")
+    assert len(queries) == 1
+    assert "k" in generation_cache._lru
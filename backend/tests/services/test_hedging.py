@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.services.ai_events import ContentEvent, ErrorEvent
+from app.services.hedging import hedge
+
+
+def stream(chunks, *, delay=0.0, closed=None):
+    async def events():
+        try:
+            await asyncio.sleep(delay)
+            for chunk in chunks:
+                yield ContentEvent(chunk)
+        finally:
+            if closed is not None:
+                closed.append(True)
+
+    return events()
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_never_starts_the_fallback():
+    started = []
+
+    def fallback():
+        started.append(True)
+        return stream(["b"])
+
+    events = [e async for e in hedge(stream(["a", "b"]), fallback, delay=0.05)]
+    assert events == [ContentEvent("a"), ContentEvent("b")]
+    assert not started
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_to_fallback_and_is_cancelled():
+    closed = []
+    primary = stream(["slow"], delay=1.0, closed=closed)
+
+    events = [e async for e in hedge(primary, lambda: stream(["fast"]), delay=0.01)]
+    assert events == [ContentEvent("fast")]
+    assert closed == [True]
+
+
+@pytest.mark.asyncio
+async def test_early_primary_error_fails_over_to_fallback():
+    async def failing():
+        yield ErrorEvent("boom")
+
+    events = [e async for e in hedge(failing(), lambda: stream(["ok"]), delay=10)]
+    assert events == [ContentEvent("ok")]
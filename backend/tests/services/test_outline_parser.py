@@ -0,0 +1,37 @@
+import json
+
+from app.services.outline_parser import OutlineStreamParser
+
+OUTLINE = {
+    "main_conflict": '巨龙与"魔法"之争 {未完}',
+    "story_arc": {"act_1_beginning": "开端", "act_2_middle": "发展\\转折"},
+    "key_characters": [{"role": "主角", "name": "林"}],
+    "themes": ["宿命", "牺牲"],
+}
+
+
+def stream_in_pieces(text, size):
+    parser = OutlineStreamParser()
+    completed = []
+    for i in range(0, len(text), size):
+        completed.extend(parser.feed(text[i : i + size]))
+    return parser, completed
+
+
+def test_fields_are_emitted_as_they_complete_whatever_the_chunking():
+    text = "```json\n" + json.dumps(OUTLINE, ensure_ascii=False, indent=2) + "\n```"
+    for size in (1, 3, 7, len(text)):
+        parser, completed = stream_in_pieces(text, size)
+        assert completed == list(OUTLINE.items())
+        assert parser.result() == OUTLINE
+
+
+def test_field_is_reported_before_the_stream_ends():
+    parser = OutlineStreamParser()
+    assert parser.feed('{"main_conflict": "a", "themes": [') == [("main_conflict", "a")]
+
+
+def test_text_that_is_not_json_is_kept_raw():
+    parser, completed = stream_in_pieces("抱歉，我无法生成大纲。", 4)
+    assert completed == []
+    assert parser.result() == {"raw": "抱歉，我无法生成大纲。"}
@@ -0,0 +1,63 @@
+import pytest
+
+from app.models.setting import PromptTemplate
+from app.services import prompt_service, prompt_templates
+
+
+def test_only_declared_placeholders_are_substituted():
+    compiled = prompt_templates.compile_template(
+        "[角色]说：[台词] [note]",
+        {"角色": "speaker", "台词": {"default": "……"}},
+    )
+
+    assert compiled.render({"角色": "林", "台词": "你好"}) == "林说：你好 [note]"
+    assert compiled.render({"角色": "林"}) == "林说：…… [note]"
+
+
+def test_missing_value_without_default_is_an_error():
+    compiled = prompt_templates.compile_template("Hi [name]", {"name": "who"})
+
+    with pytest.raises(prompt_templates.TemplateError):
+        compiled.render({})
+
+
+def test_outline_prompt_renders_null_and_missing_columns_as_before():
+    # load_context passes every column, so NULL ones arrive as None
+    worldview = {"description": None, "genre": "奇幻", "additional_details": None}
+    writing_style = {"tone": None, "point_of_view": None, "guidelines": None}
+
+    prompt = prompt_service.create_outline_generation_prompt(
+        None, worldview, writing_style, 1000
+    )
+    assert "**Core Concept (Seed):**\nNone\n" in prompt
+    assert "Description: None\nGenre: 奇幻\nAdditional Details: None\n" in prompt
+    assert "Tone: None\nPoint of View: None\nGuidelines: None\n" in prompt
+
+    # Without a worldview or style selected the dicts are empty
+    prompt = prompt_service.create_outline_generation_prompt("c", {}, {}, 1000)
+    assert "Description: Not specified\nGenre: Not specified\n" in prompt
+    assert "Additional Details: None\n" in prompt
+    assert "Tone: Not specified\nPoint of View: Not specified\n" in prompt
+
+
+def test_outline_prompt_renders_the_stored_template():
+    worldview = {"genre": "武侠", "description": None}
+
+    built_in = prompt_service.create_outline_generation_prompt(
+        "一个铁匠", worldview, {}, 5000
+    )
+    assert "一个铁匠" in built_in and "Approximately 5000 words" in built_in
+    assert "Genre: 武侠" in built_in and "Description: None" in built_in
+
+    template = PromptTemplate(
+        id=1,
+        version=1,
+        template_text="[core_concept] / [worldview_genre] / [target_word_count]",
+        variables=prompt_service.OUTLINE_TEMPLATE_VARIABLES,
+    )
+    assert (
+        prompt_service.create_outline_generation_prompt(
+            "一个铁匠", worldview, {}, 5000, template
+        )
+        == "一个铁匠 / 武侠 / 5000"
+    )
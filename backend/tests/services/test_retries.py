@@ -0,0 +1,67 @@
+import httpx
+import openai
+import pytest
+
+from app.services.ai_events import ContentEvent, ReasoningEvent
+from app.services.retries import Progress, RetryPolicy, retrying
+
+NO_DELAY = RetryPolicy(max_retries=2, base_delay=0, max_delay=0)
+
+
+def upstream(*attempts):
+    """Serves one scripted attempt per call; an exception ends an attempt."""
+    requests = []
+
+    async def open_stream(messages):
+        requests.append(messages)
+        for item in attempts[len(requests) - 1]:
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    return open_stream, requests
+
+
+async def collect(open_stream, policy=NO_DELAY):
+    messages = [{"role": "user", "content": "hi"}]
+    return [
+        event async for event in retrying(open_stream, messages, policy, 1, Progress())
+    ]
+
+
+async def test_resumes_a_broken_stream_from_the_partial_reply():
+    open_stream, requests = upstream(
+        [ReasoningEvent("think"), ContentEvent("Hel"), httpx.RemoteProtocolError("")],
+        [ReasoningEvent("again"), ContentEvent("lo")],
+    )
+
+    events = await collect(open_stream)
+
+    assert events == [ReasoningEvent("think"), ContentEvent("Hel"), ContentEvent("lo")]
+    assert requests[1][1] == {"role": "assistant", "content": "Hel"}
+    assert requests[1][-1]["role"] == "user"
+
+
+async def test_does_not_retry_client_errors():
+    request = httpx.Request("POST", "http://upstream/v1/chat/completions")
+    error = openai.BadRequestError(
+        "bad", response=httpx.Response(400, request=request), body=None
+    )
+    open_stream, requests = upstream([error], [ContentEvent("unused")])
+
+    with pytest.raises(openai.BadRequestError):
+        await collect(open_stream)
+    assert len(requests) == 1
+
+
+def test_backoff_is_capped_and_honours_retry_after():
+    policy = RetryPolicy(max_retries=5, base_delay=0.5, max_delay=4.0)
+    request = httpx.Request("POST", "http://upstream/v1/chat/completions")
+    rate_limited = openai.RateLimitError(
+        "slow down",
+        response=httpx.Response(429, request=request, headers={"retry-after": "3"}),
+        body=None,
+    )
+
+    assert all(0 <= policy.backoff(10) <= 4.0 for _ in range(100))
+    assert all(3.0 <= policy.backoff(1, rate_limited) <= 4.0 for _ in range(100))
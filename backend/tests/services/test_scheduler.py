@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.services.model_config_cache import ResolvedModelConfig
+from app.services.scheduler import ModelScheduler, Priority, QueueFull, TokenBucket
+
+
+def make_config(**limits) -> ResolvedModelConfig:
+    return ResolvedModelConfig(
+        id=1,
+        name="test",
+        api_url="http://test",
+        api_key="key",
+        model_name="test-model",
+        model_type="LANGUAGE_MODEL",
+        **limits,
+    )
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_in_priority_order():
+    scheduler = ModelScheduler(1)
+    scheduler.configure(make_config(max_concurrency=1))
+    await scheduler.acquire(Priority.INTERACTIVE, 1)
+
+    served = []
+
+    async def wait(priority):
+        await scheduler.acquire(priority, 1)
+        served.append(priority)
+        scheduler.release(0.0)
+
+    tasks = [
+        asyncio.create_task(wait(Priority.BACKGROUND)),
+        asyncio.create_task(wait(Priority.OUTLINE)),
+        asyncio.create_task(wait(Priority.INTERACTIVE)),
+    ]
+    await asyncio.sleep(0)
+    assert len(scheduler.waiting) == 3
+
+    scheduler.release(0.0)
+    await asyncio.gather(*tasks)
+    assert served == [Priority.INTERACTIVE, Priority.OUTLINE, Priority.BACKGROUND]
+    assert scheduler.active == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_is_rejected_with_retry_after():
+    scheduler = ModelScheduler(1)
+    scheduler.configure(make_config(max_concurrency=1))
+    scheduler.max_queue = 1
+    await scheduler.acquire(Priority.INTERACTIVE, 1)
+    waiter = asyncio.create_task(scheduler.acquire(Priority.INTERACTIVE, 1))
+    await asyncio.sleep(0)
+
+    with pytest.raises(QueueFull) as exc_info:
+        scheduler.check(1)
+    assert exc_info.value.retry_after >= 1
+
+    # A cancelled waiter leaves the queue
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert scheduler.waiting == []
+    scheduler.check(1)
+
+
+def test_token_bucket_reports_delay_once_exhausted():
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    assert bucket.delay_for(60, now) == 0
+    bucket.consume(60, now)
+    assert bucket.delay_for(1, now) == pytest.approx(1.0)
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.services import single_flight
+from app.services.ai_events import ContentEvent
+
+
+def make_upstream(started: list, gate: asyncio.Event, cancelled: list):
+    def factory():
+        async def events():
+            started.append(True)
+            try:
+                yield ContentEvent("a")
+                await gate.wait()
+                yield ContentEvent("b")
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        return events()
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_identical_requests_share_one_upstream_and_replay():
+    started, cancelled = [], []
+    gate = asyncio.Event()
+    factory = make_upstream(started, gate, cancelled)
+
+    first = single_flight.subscribe("key-1", factory)
+    assert await first.__anext__() == ContentEvent("a")
+
+    # A late subscriber replays what was already emitted
+    second = single_flight.subscribe("key-1", factory)
+    assert await second.__anext__() == ContentEvent("a")
+
+    gate.set()
+    assert [e async for e in first] == [ContentEvent("b")]
+    assert [e async for e in second] == [ContentEvent("b")]
+    assert started == [True]
+    assert cancelled == []
+
+
+@pytest.mark.asyncio
+async def test_upstream_cancelled_when_last_subscriber_leaves():
+    started, cancelled = [], []
+    gate = asyncio.Event()
+    factory = make_upstream(started, gate, cancelled)
+
+    first = single_flight.subscribe("key-2", factory)
+    second = single_flight.subscribe("key-2", factory)
+    await first.__anext__()
+    await second.__anext__()
+
+    await first.aclose()
+    await asyncio.sleep(0)
+    assert cancelled == []
+
+    await second.aclose()
+    await asyncio.sleep(0)
+    assert cancelled == [True]
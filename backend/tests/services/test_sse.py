@@ -0,0 +1,108 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from starlette.requests import Request
+
+from app.core import metrics
+from app.services.ai_events import ContentEvent, ErrorEvent, ReasoningEvent
+from app.services.sse import cancel_on_disconnect, coalesce_deltas, encode_events
+
+
+async def replay(events, delay=0.0):
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_merges_consecutive_deltas_of_same_event():
+    events = [
+        ReasoningEvent("a"),
+        ReasoningEvent("b"),
+        ReasoningEvent("c"),
+        ContentEvent("d"),
+        ContentEvent("e"),
+    ]
+    result = await collect(coalesce_deltas(replay(events), window=1.0, max_bytes=1024))
+
+    # The first token is flushed on its own, then runs are merged per event
+    assert result == [ReasoningEvent("a"), ReasoningEvent("bc"), ContentEvent("de")]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_on_byte_budget():
+    events = [ContentEvent("xx")] * 5
+    result = await collect(coalesce_deltas(replay(events), window=1.0, max_bytes=4))
+
+    assert result == [ContentEvent("xx"), ContentEvent("xxxx"), ContentEvent("xxxx")]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_buffer_before_error():
+    events = [ContentEvent("a"), ContentEvent("b"), ErrorEvent("boom")]
+    result = await collect(coalesce_deltas(replay(events), window=1.0, max_bytes=1024))
+
+    assert result == [ContentEvent("a"), ContentEvent("b"), ErrorEvent("boom")]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_flushes_when_window_expires():
+    events = [ContentEvent("a"), ContentEvent("b"), ContentEvent("c")]
+    result = await collect(
+        coalesce_deltas(replay(events, delay=0.05), window=0.01, max_bytes=1024)
+    )
+
+    assert "".join(event.chunk for event in result) == "abc"
+    assert len(result) == 3
+
+
+@pytest.mark.asyncio
+async def test_coalesce_disabled_with_zero_window():
+    events = [ContentEvent("a"), ContentEvent("b")]
+    result = await collect(coalesce_deltas(replay(events), window=0, max_bytes=1024))
+
+    assert result == events
+
+
+@pytest.mark.asyncio
+async def test_encode_events_formats_sse_frames():
+    frames = await collect(encode_events(replay([ErrorEvent("boom")])))
+
+    assert frames == ['event: error\ndata: {"error": "boom"}\n\n']
+
+
+@pytest.mark.asyncio
+async def test_disconnect_closes_the_frame_source_promptly():
+    closed = asyncio.Event()
+
+    async def frames():
+        try:
+            yield "first"
+            await asyncio.sleep(60)
+            yield "never"
+        finally:
+            closed.set()
+
+    async def receive():
+        await asyncio.sleep(0.01)
+        return {"type": "http.disconnect"}
+
+    route = SimpleNamespace(path="/ai/streams/{stream_id}")
+    request = Request(
+        {"type": "http", "path": "/ai/streams/abc", "headers": [], "route": route},
+        receive,
+    )
+    received = await asyncio.wait_for(
+        collect(cancel_on_disconnect(request, frames())), timeout=1
+    )
+    assert received == ["first"]
+    assert closed.is_set()
+    snapshot = metrics.snapshot()
+    assert any("/ai/streams/{stream_id}" in key for key in snapshot)
+    assert not any("/ai/streams/abc" in key for key in snapshot)
@@ -0,0 +1,45 @@
+import pytest
+
+from app.core.config import settings
+from app.services import stream_registry
+from app.services.ai_events import ContentEvent, ErrorEvent
+
+
+async def upstream(count):
+    for i in range(count):
+        yield ContentEvent(str(i))
+
+
+@pytest.fixture(autouse=True)
+def no_coalescing(monkeypatch):
+    monkeypatch.setattr(settings, "SSE_COALESCE_WINDOW_MS", 0)
+
+
+@pytest.mark.asyncio
+async def test_reconnect_resumes_after_last_event_id():
+    stream = stream_registry.start(upstream(4))
+    first = [pair async for pair in stream_registry.subscribe(stream)]
+    assert first == [(i + 1, ContentEvent(str(i))) for i in range(4)]
+
+    stream_id, seq = stream_registry.parse_last_event_id(f"{stream.id}:2")
+    assert stream_registry.get(stream_id) is stream
+
+    resumed = [pair async for pair in stream_registry.subscribe(stream, seq)]
+    assert resumed == [(3, ContentEvent("2")), (4, ContentEvent("3"))]
+
+
+@pytest.mark.asyncio
+async def test_evicted_events_are_reported(monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_BUFFER_EVENTS", 2)
+    stream = stream_registry.start(upstream(4))
+    await stream.task
+
+    resumed = [pair async for pair in stream_registry.subscribe(stream, 0)]
+    assert resumed[0] == (None, ErrorEvent("events 1-2 are no longer available"))
+    assert resumed[1:] == [(3, ContentEvent("2")), (4, ContentEvent("3"))]
+
+
+def test_malformed_last_event_id_is_ignored():
+    assert stream_registry.parse_last_event_id(None) is None
+    assert stream_registry.parse_last_event_id("abc") is None
+    assert stream_registry.parse_last_event_id("abc:x") is None
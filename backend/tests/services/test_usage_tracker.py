@@ -0,0 +1,84 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app import crud
+from app.services import usage_tracker
+from app.services.ai_events import ContentEvent, ErrorEvent, UsageEvent
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    rows = []
+    monkeypatch.setattr(usage_tracker, "record", rows.append)
+    return rows
+
+
+async def events(*items):
+    for item in items:
+        yield item
+
+
+async def test_records_reported_usage_and_timings(recorded):
+    stream = events(
+        ContentEvent("a"), ContentEvent("b"), UsageEvent(10, 20, reasoning_tokens=5)
+    )
+    messages = [{"role": "user", "content": "hi"}]
+    async for _ in usage_tracker.track(stream, 1, messages, "chat", project_id=7):
+        pass
+
+    (row,) = recorded
+    assert row["status"] == "ok" and row["project_id"] == 7
+    assert (row["prompt_tokens"], row["completion_tokens"]) == (10, 20)
+    assert row["reasoning_tokens"] == 5 and not row["usage_estimated"]
+    assert row["ttft_ms"] is not None and row["duration_ms"] >= row["ttft_ms"]
+
+
+async def test_estimates_usage_of_failed_and_abandoned_streams(recorded):
+    messages = [{"role": "user", "content": "hi"}]
+    failed = events(ContentEvent("partial"), ErrorEvent("boom"))
+    async for _ in usage_tracker.track(failed, 1, messages, "chat"):
+        pass
+    abandoned = usage_tracker.track(events(ContentEvent("x")), 1, messages, "chat")
+    await abandoned.__anext__()
+    await abandoned.aclose()
+
+    assert [row["status"] for row in recorded] == ["error", "cancelled"]
+    assert all(row["usage_estimated"] for row in recorded)
+    assert recorded[0]["completion_tokens"] > 0
+
+
+def test_summarize_reports_percentiles_per_model():
+    rows = [
+        SimpleNamespace(
+            ai_model_id=1,
+            status="error" if i == 100 else "ok",
+            prompt_tokens=1,
+            completion_tokens=2,
+            reasoning_tokens=0,
+            ttft_ms=float(i),
+            duration_ms=float(10 * i),
+            tokens_per_second=None,
+        )
+        for i in range(1, 101)
+    ]
+
+    (stats,) = usage_tracker.summarize(rows)
+
+    assert stats.requests == 100 and stats.errors == 1
+    assert stats.completion_tokens == 200
+    assert (stats.ttft_ms.p50, stats.ttft_ms.p90, stats.ttft_ms.p99) == (50, 90, 99)
+    assert stats.duration_ms.max == 990
+    assert stats.tokens_per_second is None
+
+
+def test_postgresql_aggregates_the_window_in_one_query():
+    query = crud.generation_usage.aggregate_query(
+        since=datetime(2026, 1, 1, tzinfo=timezone.utc), ai_model_id=None, route=None
+    )
+    sql = str(query.compile(dialect=postgresql.dialect()))
+
+    assert sql.count("WITHIN GROUP") == 12
+    assert "GROUP BY generation_usage.ai_model_id" in sql
@@ -11,6 +11,19 @@ const conversationService = {
     return api.get(BASE_URL + '/')
   },
 
+  // One page of summaries without messages, newest first. Pass the returned
+  // nextCursor back to get the following page; it is null on the last one.
+  async getIndex({ cursor = null, limit = 50, projectId = null } = {}) {
+    const params = { limit }
+    if (cursor) params.cursor = cursor
+    if (projectId !== null) params.project_id = projectId
+    const response = await api.get(`${BASE_URL}/index`, { params })
+    return {
+      items: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null,
+    }
+  },
+
   get(id) {
     return api.get(`${BASE_URL}/${id}`)
   },
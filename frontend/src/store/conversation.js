@@ -9,6 +9,9 @@ export const useConversationStore = defineStore('conversation', () => {
   const currentConversationId = ref(null)
   const messages = ref([])
   const historyList = ref([])
+  // Cursor of the next page of history; null once it is all loaded
+  const historyCursor = ref(null)
+  const isLoadingHistory = ref(false)
   const isLoading = ref(false)
   const cachedInitialPrompt = ref('')
   const promptForInput = ref('')
@@ -101,11 +104,31 @@ export const useConversationStore = defineStore('conversation', () => {
   }
 
   async function loadConversationHistory() {
+    isLoadingHistory.value = true
     try {
-      const response = await conversationService.getAll()
-      historyList.value = response.data
+      const page = await conversationService.getIndex()
+      historyList.value = page.items
+      historyCursor.value = page.nextCursor
     } catch (error) {
       console.error('Failed to load conversation history:', error)
+    } finally {
+      isLoadingHistory.value = false
+    }
+  }
+
+  async function loadMoreHistory() {
+    if (!historyCursor.value || isLoadingHistory.value) return
+    isLoadingHistory.value = true
+    try {
+      const page = await conversationService.getIndex({
+        cursor: historyCursor.value,
+      })
+      historyList.value = [...historyList.value, ...page.items]
+      historyCursor.value = page.nextCursor
+    } catch (error) {
+      console.error('Failed to load more conversation history:', error)
+    } finally {
+      isLoadingHistory.value = false
     }
   }
 
@@ -169,6 +192,8 @@ export const useConversationStore = defineStore('conversation', () => {
     currentConversationId,
     messages,
     historyList,
+    historyCursor,
+    isLoadingHistory,
     isLoading,
     cachedInitialPrompt,
     promptForInput,
@@ -179,6 +204,7 @@ export const useConversationStore = defineStore('conversation', () => {
     fillInputWithCachedPrompt,
     sendMessage,
     loadConversationHistory,
+    loadMoreHistory,
     loadConversation,
     saveCurrentConversation,
     startNewConversation,